@@ -4,6 +4,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from app.schemas.user import UserResponse
 from app.models.user import User
+from app.auth import token_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
@@ -12,6 +13,19 @@ def get_current_user(
 ) -> UserResponse:
     """
     Dependency to get the current user from the JWT token without a database lookup.
+
+    Verified tokens are cached (see app/auth/token_cache.py), so repeat
+    requests with the same bearer token skip signature verification.
+    """
+    user = token_cache.get(token)
+    if user is None:
+        user = _user_from_token(token)
+        token_cache.put(token, user)
+    return user
+
+def _user_from_token(token: str) -> UserResponse:
+    """
+    Verify a JWT token and build the UserResponse for it.
     This function supports two types of payloads:
       - A full payload as a dict containing user info.
       - A minimal payload, either as a dict with only a 'sub' key or directly as a UUID.
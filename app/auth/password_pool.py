@@ -0,0 +1,144 @@
+# app/auth/password_pool.py
+"""
+Bounded process pool for password hashing.
+
+bcrypt is deliberately slow (~250 ms of CPU at BCRYPT_ROUNDS=12). Running it
+inside a request handler ties up a threadpool worker and, because it holds
+the GIL for part of that time, slows down every other request in the process.
+
+This module runs bcrypt hash/verify on a dedicated ProcessPoolExecutor:
+- Work runs in separate processes, so it uses all cores and never holds the
+  web worker's GIL.
+- The API is async: callers await the result without blocking the event loop
+  or a threadpool worker.
+- The number of queued + running operations is capped by
+  PASSWORD_HASH_MAX_QUEUE. Beyond that, callers get an immediate 503 with
+  Retry-After instead of waiting behind a login storm.
+- Queue wait and hash time are recorded separately in app.core.metrics.
+
+Settings:
+- PASSWORD_HASH_WORKERS: pool size (default: number of CPUs). 0 disables the
+  pool and hashes in the default threadpool instead.
+- PASSWORD_HASH_MAX_QUEUE: maximum queued + running operations.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+
+settings = get_settings()
+
+_executor: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+_in_flight = 0
+
+
+# ------------------------------------------------------------------------------
+# Worker functions (run in the pool processes)
+# ------------------------------------------------------------------------------
+def _timed(fn: Callable, *args) -> Tuple[object, float, float]:
+    """Run fn and return (result, started, finished) monotonic timestamps."""
+    started = time.monotonic()
+    result = fn(*args)
+    return result, started, time.monotonic()
+
+
+def _hash_worker(password: str) -> Tuple[str, float, float]:
+    from app.auth.jwt import get_password_hash
+    return _timed(get_password_hash, password)
+
+
+def _verify_worker(plain_password: str, hashed_password: str) -> Tuple[bool, float, float]:
+    from app.auth.jwt import verify_password
+    return _timed(verify_password, plain_password, hashed_password)
+
+
+# ------------------------------------------------------------------------------
+# Pool lifecycle
+# ------------------------------------------------------------------------------
+def pool_size() -> int:
+    """Number of worker processes the pool uses (0 = pool disabled)."""
+    if settings.PASSWORD_HASH_WORKERS is None:
+        return os.cpu_count() or 1
+    return settings.PASSWORD_HASH_WORKERS
+
+
+def start() -> None:
+    """Create the process pool. Called from the FastAPI lifespan."""
+    global _executor
+    with _lock:
+        if _executor is None and pool_size() > 0:
+            # spawn: never fork a process that already runs an event loop and threads
+            _executor = ProcessPoolExecutor(
+                max_workers=pool_size(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+
+def shutdown() -> None:
+    """Shut the pool down. Called from the FastAPI lifespan."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def in_flight() -> int:
+    """Number of queued + running password operations."""
+    return _in_flight
+
+
+metrics.register_gauge("password_hash.in_flight", in_flight)
+metrics.register_gauge("password_hash.workers", pool_size)
+
+
+# ------------------------------------------------------------------------------
+# Async API
+# ------------------------------------------------------------------------------
+async def _run(worker: Callable, *args):
+    """Submit a worker call, enforcing the queue limit and recording timings."""
+    global _in_flight
+    with _lock:
+        if _in_flight >= settings.PASSWORD_HASH_MAX_QUEUE:
+            metrics.incr("password_hash.rejected")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent authentication requests, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        _in_flight += 1
+
+    try:
+        if _executor is None:
+            start()
+        submitted = time.monotonic()
+        # _executor is None when the pool is disabled: use the default threadpool
+        result, started, finished = await asyncio.get_running_loop().run_in_executor(
+            _executor, worker, *args
+        )
+        metrics.observe("password_hash.queue_wait", max(started - submitted, 0.0))
+        metrics.observe("password_hash.hash_time", finished - started)
+        return result
+    finally:
+        with _lock:
+            _in_flight -= 1
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password with bcrypt on the process pool."""
+    return await _run(_hash_worker, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a bcrypt hash on the process pool."""
+    return await _run(_verify_worker, plain_password, hashed_password)
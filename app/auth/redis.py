@@ -1,23 +1,315 @@
-import redis.asyncio as redis 
+"""
+Redis token blacklist with a local Bloom filter in front of it.
+
+Revoked tokens are stored in Redis as `blacklist:{jti}` keys that expire with
+the token. Almost no tokens are ever revoked, so instead of one Redis round
+trip per request, each process keeps a Bloom filter of the revoked JTIs:
+
+- A JTI that is not in the filter is definitely not revoked, which is the
+  common case. It is answered locally with no network I/O.
+- A JTI in the filter is possibly revoked, and is confirmed with
+  `EXISTS blacklist:{jti}`.
+
+The filter is kept in sync by a background task started from the app
+lifespan:
+- add_to_blacklist() publishes the JTI on the BLACKLIST_CHANNEL pub/sub
+  channel, and every process adds it to its filter as the message arrives.
+- Every BLACKLIST_SYNC_INTERVAL_SECONDS the filter is rebuilt from a SCAN
+  of the blacklist keys. This drops expired JTIs (a Bloom filter cannot
+  delete) and catches anything missed while disconnected.
+
+Until the first sync has completed, or while the subscription is down,
+the filter is not trusted and every check goes to Redis as before.
+
+All commands share one pooled client (init_redis / close_redis, called from
+the app lifespan). Batch operations (add_many_to_blacklist, are_blacklisted)
+are pipelined so they cost a single round trip.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Iterable, List, Optional, Tuple
+
+import redis.asyncio as redis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+from app.core.bloom import BloomFilter
 from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.auth import token_cache
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+BLACKLIST_PREFIX = "blacklist:"
+BLACKLIST_CHANNEL = "blacklist:revoked"
+
+_pool: Optional[redis.BlockingConnectionPool] = None
+_client: Optional[redis.Redis] = None
+
+
+# ------------------------------------------------------------------------------
+# Connection pool lifecycle
+# ------------------------------------------------------------------------------
+def init_redis(url: Optional[str] = None) -> redis.Redis:
+    """
+    Create the shared Redis client and its connection pool.
+
+    Called from the FastAPI lifespan. No connection is opened here: the pool
+    connects on first use, so the app starts even when Redis is down.
+
+    The pool is a BlockingConnectionPool: when all REDIS_MAX_CONNECTIONS
+    connections are busy, callers wait up to REDIS_POOL_TIMEOUT seconds
+    for one instead of failing immediately. Commands that hit a connection
+    or timeout error are retried REDIS_RETRY_ATTEMPTS times with
+    exponential backoff, on a fresh connection.
+
+    Args:
+        url: Redis URL (default: settings.REDIS_URL)
 
-# Singleton Redis connection
-async def get_redis():
-    if not hasattr(get_redis, "redis"):
-        get_redis.redis = redis.from_url(
-            settings.REDIS_URL or "redis://localhost",
-            decode_responses=True  # optional: ensures strings instead of bytes
+    Returns:
+        redis.Redis: The shared client
+    """
+    global _pool, _client
+    if _client is None:
+        _pool = redis.BlockingConnectionPool.from_url(
+            url or settings.REDIS_URL or "redis://localhost",
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_POOL_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+            retry=Retry(ExponentialBackoff(cap=1.0, base=0.05), settings.REDIS_RETRY_ATTEMPTS),
+            decode_responses=True,  # optional: ensures strings instead of bytes
         )
-    return get_redis.redis
+        _client = redis.Redis(connection_pool=_pool)
+    return _client
+
+
+async def close_redis() -> None:
+    """Close the shared client and every pooled connection. Called from the FastAPI lifespan."""
+    global _pool, _client
+    client, pool = _client, _pool
+    _client = _pool = None
+    if client is not None:
+        await client.aclose()
+    if pool is not None:
+        await pool.disconnect()
+
+
+async def get_redis() -> redis.Redis:
+    """Return the shared Redis client, creating the pool on first use."""
+    return _client or init_redis()
+
+
+def _pool_in_use() -> int:
+    return len(_pool._in_use_connections) if _pool is not None else 0
+
+
+metrics.register_gauge("redis.pool.max_connections", lambda: settings.REDIS_MAX_CONNECTIONS)
+metrics.register_gauge("redis.pool.in_use", _pool_in_use)
+
+
+class RedisBackoff:
+    """
+    Skip an optional Redis-backed feature for a while after an error.
+
+    Caches that only use Redis as an accelerator must not slow down every
+    request with connection retries while Redis is unreachable. After
+    failed() they report unavailable() for `seconds`, and callers fall back
+    to their local path.
+    """
+
+    def __init__(self, name: str, seconds: float):
+        self.name = name
+        self.seconds = seconds
+        self._until = 0.0
+
+    def available(self) -> bool:
+        return time.monotonic() >= self._until
+
+    def failed(self, error: Exception) -> None:
+        self._until = time.monotonic() + self.seconds
+        metrics.incr(f"{self.name}.redis.errors")
+        logger.warning("%s: Redis unavailable (%s); skipping it for %.0fs", self.name, error, self.seconds)
+
+    def reset(self) -> None:
+        self._until = 0.0
+
+
+class BlacklistFilter:
+    """Process-local Bloom filter of revoked JTIs, synced from Redis."""
+
+    def __init__(self):
+        self._filter: Optional[BloomFilter] = None
+        self._ready = False
+        self._task: Optional[asyncio.Task] = None
+        self.last_sync: Optional[float] = None
+        metrics.register_gauge("blacklist_filter.ready", lambda: int(self.ready))
+        metrics.register_gauge("blacklist_filter.items", lambda: len(self._filter) if self._filter is not None else 0)
+        metrics.register_gauge("blacklist_filter.memory_bytes", lambda: self._filter.memory_bytes if self._filter is not None else 0)
+        metrics.register_gauge("blacklist_filter.hash_count", lambda: self._filter.num_hashes if self._filter is not None else 0)
+        metrics.register_gauge(
+            "blacklist_filter.estimated_error_rate",
+            lambda: self._filter.estimated_error_rate if self._filter is not None else 0.0,
+        )
+
+    @property
+    def ready(self) -> bool:
+        """Whether negative answers from the filter can be trusted."""
+        return self._ready and self._filter is not None
+
+    def might_contain(self, jti: str) -> bool:
+        """False only if the JTI is definitely not revoked."""
+        if not self.ready:
+            return True
+        return jti in self._filter
+
+    def add(self, jti: str) -> None:
+        """Add a newly revoked JTI."""
+        if self._filter is not None:
+            self._filter.add(jti)
+
+    async def sync(self, redis_conn) -> int:
+        """
+        Rebuild the filter from the blacklist keys in Redis.
+
+        Returns:
+            int: Number of revoked JTIs loaded
+        """
+        started = time.monotonic()
+        jtis = [key[len(BLACKLIST_PREFIX):] async for key in redis_conn.scan_iter(match=f"{BLACKLIST_PREFIX}*", count=1000)]
+        # Size for growth so the target error rate holds until the next sync
+        new_filter = BloomFilter(
+            capacity=max(settings.BLACKLIST_FILTER_CAPACITY, 2 * len(jtis)),
+            error_rate=settings.BLACKLIST_FILTER_ERROR_RATE,
+        )
+        for jti in jtis:
+            new_filter.add(jti)
+        self._filter = new_filter
+        self._ready = True
+        self.last_sync = time.monotonic()
+        metrics.observe("blacklist_filter.sync_time", self.last_sync - started)
+        return len(jtis)
+
+    async def _run(self) -> None:
+        """Subscribe to revocations and resync periodically, reconnecting on errors."""
+        backoff = 1.0
+        while True:
+            pubsub = None
+            try:
+                redis_conn = await get_redis()
+                pubsub = redis_conn.pubsub()
+                # Subscribe before the full sync so no revocation falls in between
+                await pubsub.subscribe(BLACKLIST_CHANNEL)
+                await self.sync(redis_conn)
+                backoff = 1.0
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None:
+                        self.add(message["data"])
+                    if time.monotonic() - self.last_sync >= settings.BLACKLIST_SYNC_INTERVAL_SECONDS:
+                        await self.sync(redis_conn)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Revocations may be missed while disconnected: stop trusting the filter
+                self._ready = False
+                metrics.incr("blacklist_filter.sync_errors")
+                logger.warning("Blacklist filter sync failed (%s); retrying in %.0fs", e, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, settings.BLACKLIST_SYNC_INTERVAL_SECONDS)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
+    def start(self) -> None:
+        """Start the background sync task. Called from the FastAPI lifespan."""
+        if settings.BLACKLIST_FILTER_ENABLED and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background sync task. Called from the FastAPI lifespan."""
+        task, self._task = self._task, None
+        self._ready = False
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+blacklist_filter = BlacklistFilter()
+
 
 async def add_to_blacklist(jti: str, exp: int):
     """Add a token's JTI to the blacklist"""
+    await add_many_to_blacklist([(jti, exp)])
+
+async def add_many_to_blacklist(entries: Iterable[Tuple[str, int]]) -> None:
+    """
+    Add several tokens to the blacklist in one round trip, e.g. to log out
+    all sessions of a user.
+
+    The SET and PUBLISH commands of every token are sent in a single
+    pipeline (without MULTI/EXEC: each entry is independent).
+
+    Args:
+        entries: (jti, seconds until the token expires) pairs
+    """
+    entries = list(entries)
+    if not entries:
+        return
     redis_conn = await get_redis()
-    await redis_conn.set(f"blacklist:{jti}", "1", ex=exp)
+    async with redis_conn.pipeline(transaction=False) as pipe:
+        for jti, exp in entries:
+            pipe.set(f"{BLACKLIST_PREFIX}{jti}", "1", ex=exp)
+            pipe.publish(BLACKLIST_CHANNEL, jti)
+        await pipe.execute()
+    for jti, _ in entries:
+        blacklist_filter.add(jti)
+        token_cache.invalidate_jti(jti)
 
 async def is_blacklisted(jti: str) -> bool:
     """Check if a token's JTI is blacklisted"""
+    if not blacklist_filter.might_contain(jti):
+        metrics.incr("blacklist_filter.negative")
+        return False
+    redis_conn = await get_redis()
+    revoked = bool(await redis_conn.exists(f"{BLACKLIST_PREFIX}{jti}"))
+    if blacklist_filter.ready:
+        metrics.incr("blacklist_filter.positive" if revoked else "blacklist_filter.false_positive")
+    return revoked
+
+async def are_blacklisted(jtis: Iterable[str]) -> List[bool]:
+    """
+    Check several JTIs at once.
+
+    JTIs the local filter rules out are answered without I/O; the rest are
+    checked with one pipelined round trip of EXISTS commands.
+
+    Returns:
+        List[bool]: One flag per JTI, in order
+    """
+    jtis = list(jtis)
+    results = [False] * len(jtis)
+    candidates = [index for index, jti in enumerate(jtis) if blacklist_filter.might_contain(jti)]
+    metrics.incr("blacklist_filter.negative", len(jtis) - len(candidates))
+    if not candidates:
+        return results
+
     redis_conn = await get_redis()
-    return bool(await redis_conn.exists(f"blacklist:{jti}"))
+    async with redis_conn.pipeline(transaction=False) as pipe:
+        for index in candidates:
+            pipe.exists(f"{BLACKLIST_PREFIX}{jtis[index]}")
+        replies = await pipe.execute()
+    for index, reply in zip(candidates, replies):
+        results[index] = bool(reply)
+        if blacklist_filter.ready:
+            metrics.incr("blacklist_filter.positive" if reply else "blacklist_filter.false_positive")
+    return results
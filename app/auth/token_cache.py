@@ -0,0 +1,89 @@
+# app/auth/token_cache.py
+"""
+Cache of verified access tokens.
+
+Every authenticated request used to decode and verify the bearer token's
+HS256 signature and rebuild the UserResponse for it. Clients send the same
+token for many requests, so the result is cached here.
+
+- Keys are the SHA-256 digest of the token. Raw tokens are never stored.
+- Values hold the token's claims and the UserResponse built from it.
+- An entry lives for TOKEN_CACHE_TTL_SECONDS, and never past the token's
+  own `exp` claim, so expired tokens are always re-verified (and rejected).
+- Revoking a token (app.auth.redis.add_to_blacklist) drops its entry, via
+  invalidate_jti(). The cache is per process; with several workers the
+  TTL bounds how long another worker can still accept a revoked token.
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from jose import jwt, JWTError
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.schemas.user import UserResponse
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class CachedToken:
+    """A verified token: its claims and the user it authenticates."""
+    claims: dict
+    user: UserResponse
+
+
+cache = TTLCache(
+    "tokens",
+    max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+    ttl=settings.TOKEN_CACHE_TTL_SECONDS,
+)
+
+
+def token_digest(token: str) -> bytes:
+    """Cache key for a bearer token."""
+    return hashlib.sha256(token.encode()).digest()
+
+
+def get(token: str) -> Optional[UserResponse]:
+    """Return the user for an already verified token, or None."""
+    entry = cache.get(token_digest(token))
+    return entry.user if entry is not None else None
+
+
+def put(token: str, user: UserResponse) -> None:
+    """
+    Remember a token that has just been verified.
+
+    The claims are read without verification, which is safe because the
+    caller has verified the signature already. Tokens whose claims cannot
+    be read are not cached.
+    """
+    try:
+        claims = jwt.get_unverified_claims(token)
+    except JWTError:
+        return
+
+    ttl = settings.TOKEN_CACHE_TTL_SECONDS
+    exp = claims.get("exp")
+    if isinstance(exp, (int, float)):
+        ttl = min(ttl, exp - time.time())
+    cache.set(token_digest(token), CachedToken(claims=claims, user=user), ttl=ttl)
+
+
+def invalidate(token: str) -> None:
+    """Drop a single token from the cache."""
+    cache.pop(token_digest(token))
+
+
+def invalidate_jti(jti: str) -> int:
+    """Drop every cached token with the given `jti` claim (used on revocation)."""
+    return cache.pop_where(lambda entry: entry.claims.get("jti") == jti)
+
+
+def clear() -> None:
+    """Drop every cached token."""
+    cache.clear()
@@ -0,0 +1,77 @@
+# app/core/bloom.py
+"""
+Bloom filter for fast, approximate set membership.
+
+A Bloom filter answers "definitely not in the set" or "possibly in the set"
+using a fixed bit array and k hash functions. It never gives false
+negatives, and its false-positive rate is set when it is sized:
+
+    bits   m = -n * ln(p) / ln(2)^2
+    hashes k = m / n * ln(2)
+
+for n expected items and a target false-positive rate p. Items cannot be
+removed; to drop items, build a new filter and swap it in.
+
+Usage:
+    from app.core.bloom import BloomFilter
+
+    revoked = BloomFilter(capacity=100_000, error_rate=0.001)
+    revoked.add(jti)
+    if jti in revoked:
+        ...  # possibly revoked: confirm with the source of truth
+"""
+
+import hashlib
+import math
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        Args:
+            capacity: Number of items the filter is sized for
+            error_rate: Target false-positive rate at capacity, e.g. 0.001
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        """Bit positions of an item, by double hashing one 128-bit digest."""
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item: str) -> None:
+        """Add an item to the filter."""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        """False if the item was never added; True if it possibly was."""
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def __len__(self) -> int:
+        """Number of items added (duplicates included)."""
+        return self.count
+
+    @property
+    def memory_bytes(self) -> int:
+        """Size of the bit array in bytes."""
+        return len(self._bits)
+
+    @property
+    def estimated_error_rate(self) -> float:
+        """Expected false-positive rate for the items added so far."""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
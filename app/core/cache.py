@@ -0,0 +1,143 @@
+# app/core/cache.py
+"""
+Bounded in-process LRU cache with per-entry TTL.
+
+Used for small, hot lookups that are expensive to recompute on every request
+(verified bearer tokens, ...). Entries are evicted least-recently-used once
+max_entries is reached, and expire after their TTL. All operations are
+thread-safe, so the cache can be shared between the event loop and the
+threadpool.
+
+Usage:
+    from app.core.cache import TTLCache
+
+    cache = TTLCache("tokens", max_entries=10000, ttl=60)
+    cache.set(key, value)              # default TTL
+    cache.set(key, value, ttl=5)       # per-entry TTL
+    value = cache.get(key)             # None on miss or expiry
+    cache.pop(key)
+
+Hits, misses and evictions are counted in app.core.metrics under
+"cache.<name>.*", and the current size is a gauge.
+
+A cache can also be bounded by memory: with max_bytes, entries are
+evicted until the summed sizeof(value) fits (sizeof defaults to len(),
+e.g. for bytes values), and values larger than max_bytes are not stored.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from app.core.metrics import metrics
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a TTL."""
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = len,
+    ):
+        """
+        Args:
+            name: Name used for the metrics of this cache
+            max_entries: Maximum number of entries; 0 disables the cache
+            ttl: Default time to live of an entry, in seconds
+            clock: Time source (monotonic seconds), replaceable in tests
+            max_bytes: Optional limit on the summed size of the values
+            sizeof: Size of a value in bytes, used with max_bytes
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (expires_at, value, size), ordered from least to most recently used
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        metrics.register_gauge(f"cache.{name}.size", self.__len__)
+        if max_bytes is not None:
+            metrics.register_gauge(f"cache.{name}.bytes", lambda: self._bytes)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or default if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self._clock():
+                    self._entries.move_to_end(key)
+                    metrics.incr(f"cache.{self.name}.hits")
+                    return entry[1]
+                self._remove(key)
+        metrics.incr(f"cache.{self.name}.misses")
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        if self.max_entries <= 0:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        evicted = 0
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (self._clock() + ttl, value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                evicted += 1
+        if evicted:
+            metrics.incr(f"cache.{self.name}.evictions", evicted)
+
+    def pop(self, key: Hashable) -> Any:
+        """Remove an entry and return its value (None if it was not cached)."""
+        with self._lock:
+            entry = self._remove(key)
+        return entry[1] if entry is not None else None
+
+    def pop_where(self, predicate: Callable[[Any], bool]) -> int:
+        """
+        Remove every entry whose value matches predicate.
+
+        This is a full scan of the cache; use it for rare events such as
+        revocations, not on the request path.
+
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if predicate(entry[1])]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Hashable) -> Optional[tuple]:
+        """Delete an entry and update the byte count. Call with the lock held."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+        return entry
@@ -0,0 +1,45 @@
+# app/core/etag.py
+"""
+ETag helpers for conditional requests (RFC 9110, section 13).
+
+- If-None-Match (GET): weak comparison. A match means the client's copy is
+  current and the response is 304 Not Modified, without a body.
+- If-Match (PUT): strong comparison. No match means the client edited a
+  stale copy, and the response is 412 Precondition Failed.
+
+Both headers may hold a comma-separated list of entity tags, or "*".
+"""
+
+import hashlib
+from typing import List, Optional
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag (quoted) derived from the given parts."""
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _parse(header: str) -> List[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header matches the ETag (the client copy is current)."""
+    if not header:
+        return False
+    tags = _parse(header)
+    return "*" in tags or _opaque(etag) in (_opaque(tag) for tag in tags)
+
+
+def if_match(header: Optional[str], etag: str) -> bool:
+    """True if an If-Match header allows the write. Absent headers always do."""
+    if header is None:
+        return True
+    tags = _parse(header)
+    # Weak tags never match strongly
+    return "*" in tags or (not etag.startswith("W/") and etag in tags)
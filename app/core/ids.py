@@ -0,0 +1,79 @@
+# app/core/ids.py
+"""
+Primary key generation.
+
+Calculations and users are keyed by UUIDs. Random (version 4) UUIDs land
+at random positions of the primary key B-tree, so under a steady insert
+load every leaf page is a candidate for the next insert: pages split half
+full, the working set of the index is the whole index, and a large index
+stops fitting in cache.
+
+Version 7 UUIDs (RFC 9562) start with a 48-bit Unix timestamp in
+milliseconds, so new keys sort after existing ones and inserts append to
+the rightmost leaf pages. The remaining 74 bits keep them as unguessable
+and as unique as version 4 keys, which existing ids remain compatible
+with. Ordering by id then matches creation order.
+
+The ID_GENERATOR setting selects the generator; new_id() is the column
+default. benchmarks/bench_uuid_keys.py compares the two.
+"""
+
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from app.core.config import settings
+
+_RAND_B_BITS = 62
+_RAND_B_MASK = (1 << _RAND_B_BITS) - 1
+
+_lock = threading.Lock()
+_last = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    A new version 7 UUID.
+
+    Layout: 48-bit Unix time in ms | version | 12-bit sub-millisecond
+    fraction (rand_a, RFC 9562 method 3) | variant | 62 random bits.
+    Ids from this process are strictly increasing: if the clock has not
+    moved (or moved back), the previous id plus one is used instead.
+    """
+    global _last
+    nanoseconds = time.time_ns()
+    milliseconds, fraction = divmod(nanoseconds, 1_000_000)
+    # The 122 bits that are not version or variant, in sort order
+    sequence = (
+        (milliseconds << 74)
+        | ((fraction * 4096 // 1_000_000) << _RAND_B_BITS)
+        | (int.from_bytes(os.urandom(8), "big") & _RAND_B_MASK)
+    )
+    with _lock:
+        if sequence <= _last:
+            sequence = _last + 1
+        _last = sequence
+    milliseconds, rand_a = divmod(sequence >> _RAND_B_BITS, 4096)
+    return uuid.UUID(int=(
+        milliseconds << 80
+        | 0x7 << 76
+        | rand_a << 64
+        | 0b10 << _RAND_B_BITS
+        | (sequence & _RAND_B_MASK)
+    ))
+
+
+def uuid7_time(value: uuid.UUID) -> datetime:
+    """The (naive UTC, millisecond) creation time of a version 7 UUID."""
+    if value.version != 7:
+        raise ValueError(f"Not a version 7 UUID: {value}")
+    return datetime.fromtimestamp((value.int >> 80) / 1000, tz=timezone.utc).replace(tzinfo=None)
+
+
+def new_id() -> uuid.UUID:
+    """A new primary key, from the generator selected by ID_GENERATOR."""
+    if settings.ID_GENERATOR == "uuid7":
+        return uuid7()
+    return uuid.uuid4()
@@ -0,0 +1,71 @@
+# app/core/metrics.py
+"""
+In-process metrics registry.
+
+A deliberately small replacement for a full metrics client: counters, timers
+(count / total / max seconds) and gauges (callbacks evaluated on read). The
+snapshot is served as JSON by GET /metrics.
+
+Usage:
+    from app.core.metrics import metrics
+
+    metrics.incr("password_hash.rejected")
+    metrics.observe("password_hash.queue_wait", 0.012)
+    metrics.register_gauge("password_hash.in_flight", lambda: in_flight)
+"""
+
+import threading
+from typing import Callable, Dict
+
+
+class Metrics:
+    """Thread-safe counters, timers and gauges for this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._timers: Dict[str, Dict[str, float]] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        """Increase a counter."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record one duration for a timer."""
+        with self._lock:
+            timer = self._timers.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+            timer["count"] += 1
+            timer["total"] += seconds
+            timer["max"] = max(timer["max"], seconds)
+
+    def register_gauge(self, name: str, callback: Callable[[], float]) -> None:
+        """Register a callback whose value is read at snapshot time."""
+        with self._lock:
+            self._gauges[name] = callback
+
+    def snapshot(self) -> dict:
+        """Return the current value of every metric."""
+        with self._lock:
+            counters = dict(self._counters)
+            timers = {
+                name: {**timer, "avg": timer["total"] / timer["count"] if timer["count"] else 0.0}
+                for name, timer in self._timers.items()
+            }
+            gauges = dict(self._gauges)
+        return {
+            "counters": counters,
+            "timers": timers,
+            "gauges": {name: callback() for name, callback in gauges.items()},
+        }
+
+    def reset(self) -> None:
+        """Clear counters and timers (gauges stay registered)."""
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+
+# Global registry used across the application
+metrics = Metrics()
@@ -0,0 +1,121 @@
+# app/core/response_cache.py
+"""
+Cache of serialized HTTP responses.
+
+Stores finished response bodies (and a few headers) as bytes, so a hit is
+returned without querying the database or serializing anything. There are
+two tiers:
+
+- In-process: a TTLCache bounded by entry count and total bytes. It is
+  always used, so repeated hits on the same worker skip the network.
+- Redis (optional): shared by every worker through the pooled get_redis()
+  client, with the same TTL. After a Redis error the tier is skipped for a
+  while (RedisBackoff) and only the in-process tier is used.
+
+The cache never deletes entries to invalidate them. Callers put a version
+in their keys (e.g. the per-user collection version) and bump it on
+writes, so invalidation is O(1) and old entries simply expire.
+
+Hits and misses are counted under "response_cache.<name>.*", and
+"response_cache.<name>.hit_ratio" is a gauge over the process lifetime.
+"""
+
+import json
+from typing import Dict, Optional, Tuple
+
+from app.auth.redis import RedisBackoff, get_redis
+from app.core.cache import TTLCache
+from app.core.metrics import metrics
+
+
+class ResponseCache:
+    """Two-tier (in-process, Redis) cache of response bodies and headers."""
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        max_entries: int,
+        max_bytes: int,
+        max_entry_bytes: int,
+        use_redis: bool,
+        redis_backoff_seconds: float = 30,
+    ):
+        """
+        Args:
+            name: Name used for keys and metrics
+            ttl: Lifetime of an entry, in seconds
+            max_entries: Maximum entries of the in-process tier; 0 disables it
+            max_bytes: Maximum total size of the in-process tier
+            max_entry_bytes: Larger responses are not cached
+            use_redis: Whether to use the shared Redis tier
+            redis_backoff_seconds: How long to skip Redis after an error
+        """
+        self.name = name
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes
+        self.use_redis = use_redis
+        self.local = TTLCache(f"responses.{name}", max_entries=max_entries, ttl=ttl, max_bytes=max_bytes)
+        self.redis_backoff = RedisBackoff(f"response_cache.{name}", redis_backoff_seconds)
+        self.hits = 0
+        self.misses = 0
+        metrics.register_gauge(f"response_cache.{name}.hit_ratio", self.hit_ratio)
+
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _redis_key(self, key: str) -> str:
+        return f"response:{self.name}:{key}"
+
+    def _redis_enabled(self) -> bool:
+        return self.use_redis and self.redis_backoff.available()
+
+    async def get(self, key: str) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        """Return (body, headers) of a cached response, or None."""
+        entry = self.local.get(key)
+        if entry is None and self._redis_enabled():
+            try:
+                redis_conn = await get_redis()
+                value = await redis_conn.get(self._redis_key(key))
+            except Exception as e:
+                self.redis_backoff.failed(e)
+                value = None
+            if value is not None:
+                entry = value.encode() if isinstance(value, str) else value
+                self.local.set(key, entry)
+        if entry is None:
+            self.misses += 1
+            metrics.incr(f"response_cache.{self.name}.misses")
+            return None
+        self.hits += 1
+        metrics.incr(f"response_cache.{self.name}.hits")
+        return _decode(entry)
+
+    async def set(self, key: str, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        """Cache a response body and the headers to replay with it."""
+        entry = _encode(body, headers or {})
+        if len(entry) > self.max_entry_bytes:
+            metrics.incr(f"response_cache.{self.name}.too_large")
+            return
+        self.local.set(key, entry)
+        if self._redis_enabled():
+            try:
+                redis_conn = await get_redis()
+                await redis_conn.set(self._redis_key(key), entry, ex=max(int(self.ttl), 1))
+            except Exception as e:
+                self.redis_backoff.failed(e)
+
+    def clear(self) -> None:
+        """Drop the in-process tier (the Redis tier expires on its own)."""
+        self.local.clear()
+
+
+def _encode(body: bytes, headers: Dict[str, str]) -> bytes:
+    # One line of JSON headers, then the body
+    return json.dumps(headers, separators=(",", ":")).encode() + b"\n" + body
+
+
+def _decode(entry: bytes) -> Tuple[bytes, Dict[str, str]]:
+    header_line, _, body = entry.partition(b"\n")
+    return body, json.loads(header_line)
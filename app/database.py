@@ -1,14 +1,153 @@
 # app/database.py
-from sqlalchemy import create_engine
+"""
+Database engines, sessions and request dependencies.
+
+Two access paths share the same models:
+
+- Sync: `engine` / `SessionLocal` (psycopg2). Used by get_db(), schema
+  migrations (`python -m app.database_init`, see app.database_migrations),
+  the startup revision check, batch jobs, scripts and tests.
+- Async: `async_engine` / `AsyncSessionLocal` (asyncpg). The API routes
+  depend on get_async_db(), so an in-flight query waits on the event loop
+  instead of pinning one of Starlette's threadpool workers.
+
+get_async_db() yields an AsyncSession when settings.DATABASE_ASYNC is on
+(the default). When it is off, it yields a SyncSessionAdapter around a
+regular Session instead: the same awaitable API, with every database call
+run in the threadpool, i.e. the previous behaviour.
+
+Engines are memoized per URL (get_engine / get_async_engine) and their
+pools are configured from the DB_* settings (see engine_options()).
+
+Model methods written for a sync Session (Active Record classmethods such
+as User.register) are called from routes with `await db.run_sync(...)`,
+which works on both.
+"""
+
+import threading
+from typing import Any, AsyncIterator, Callable, Dict
+import uuid
+
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.core.metrics import metrics
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-# Create the default engine and sessionmaker
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def async_database_url(database_url: str) -> str:
+    """Turn a postgresql:// (psycopg2) URL into the equivalent asyncpg URL."""
+    url = make_url(database_url)
+    if url.drivername in ("postgresql", "postgresql+psycopg2"):
+        url = url.set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+
+def _prepared_statement_name() -> str:
+    """A name no other client of the same server connection can have used."""
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def engine_options(is_async: bool = False) -> Dict[str, Any]:
+    """
+    Pool keyword arguments for create_engine / create_async_engine.
+
+    With DB_NULL_POOL (for running behind PgBouncer, which does the pooling)
+    every checkout opens a fresh connection and closing it really closes it.
+    asyncpg's prepared statement caches are disabled in that mode too:
+    PgBouncer in transaction mode can hand each statement to a different
+    server connection. asyncpg still prepares each statement under a name,
+    so the names are made unique (uuid4) to avoid clashing with statements
+    another client prepared on the same server connection.
+
+    Otherwise a QueuePool is sized by DB_POOL_SIZE + DB_MAX_OVERFLOW.
+    Checkouts wait up to DB_POOL_TIMEOUT seconds. Connections older than
+    DB_POOL_RECYCLE seconds are replaced. With DB_POOL_PRE_PING, each
+    checkout first tests the connection, so connections the server has
+    dropped are replaced instead of failing the request.
+    """
+    if settings.DB_NULL_POOL:
+        options: Dict[str, Any] = {"poolclass": NullPool}
+        if is_async:
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": _prepared_statement_name,
+            }
+        return options
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+# Engines are memoized per URL: each engine owns a connection pool, so
+# creating one per call would multiply the number of server connections.
+_engines: Dict[str, Engine] = {}
+_async_engines: Dict[str, AsyncEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(database_url: str = SQLALCHEMY_DATABASE_URL) -> Engine:
+    """Return the (memoized) SQLAlchemy engine for a URL."""
+    with _engines_lock:
+        if database_url not in _engines:
+            _engines[database_url] = create_engine(database_url, **engine_options())
+        return _engines[database_url]
+
+
+def get_async_engine(database_url: str = SQLALCHEMY_DATABASE_URL) -> AsyncEngine:
+    """Return the (memoized) async (asyncpg) engine for a URL."""
+    with _engines_lock:
+        if database_url not in _async_engines:
+            _async_engines[database_url] = create_async_engine(
+                async_database_url(database_url), **engine_options(is_async=True)
+            )
+        return _async_engines[database_url]
+
+
+def pool_status(engine) -> Dict[str, Any]:
+    """
+    Connection pool statistics of an engine, for monitoring.
+
+    Returns:
+        dict: Pool class, and for queue pools the configured size, idle
+        (checked in) and busy (checked out) connections, and the current
+        overflow beyond the configured size
+    """
+    pool = engine.pool if isinstance(engine, Engine) else engine.sync_engine.pool
+    status = {"pool": type(pool).__name__}
+    if hasattr(pool, "checkedout"):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    return status
+
+
+# Create the default engine and sessionmaker. Objects are not expired on
+# commit: writes read their generated columns back with RETURNING, so a
+# committed object is already current and needs no refresh SELECT.
+engine = get_engine()
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Async engine and sessionmaker (no connection is opened until first use)
+async_engine = get_async_engine()
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+metrics.register_gauge("db.pool.sync", lambda: pool_status(engine))
+metrics.register_gauge("db.pool.async", lambda: pool_status(async_engine))
 
 Base = declarative_base()
 
@@ -19,11 +158,82 @@ def get_db():
     finally:
         db.close()
 
-# --- New Functions Added ---
-def get_engine(database_url: str = SQLALCHEMY_DATABASE_URL):
-    """Factory function to create a new SQLAlchemy engine."""
-    return create_engine(database_url)
 
+class SyncSessionAdapter:
+    """
+    Awaitable facade over a sync Session.
+
+    Exposes the subset of the AsyncSession API the routes use, running each
+    database call in the threadpool. Used by get_async_db() when
+    DATABASE_ASYNC is off.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    def add(self, instance: Any) -> None:
+        self.sync_session.add(instance)
+
+    async def execute(self, statement, *args, **kwargs):
+        # Buffer the rows in the worker thread so iterating them never blocks
+        result = await run_in_threadpool(self.sync_session.execute, statement, *args, **kwargs)
+        # (ORM results always return rows; only CursorResult has returns_rows)
+        return result.freeze()() if getattr(result, "returns_rows", True) else result
+
+    async def scalars(self, statement, *args, **kwargs):
+        return (await self.execute(statement, *args, **kwargs)).scalars()
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance: Any) -> None:
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self) -> None:
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def refresh(self, instance: Any, *args, **kwargs) -> None:
+        await run_in_threadpool(self.sync_session.refresh, instance, *args, **kwargs)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+    async def run_sync(self, fn: Callable, *args, **kwargs):
+        """Call fn(session, *args, **kwargs) in the threadpool, like AsyncSession.run_sync."""
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+
+async def get_async_db() -> AsyncIterator[Any]:
+    """
+    Request dependency yielding an awaitable session.
+
+    Yields:
+        AsyncSession, or SyncSessionAdapter when DATABASE_ASYNC is off
+    """
+    if settings.DATABASE_ASYNC:
+        async with AsyncSessionLocal() as session:
+            yield session
+    else:
+        adapter = SyncSessionAdapter(SessionLocal())
+        try:
+            yield adapter
+        finally:
+            await adapter.close()
+
+# --- New Functions Added ---
 def get_sessionmaker(engine):
     """Factory function to create a new sessionmaker bound to the given engine."""
-    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+def get_async_sessionmaker(engine):
+    """Factory function to create a new async sessionmaker bound to the given async engine."""
+    return async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
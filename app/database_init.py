@@ -1,11 +1,31 @@
+from sqlalchemy import text
+
+from app.core.config import settings
 from app.database import engine
-from app.models.user import Base
+from app.database_migrations import target_metadata, upgrade
+from app.models import partitions
 
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    """
+    Create or upgrade the schema by applying the pending migrations, then
+    create the upcoming monthly partitions of calculations, if it is
+    partitioned.
+    """
+    upgrade(engine)
+    with engine.begin() as connection:
+        partitioned = partitions.is_partitioned(connection)
+        partitions.ensure_partitions(connection)
+    if partitioned != settings.CALCULATIONS_PARTITIONED:
+        print(
+            f"WARNING: the calculations table is {'' if partitioned else 'not '}partitioned but "
+            f"CALCULATIONS_PARTITIONED is {settings.CALCULATIONS_PARTITIONED}; the setting only "
+            f"applies when the table is created"
+        )
 
 def drop_db():
-    Base.metadata.drop_all(bind=engine)
+    target_metadata().drop_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
 
 if __name__ == "__main__":
-    init_db() # pragma: no cover
\ No newline at end of file
+    init_db() # pragma: no cover
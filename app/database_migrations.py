@@ -0,0 +1,218 @@
+# app/database_migrations.py
+"""
+Schema Migrations
+
+The schema is managed with Alembic migrations (migrations/versions),
+instead of Base.metadata.create_all() on every application start:
+
+- `python -m app.database_init` (run once per deploy, before the workers
+  start; see the Dockerfile) applies the pending migrations with upgrade().
+  A database created by create_all() before migrations existed is stamped
+  at the baseline revision first, so it is adopted as-is.
+- Every worker only checks on startup that the database is at the head
+  revision (check_revision()): a single primary-key read of
+  alembic_version, with no catalog introspection and no DDL locks.
+
+New migrations: `alembic revision --autogenerate -m "..."`, then review
+the generated file. Indexes on the large calculations and users tables
+should be built with create_index_concurrently(), which does not block
+writes while the index is built, and removed with
+drop_index_concurrently().
+"""
+
+import os
+from functools import lru_cache
+from typing import Optional, Sequence
+
+from alembic import command, op
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import MetaData, text
+from sqlalchemy.engine import Connection, Engine
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+# The first migration: the schema as create_all() built it
+BASELINE_REVISION = "0001"
+
+# pg_advisory_lock() key held while migrations run
+MIGRATION_LOCK_ID = 7_210_425_001
+
+
+def target_metadata() -> MetaData:
+    """The metadata of every model, for migrations and autogenerate."""
+    from app.models import calculation, collection_version, import_job, stats, user  # noqa: F401
+    return user.User.metadata
+
+
+def include_object(obj, name: str, type_: str, reflected: bool, compare_to) -> bool:
+    """
+    Autogenerate filter: leave out the partitions of calculations and their
+    indexes. They are managed by app.models.partitions, not by models.
+    """
+    from app.models.partitions import is_partition_name
+
+    if type_ == "table":
+        return not is_partition_name(name)
+    if type_ == "index" and obj.table is not None:
+        return not is_partition_name(obj.table.name)
+    return True
+
+
+def alembic_config(connection: Optional[Connection] = None) -> Config:
+    """Alembic configuration; migrations run on `connection` if given."""
+    config = Config(ALEMBIC_INI)
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+@lru_cache()
+def head_revision() -> str:
+    """The revision the code expects, read from the migration scripts."""
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(connection: Connection) -> Optional[str]:
+    """The revision the database is at, or None if it is not under migrations."""
+    if not connection.execute(text("SELECT to_regclass('alembic_version') IS NOT NULL")).scalar():
+        return None
+    return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def check_revision(connection: Connection) -> Optional[str]:
+    """
+    Startup check that the database schema is the one this code expects.
+
+    Returns:
+        Optional[str]: A warning if the database is at a revision this
+        code does not know, i.e. it was migrated by a newer release (the
+        normal state of old workers during a rolling deploy)
+
+    Raises:
+        RuntimeError: If the database is behind the code's head revision
+    """
+    current = current_revision(connection)
+    head = head_revision()
+    if current == head:
+        return None
+    known = {script.revision for script in ScriptDirectory.from_config(alembic_config()).walk_revisions()}
+    if current is not None and current not in known:
+        return f"database schema is at revision {current}, newer than this code ({head})"
+    raise RuntimeError(
+        f"Database schema is at revision {current}, but the code expects {head}; "
+        f"run `python -m app.database_init` (alembic upgrade head) first"
+    )
+
+
+def upgrade(engine: Engine, revision: str = "head") -> None:
+    """
+    Apply the pending migrations. A database that has the tables but no
+    alembic_version (created by create_all()) is stamped at the baseline
+    first.
+    """
+    with engine.connect() as connection:
+        config = alembic_config(connection)
+        adopt = (
+            current_revision(connection) is None
+            and connection.execute(text("SELECT to_regclass('users') IS NOT NULL")).scalar()
+        )
+        connection.commit()
+        if adopt:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
+
+
+# ------------------------------------------------------------------------------
+# Online index changes, for use inside migrations
+# ------------------------------------------------------------------------------
+def _relkind(name: str) -> Optional[str]:
+    return op.get_bind().execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"), {"name": name}
+    ).scalar()
+
+
+def _drop_if_invalid(name: str) -> None:
+    """Drop an index left INVALID by an interrupted concurrent build, so it is rebuilt."""
+    invalid = op.get_bind().execute(
+        text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"), {"name": name}
+    ).scalar()
+    if invalid and _relkind(name) == "i":
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def _index_sql(name: str, table_name: str, columns: Sequence[str], unique: bool, include: Sequence[str], how: str) -> str:
+    sql = f"CREATE {'UNIQUE ' if unique else ''}INDEX {how} {name} ON {table_name} ({', '.join(columns)})"
+    if include:
+        sql += f" INCLUDE ({', '.join(include)})"
+    return sql
+
+
+def create_index_concurrently(
+    index_name: str,
+    table_name: str,
+    columns: Sequence[str],
+    unique: bool = False,
+    include: Sequence[str] = (),
+) -> None:
+    """
+    CREATE INDEX CONCURRENTLY from a migration: the table stays writable
+    while the index is built. This runs outside the migration's
+    transaction, and is safe to re-run: an INVALID index left by an
+    interrupted build is dropped and built again.
+
+    Postgres cannot build an index on a partitioned table concurrently, so
+    on a partitioned table (see app.models.partitions) the index is created
+    on the parent only (invalid until complete), built concurrently on each
+    partition, and each partition's index is attached to it.
+
+    Args:
+        index_name: Name of the index
+        table_name: Table to index
+        columns: Column names or expressions
+        unique: Create a unique index
+        include: Non-key columns to store in the index (INCLUDE)
+    """
+    with op.get_context().autocommit_block():
+        _drop_if_invalid(index_name)
+        partitioned = op.get_bind().execute(
+            text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+            {"table": table_name},
+        ).scalar()
+        if not partitioned:
+            op.execute(_index_sql(index_name, table_name, columns, unique, include, "CONCURRENTLY IF NOT EXISTS"))
+            return
+
+        op.execute(_index_sql(index_name, f"ONLY {table_name}", columns, unique, include, "IF NOT EXISTS"))
+        partition_names = op.get_bind().execute(
+            text("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = to_regclass(:table)"),
+            {"table": table_name},
+        ).scalars().all()
+        for partition in partition_names:
+            child = index_name.replace(table_name, partition, 1) if table_name in index_name else f"{partition}_{index_name}"
+            child = child[:63]
+            _drop_if_invalid(child)
+            op.execute(_index_sql(child, partition, columns, unique, include, "CONCURRENTLY IF NOT EXISTS"))
+            attached = op.get_bind().execute(
+                text(
+                    "SELECT EXISTS (SELECT 1 FROM pg_inherits "
+                    "WHERE inhrelid = to_regclass(:child) AND inhparent = to_regclass(:parent))"
+                ),
+                {"child": child, "parent": index_name},
+            ).scalar()
+            if not attached:
+                op.execute(f"ALTER INDEX {index_name} ATTACH PARTITION {child}")
+
+
+def drop_index_concurrently(index_name: str) -> None:
+    """
+    DROP INDEX CONCURRENTLY from a migration, outside its transaction.
+    An index of a partitioned table cannot be dropped concurrently; it is
+    dropped with a plain DROP INDEX, which is brief.
+    """
+    with op.get_context().autocommit_block():
+        relkind = _relkind(index_name)
+        if relkind == "I":
+            op.execute(f"DROP INDEX IF EXISTS {index_name}")
+        elif relkind is not None:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
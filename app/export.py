@@ -0,0 +1,242 @@
+# app/export.py
+"""
+Calculation Export Module
+
+Streams a user's calculations as NDJSON, CSV or Parquet for
+GET /calculations/export.
+
+Rows are read through a server-side cursor (stream_results / yield_per)
+and are encoded one chunk at a time. Each encoded chunk is yielded to the
+StreamingResponse as soon as it is ready, so memory use depends on
+CALCULATIONS_EXPORT_CHUNK_SIZE and not on how many calculations the user
+has. Only the exported columns are selected, and rows are never turned
+into ORM objects.
+
+The stream opens its own connection: it is still running after the route
+has returned, when the request's session is already closed.
+
+Formats:
+- ndjson:  One JSON object per line.
+- csv:     A header row, then one row per calculation. `inputs` is a JSON
+           array.
+- parquet: One row group per chunk. The footer is written when the stream
+           ends. This format requires the optional pyarrow package.
+"""
+
+import csv
+import io
+import json
+import logging
+from array import array
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterator, List, Optional, Sequence
+import uuid
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.calculation_reads import columns, user_calculations_query
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = ("id", "type", "inputs", "result", "created_at", "updated_at")
+
+EXPORT_FORMATS = ("ndjson", "csv", "parquet")
+
+
+def export_query(
+    user_id: uuid.UUID,
+    calculation_type: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+):
+    """
+    SELECT of the exported columns of a user's calculations, newest first.
+
+    This is the column projection of app.models.calculation_reads, so the
+    cursor walks the (user_id, created_at, id) index and Postgres does not
+    sort.
+    """
+    return user_calculations_query(
+        user_id,
+        calculation_type=calculation_type,
+        created_after=created_after,
+        created_before=created_before,
+        entities=columns(EXPORT_COLUMNS),
+    )
+
+
+def _inputs_list(inputs) -> List[float]:
+    return inputs.tolist() if isinstance(inputs, array) else list(inputs)
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+class ExportEncoder:
+    """Turns chunks of rows into bytes. Subclasses implement one format."""
+
+    media_type = "application/octet-stream"
+    extension = "bin"
+
+    def begin(self) -> bytes:
+        """Bytes sent before the first row (e.g. a header)."""
+        return b""
+
+    def encode(self, rows: Sequence[Any]) -> bytes:
+        raise NotImplementedError
+
+    def end(self) -> bytes:
+        """Bytes sent after the last row (e.g. a footer)."""
+        return b""
+
+
+class NDJSONEncoder(ExportEncoder):
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def encode(self, rows: Sequence[Any]) -> bytes:
+        lines = [
+            json.dumps({
+                "id": str(row.id),
+                "type": row.type,
+                "inputs": _inputs_list(row.inputs),
+                "result": row.result,
+                "created_at": _isoformat(row.created_at),
+                "updated_at": _isoformat(row.updated_at),
+            })
+            for row in rows
+        ]
+        return ("\n".join(lines) + "\n").encode()
+
+
+class CSVEncoder(ExportEncoder):
+    media_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _flush(self) -> bytes:
+        data = self._buffer.getvalue().encode()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def begin(self) -> bytes:
+        self._writer.writerow(EXPORT_COLUMNS)
+        return self._flush()
+
+    def encode(self, rows: Sequence[Any]) -> bytes:
+        self._writer.writerows(
+            (
+                row.id,
+                row.type,
+                json.dumps(_inputs_list(row.inputs)),
+                "" if row.result is None else repr(row.result),
+                _isoformat(row.created_at),
+                _isoformat(row.updated_at) or "",
+            )
+            for row in rows
+        )
+        return self._flush()
+
+
+class ParquetEncoder(ExportEncoder):
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:  # pragma: no cover - depends on the environment
+            raise ValueError("Parquet export requires the pyarrow package.") from e
+        self._pa = pa
+        self._schema = pa.schema([
+            ("id", pa.string()),
+            ("type", pa.string()),
+            ("inputs", pa.list_(pa.float64())),
+            ("result", pa.float64()),
+            ("created_at", pa.timestamp("us")),
+            ("updated_at", pa.timestamp("us")),
+        ])
+        self._buffer = io.BytesIO()
+        self._writer = pq.ParquetWriter(self._buffer, self._schema)
+
+    def _flush(self) -> bytes:
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def begin(self) -> bytes:
+        # The writer has already emitted the leading magic bytes
+        return self._flush()
+
+    def encode(self, rows: Sequence[Any]) -> bytes:
+        table = self._pa.Table.from_pydict(
+            {
+                "id": [str(row.id) for row in rows],
+                "type": [row.type for row in rows],
+                "inputs": [_inputs_list(row.inputs) for row in rows],
+                "result": [row.result for row in rows],
+                "created_at": [row.created_at for row in rows],
+                "updated_at": [row.updated_at for row in rows],
+            },
+            schema=self._schema,
+        )
+        self._writer.write_table(table)
+        return self._flush()
+
+    def end(self) -> bytes:
+        self._writer.close()
+        return self._flush()
+
+
+_ENCODERS = {"ndjson": NDJSONEncoder, "csv": CSVEncoder, "parquet": ParquetEncoder}
+
+
+def get_encoder(export_format: str) -> ExportEncoder:
+    """
+    Create the encoder of a format.
+
+    Raises:
+        ValueError: If the format is unknown or its dependencies are missing
+    """
+    if export_format not in _ENCODERS:
+        raise ValueError(f"Unsupported export format: {export_format!r}")
+    return _ENCODERS[export_format]()
+
+
+def stream_export(engine: Engine, query, encoder: ExportEncoder, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Encode the rows of `query` chunk by chunk, reading them through a
+    server-side cursor on a connection of its own.
+    """
+    chunk_size = chunk_size or settings.CALCULATIONS_EXPORT_CHUNK_SIZE
+    yield encoder.begin()
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=chunk_size).execute(query)
+        for rows in result.partitions():
+            metrics.incr("export.rows", len(rows))
+            yield encoder.encode(rows)
+    yield encoder.end()
+
+
+async def stream_export_async(
+    engine: AsyncEngine, query, encoder: ExportEncoder, chunk_size: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """Async variant of stream_export() for the asyncpg engine."""
+    chunk_size = chunk_size or settings.CALCULATIONS_EXPORT_CHUNK_SIZE
+    yield encoder.begin()
+    async with engine.connect() as connection:
+        result = await connection.stream(query.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions():
+            metrics.incr("export.rows", len(rows))
+            yield encoder.encode(rows)
+    yield encoder.end()
@@ -0,0 +1,7 @@
+# app/jobs/__init__.py
+"""
+Offline maintenance jobs.
+
+Each module in this package can be run as a script, e.g.:
+    python -m app.jobs.recompute --help
+"""
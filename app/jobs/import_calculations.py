@@ -0,0 +1,382 @@
+# app/jobs/import_calculations.py
+"""
+Calculation Import Job
+
+Loads calculations from a CSV or NDJSON file, for POST /calculations/import
+and from the command line.
+
+How it works:
+1. The upload is saved to CALCULATIONS_IMPORT_DIR in 1 MiB blocks, and the
+   request returns a job id right away. The job runs on a small thread pool
+   (ImportRunner).
+2. The file is parsed one record at a time, never read whole:
+   - CSV needs a header with `type` and `inputs` columns, where `inputs`
+     is a JSON array. Other columns are ignored, so a CSV from
+     GET /calculations/export can be imported again.
+   - NDJSON has one {"type": ..., "inputs": [...]} object per line.
+   Each record is validated against CalculationBase.
+3. Every CALCULATIONS_IMPORT_BATCH_SIZE valid records are evaluated per type
+   through the result cache (app.operations.result_cache). Cache misses go
+   to Calculation.evaluate_many(), i.e. the vectorized kernel. They are
+   then written with COPY calculations FROM STDIN. The progress counters
+   are updated in the same transaction, so the counters always match what
+   is stored.
+4. Rejected records are appended to a CSV error file (line, detail). The
+   file can be downloaded from GET /calculations/import/{job_id}/errors.
+
+A batch is committed as soon as it is loaded. If a job fails half-way, the
+rows of its completed batches stay imported, and rows_imported says how
+many there are.
+
+Usage:
+    python -m app.jobs.import_calculations --user-id <uuid> data.csv
+    python -m app.jobs.import_calculations --user-id <uuid> --format ndjson data.jsonl
+"""
+
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.ids import new_id
+from app.core.metrics import metrics
+from app.database import engine as default_engine
+from app.models.calculation import Calculation
+from app.models.collection_version import CalculationCollectionVersion
+from app.models.import_job import (
+    IMPORT_COMPLETED, IMPORT_FAILED, IMPORT_RUNNING, CalculationImportJob,
+)
+from app.models.user import User  # noqa: F401 - registers the User mapper
+from app.operations import result_cache
+from app.schemas.calculation import CalculationBase
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+_EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+_CONTENT_TYPES = {"text/csv": "csv", "application/x-ndjson": "ndjson", "application/jsonl": "ndjson"}
+
+_COPY_SQL = (
+    "COPY calculations (id, user_id, type, inputs, result, created_at, updated_at) "
+    "FROM STDIN WITH (FORMAT csv)"
+)
+
+
+# ------------------------------------------------------------------------------
+# Files
+# ------------------------------------------------------------------------------
+def import_dir() -> str:
+    """Directory holding uploads and error files (created on demand)."""
+    path = settings.CALCULATIONS_IMPORT_DIR or os.path.join(tempfile.gettempdir(), "calculation-imports")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def upload_path(job_id: uuid.UUID) -> str:
+    return os.path.join(import_dir(), f"{job_id}.upload")
+
+
+def error_file_path(job_id: uuid.UUID) -> str:
+    return os.path.join(import_dir(), f"{job_id}.errors.csv")
+
+
+def save_upload(source: BinaryIO, job_id: uuid.UUID) -> str:
+    """Copy an uploaded file to the import directory in blocks. Returns its path."""
+    path = upload_path(job_id)
+    with open(path, "wb") as target:
+        shutil.copyfileobj(source, target, 1024 * 1024)
+    return path
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    """
+    Infer the import format from the file name or content type.
+
+    Raises:
+        ValueError: If neither identifies a supported format
+    """
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension in _EXTENSIONS:
+        return _EXTENSIONS[extension]
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in _CONTENT_TYPES:
+        return _CONTENT_TYPES[media_type]
+    raise ValueError("Cannot tell the file format; pass ?format=csv or ?format=ndjson.")
+
+
+# ------------------------------------------------------------------------------
+# Parsing
+# ------------------------------------------------------------------------------
+Record = Tuple[int, Optional[dict], Optional[str]]
+
+
+def _iter_csv(text: io.TextIOBase) -> Iterator[Record]:
+    reader = csv.DictReader(text)
+    if reader.fieldnames is None or not {"type", "inputs"} <= set(reader.fieldnames):
+        raise ValueError("CSV header must contain 'type' and 'inputs' columns.")
+    for row in reader:
+        try:
+            inputs = json.loads(row["inputs"])
+        except (TypeError, ValueError):
+            yield reader.line_num, None, "inputs must be a JSON array, e.g. [1, 2]"
+            continue
+        yield reader.line_num, {"type": row["type"], "inputs": inputs}, None
+
+
+def _iter_ndjson(text: io.TextIOBase) -> Iterator[Record]:
+    for line_number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Each line must be a JSON object"
+            continue
+        yield line_number, record, None
+
+
+def iter_records(text: io.TextIOBase, import_format: str) -> Iterator[Record]:
+    """
+    Parse a text stream incrementally.
+
+    Yields:
+        (line number, record, None) for parsed records, or
+        (line number, None, error message) for unparseable ones
+    """
+    if import_format == "csv":
+        return _iter_csv(text)
+    if import_format == "ndjson":
+        return _iter_ndjson(text)
+    raise ValueError(f"Unsupported import format: {import_format!r}")
+
+
+# ------------------------------------------------------------------------------
+# Loading
+# ------------------------------------------------------------------------------
+def _copy_batch(connection, user_id: uuid.UUID, rows: List[Tuple[str, List[float], float]]) -> None:
+    """Load (type, inputs, result) rows with COPY FROM STDIN."""
+    inputs_type = Calculation.__table__.c.inputs.type
+    now = datetime.utcnow().isoformat()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for calculation_type, inputs, result in rows:
+        writer.writerow((new_id(), user_id, calculation_type, inputs_type.copy_literal(inputs), repr(float(result)), now, now))
+    buffer.seek(0)
+    with connection.connection.cursor() as cursor:
+        cursor.copy_expert(_COPY_SQL, buffer)
+
+
+class _ImportBatch:
+    """Valid records waiting to be evaluated and loaded."""
+
+    def __init__(self):
+        self.lines: List[int] = []
+        self.records: List[CalculationBase] = []
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add(self, line_number: int, record: CalculationBase) -> None:
+        self.lines.append(line_number)
+        self.records.append(record)
+
+    def evaluate(self) -> Tuple[List[Tuple[str, List[float], float]], List[Tuple[int, str]]]:
+        """Compute results per type. Returns the loadable rows and the (line, error) failures."""
+        groups: Dict[str, List[int]] = defaultdict(list)
+        for index, record in enumerate(self.records):
+            groups[record.type.value].append(index)
+        rows, errors = [], []
+        for calculation_type, indices in groups.items():
+            inputs_list = [self.records[index].inputs for index in indices]
+            results, failed = result_cache.evaluate_many(calculation_type, inputs_list)
+            for position, index in enumerate(indices):
+                if position in failed:
+                    errors.append((self.lines[index], failed[position]))
+                else:
+                    rows.append((calculation_type, inputs_list[position], results[position]))
+        return rows, errors
+
+
+def run_import(
+    job_id: uuid.UUID,
+    path: Optional[str] = None,
+    engine: Engine = default_engine,
+    batch_size: Optional[int] = None,
+) -> CalculationImportJob:
+    """
+    Run an import job to completion.
+
+    Args:
+        job_id: The CalculationImportJob to run
+        path: File to import (default: the job's saved upload, which is
+            deleted afterwards)
+        engine: Engine to load into
+        batch_size: Records per COPY (default: CALCULATIONS_IMPORT_BATCH_SIZE)
+
+    Returns:
+        CalculationImportJob: The job in its final state
+    """
+    batch_size = batch_size or settings.CALCULATIONS_IMPORT_BATCH_SIZE
+    owns_upload = path is None
+    path = path or upload_path(job_id)
+    with Session(engine) as db:
+        job = db.get(CalculationImportJob, job_id)
+        if job is None:
+            raise ValueError(f"Unknown import job {job_id}")
+        user_id, import_format = job.user_id, job.format
+
+    started = time.perf_counter()
+    counters = {"rows_read": 0, "rows_imported": 0, "rows_failed": 0}
+    with engine.connect() as connection, open(error_file_path(job_id), "w", newline="") as error_file:
+        errors = csv.writer(error_file)
+        errors.writerow(("line", "detail"))
+
+        def reject(line_number: int, detail: str) -> None:
+            counters["rows_failed"] += 1
+            errors.writerow((line_number, detail))
+
+        def flush(batch: _ImportBatch) -> None:
+            rows, failures = batch.evaluate()
+            for line_number, detail in failures:
+                reject(line_number, detail)
+            with connection.begin():
+                if rows:
+                    _copy_batch(connection, user_id, rows)
+                    CalculationCollectionVersion.bump(connection, user_id)
+                counters["rows_imported"] += len(rows)
+                CalculationImportJob.update_progress(connection, job_id, **counters)
+            error_file.flush()
+            metrics.incr("import.rows", len(rows))
+
+        try:
+            with connection.begin():
+                CalculationImportJob.update_progress(connection, job_id, status=IMPORT_RUNNING)
+            batch = _ImportBatch()
+            with open(path, encoding="utf-8", newline="") as text:
+                for line_number, record, error in iter_records(text, import_format):
+                    counters["rows_read"] += 1
+                    if error is not None:
+                        reject(line_number, error)
+                        continue
+                    try:
+                        batch.add(line_number, CalculationBase.model_validate(record))
+                    except ValidationError as e:
+                        reject(line_number, "; ".join(err["msg"] for err in e.errors()))
+                        continue
+                    if len(batch) >= batch_size:
+                        flush(batch)
+                        batch = _ImportBatch()
+            flush(batch)
+            final = {"status": IMPORT_COMPLETED}
+        except Exception as e:
+            logger.exception("Import job %s failed", job_id)
+            if connection.in_transaction():
+                connection.rollback()
+            final = {"status": IMPORT_FAILED, "error": str(e)}
+        with connection.begin():
+            CalculationImportJob.update_progress(connection, job_id, finished_at=datetime.utcnow(), **final)
+
+    if owns_upload and os.path.exists(path):
+        os.remove(path)
+    elapsed = time.perf_counter() - started
+    metrics.observe("import.job_time", elapsed)
+    logger.info(
+        "Import job %s %s: %d read, %d imported, %d rejected in %.2fs",
+        job_id, final["status"], counters["rows_read"], counters["rows_imported"], counters["rows_failed"], elapsed,
+    )
+    with Session(engine) as db:
+        return db.get(CalculationImportJob, job_id)
+
+
+# ------------------------------------------------------------------------------
+# Background execution
+# ------------------------------------------------------------------------------
+class ImportRunner:
+    """Runs import jobs on a small thread pool. Started and stopped by the FastAPI lifespan."""
+
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: Dict[uuid.UUID, Future] = {}
+        self._lock = threading.Lock()
+        metrics.register_gauge("import.jobs_in_flight", lambda: len(self._futures))
+
+    def start(self) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.CALCULATIONS_IMPORT_WORKERS, thread_name_prefix="calculation-import"
+                )
+
+    def submit(self, job_id: uuid.UUID) -> Future:
+        """Queue a job whose upload has been saved with save_upload()."""
+        self.start()
+        with self._lock:
+            future = self._executor.submit(run_import, job_id)
+            self._futures[job_id] = future
+        future.add_done_callback(lambda _: self._futures.pop(job_id, None))
+        return future
+
+    def shutdown(self) -> None:
+        """
+        Wait for running jobs to finish. Jobs that have not started are
+        marked failed so they do not stay pending forever.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+            queued = dict(self._futures)
+        if executor is None:
+            return
+        executor.shutdown(wait=True, cancel_futures=True)
+        cancelled = [job_id for job_id, future in queued.items() if future.cancelled()]
+        if cancelled:
+            with default_engine.begin() as connection:
+                for job_id in cancelled:
+                    CalculationImportJob.update_progress(
+                        connection, job_id, status=IMPORT_FAILED,
+                        error="The server shut down before the import started.", finished_at=datetime.utcnow(),
+                    )
+
+
+import_runner = ImportRunner()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import calculations from a CSV or NDJSON file.")
+    parser.add_argument("path", help="File to import")
+    parser.add_argument("--user-id", type=uuid.UUID, required=True, help="Owner of the imported calculations")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="File format (default: from the extension)")
+    parser.add_argument("--batch-size", type=int, help="Records per COPY")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    import_format = args.format or detect_format(args.path, None)
+    with Session(default_engine) as db:
+        job = CalculationImportJob.create(db, args.user_id, import_format, os.path.basename(args.path))
+        db.commit()
+        job_id = job.id
+    job = run_import(job_id, path=args.path, batch_size=args.batch_size)
+    print(f"{job.status}: {job.rows_imported} imported, {job.rows_failed} rejected (see {error_file_path(job_id)})")
+
+
+if __name__ == "__main__":
+    main()
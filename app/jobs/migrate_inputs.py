@@ -0,0 +1,263 @@
+# app/jobs/migrate_inputs.py
+"""
+Inputs Storage Migration Job
+
+Converts the calculations.inputs column between the storage modes of
+app.models.types.FloatList: "json", "array" (float8[]) and "binary" (packed
+big-endian float64).
+
+The conversion runs online, without holding a table lock for the whole
+backfill:
+1. A new column `inputs_new` of the target type is added, together with a
+   trigger that clears it whenever a row is updated by anything other than
+   this job. Rows written or changed during the backfill are therefore
+   picked up again instead of keeping a stale copy.
+2. Rows whose inputs_new is NULL are converted in chunks in primary key
+   order, one commit per chunk. Each chunk starts after the last id of the
+   previous one (keyset paging), so converted rows are not scanned again.
+   JSON and float8[] sources are converted in SQL
+   (json_array_elements_text / unnest, then array(...), float8send() or
+   json_agg). Binary sources cannot be decoded in SQL, so those chunks are
+   converted in Python.
+3. In one short transaction under an ACCESS EXCLUSIVE lock, the remaining
+   rows are converted, the trigger and the old column are dropped, and
+   inputs_new is renamed to inputs.
+
+After the swap, set CALCULATION_INPUTS_STORAGE to the target mode and
+restart the app. Until then the running app cannot read or write the
+converted column.
+
+Usage:
+    python -m app.jobs.migrate_inputs --to binary
+    python -m app.jobs.migrate_inputs --to array --chunk-size 20000
+"""
+
+import argparse
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.engine import Connection, Engine
+
+from app.database import engine as default_engine
+from app.models.types import INPUT_STORAGE_MODES, FloatList
+
+logger = logging.getLogger(__name__)
+
+# information_schema.columns.data_type -> storage mode
+_DATA_TYPES = {"json": "json", "jsonb": "json", "ARRAY": "array", "bytea": "binary"}
+
+_COLUMN_TYPES = {"json": "json", "array": "double precision[]", "binary": "bytea"}
+
+# Rows of the source column as (value text/float8, ordinality)
+_ELEMENTS = {
+    "json": "json_array_elements_text(t.inputs::json) WITH ORDINALITY AS e(value, ord)",
+    "array": "unnest(t.inputs) WITH ORDINALITY AS e(value, ord)",
+}
+
+# Build the target value from the element rows, keeping the input order
+_TARGETS = {
+    "json": "COALESCE((SELECT json_agg(e.value::float8 ORDER BY e.ord) FROM {elements}), '[]'::json)",
+    "array": "ARRAY(SELECT e.value::float8 FROM {elements} ORDER BY e.ord)",
+    "binary": "COALESCE((SELECT string_agg(float8send(e.value::float8), ''::bytea ORDER BY e.ord) FROM {elements}), ''::bytea)",
+}
+
+# Keyset start: the nil UUID sorts before every id
+_FIRST_ID = uuid.UUID(int=0)
+
+
+@dataclass
+class MigrationStats:
+    """Counters reported by migrate_inputs()."""
+    source: str
+    target: str
+    rows_converted: int = 0
+    chunks: int = 0
+    elapsed: float = 0.0
+
+
+def current_storage(connection: Connection, table_name: str = "calculations") -> Optional[str]:
+    """
+    Return the storage mode of the table's inputs column, or None if the table does not exist.
+    """
+    data_type = connection.execute(
+        text(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = :table AND column_name = 'inputs'"
+        ),
+        {"table": table_name},
+    ).scalar()
+    if data_type is None:
+        return None
+    if data_type not in _DATA_TYPES:
+        raise ValueError(f"Unsupported inputs column type: {data_type}")
+    return _DATA_TYPES[data_type]
+
+
+def _pending_chunk(table_name: str) -> str:
+    """
+    SELECT of the next chunk of pending rows after :last_id, by primary key.
+
+    Paging by keyset starts each chunk where the previous one ended instead
+    of rescanning the rows that are already converted.
+    """
+    return f"SELECT id FROM {table_name} WHERE id > :last_id AND inputs_new IS NULL ORDER BY id LIMIT :limit"
+
+
+def _convert_chunk_sql(
+    connection: Connection, table_name: str, source: str, target: str, chunk_size: int, last_id: uuid.UUID
+) -> Tuple[int, Optional[uuid.UUID]]:
+    """
+    Convert up to chunk_size pending rows after last_id in SQL.
+
+    Returns:
+        Tuple[int, Optional[uuid.UUID]]: Rows converted and the id of the last one
+    """
+    expression = _TARGETS[target].format(elements=_ELEMENTS[source])
+    row = connection.execute(
+        text(
+            f"WITH chunk AS ({_pending_chunk(table_name)}), "
+            f"converted AS (UPDATE {table_name} AS t SET inputs_new = {expression} "
+            f"FROM chunk WHERE t.id = chunk.id RETURNING t.id) "
+            f"SELECT (SELECT count(*) FROM converted) AS count, "
+            f"(SELECT id FROM converted ORDER BY id DESC LIMIT 1) AS last_id"
+        ).bindparams(bindparam("last_id", type_=UUID(as_uuid=True))).columns(last_id=UUID(as_uuid=True)),
+        {"limit": chunk_size, "last_id": last_id},
+    ).one()
+    return row.count, row.last_id
+
+
+def _convert_chunk_python(
+    connection: Connection, table_name: str, target: str, chunk_size: int, last_id: uuid.UUID
+) -> Tuple[int, Optional[uuid.UUID]]:
+    """Convert up to chunk_size pending rows after last_id from binary storage in Python."""
+    source_type = FloatList("binary")
+    target_type = FloatList(target)
+    rows = connection.execute(
+        text(
+            f"SELECT id, inputs FROM {table_name} WHERE id IN ({_pending_chunk(table_name)}) ORDER BY id"
+        ).bindparams(bindparam("last_id", type_=UUID(as_uuid=True))).columns(
+            id=UUID(as_uuid=True), inputs=source_type
+        ),
+        {"limit": chunk_size, "last_id": last_id},
+    ).all()
+    if not rows:
+        return 0, None
+    connection.execute(
+        text(f"UPDATE {table_name} SET inputs_new = :inputs WHERE id = :id").bindparams(
+            bindparam("inputs", type_=target_type), bindparam("id", type_=UUID(as_uuid=True))
+        ),
+        [{"id": row.id, "inputs": row.inputs} for row in rows],
+    )
+    return len(rows), rows[-1].id
+
+
+def migrate_inputs(
+    target: str,
+    engine: Engine = default_engine,
+    table_name: str = "calculations",
+    chunk_size: int = 10000,
+) -> MigrationStats:
+    """
+    Convert the inputs column of a table to another storage mode.
+
+    Safe to re-run: an interrupted backfill continues with the rows that
+    are still pending.
+
+    Args:
+        target: "json", "array" or "binary"
+        engine: Engine to run the migration on
+        table_name: Table holding the inputs column
+        chunk_size: Rows converted per transaction during the backfill
+
+    Returns:
+        MigrationStats: Source and target mode, rows converted and timing
+    """
+    if target not in INPUT_STORAGE_MODES:
+        raise ValueError(f"Unknown inputs storage mode: {target!r}")
+
+    started = time.perf_counter()
+    with engine.connect() as connection:
+        source = current_storage(connection, table_name)
+        if source is None:
+            raise ValueError(f"Table {table_name} has no inputs column")
+        stats = MigrationStats(source=source, target=target)
+        if source == target:
+            logger.info("%s.inputs is already stored as %s", table_name, target)
+            return stats
+
+        trigger_function = f"{table_name}_inputs_new_reset"
+        connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS inputs_new {_COLUMN_TYPES[target]}"))
+        connection.execute(text(f"""
+            CREATE OR REPLACE FUNCTION {trigger_function}() RETURNS trigger AS $$
+            BEGIN
+                -- Any update that does not set inputs_new invalidates it
+                IF NEW.inputs_new::text IS NOT DISTINCT FROM OLD.inputs_new::text THEN
+                    NEW.inputs_new := NULL;
+                END IF;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+        """))
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger_function} ON {table_name}"))
+        connection.execute(text(
+            f"CREATE TRIGGER {trigger_function} BEFORE UPDATE ON {table_name} "
+            f"FOR EACH ROW EXECUTE FUNCTION {trigger_function}()"
+        ))
+        connection.commit()
+
+        def convert_chunk(last_id: uuid.UUID) -> Tuple[int, Optional[uuid.UUID]]:
+            if source == "binary":
+                return _convert_chunk_python(connection, table_name, target, chunk_size, last_id)
+            return _convert_chunk_sql(connection, table_name, source, target, chunk_size, last_id)
+
+        last_id = _FIRST_ID
+        while True:
+            converted, last_id = convert_chunk(last_id)
+            connection.commit()
+            if not converted:
+                break
+            stats.rows_converted += converted
+            stats.chunks += 1
+            logger.info("Chunk %d: %d rows converted (%d total)", stats.chunks, converted, stats.rows_converted)
+
+        # Swap: rows changed behind the keyset since their conversion are
+        # still pending, so one more pass starts from the first id
+        connection.execute(text(f"LOCK TABLE {table_name} IN ACCESS EXCLUSIVE MODE"))
+        last_id = _FIRST_ID
+        while True:
+            converted, last_id = convert_chunk(last_id)
+            if not converted:
+                break
+            stats.rows_converted += converted
+        connection.execute(text(f"DROP TRIGGER {trigger_function} ON {table_name}"))
+        connection.execute(text(f"DROP FUNCTION {trigger_function}()"))
+        connection.execute(text(f"ALTER TABLE {table_name} DROP COLUMN inputs"))
+        connection.execute(text(f"ALTER TABLE {table_name} RENAME COLUMN inputs_new TO inputs"))
+        connection.execute(text(f"ALTER TABLE {table_name} ALTER COLUMN inputs SET NOT NULL"))
+        connection.commit()
+
+    stats.elapsed = time.perf_counter() - started
+    logger.info(
+        "Migrated %s.inputs from %s to %s: %d rows in %.2fs",
+        table_name, source, target, stats.rows_converted, stats.elapsed,
+    )
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert calculations.inputs to another storage mode.")
+    parser.add_argument("--to", dest="target", required=True, choices=INPUT_STORAGE_MODES, help="Target storage mode")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows converted per transaction")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    migrate_inputs(args.target, chunk_size=args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# app/jobs/partition_maintenance.py
+"""
+Calculation Partition Maintenance Job
+
+Maintains the monthly partitions of a partitioned calculations table
+(CALCULATIONS_PARTITIONED; see app.models.partitions):
+
+1. Creates the partitions of the current month and of the next
+   CALCULATIONS_PARTITION_MONTHS_AHEAD months, so new rows never land in
+   the default partition.
+2. With CALCULATIONS_RETENTION_MONTHS set, drops the partitions of the
+   months before the retention window. Dropping a partition is a catalog
+   operation, so removing a month of calculations takes milliseconds and
+   leaves nothing to vacuum. The list caches and stats rollups of the
+   affected users are invalidated first.
+
+Run it periodically, e.g. daily from cron. `python -m app.database_init`
+also creates the upcoming partitions on every deploy; the application
+workers never do. Concurrent runs are serialized by an advisory lock. On an
+unpartitioned table this is a no-op.
+
+Usage:
+    python -m app.jobs.partition_maintenance
+    python -m app.jobs.partition_maintenance --months-ahead 6 --retention-months 24
+"""
+
+import argparse
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy.engine import Engine
+
+from app.database import engine as default_engine
+from app.models import partitions
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PartitionStats:
+    """Counters reported by maintain_partitions()."""
+    created: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+def maintain_partitions(
+    engine: Engine = default_engine,
+    now: Optional[datetime] = None,
+    months_ahead: Optional[int] = None,
+    retention_months: Optional[int] = None,
+) -> PartitionStats:
+    """
+    Create upcoming partitions and drop expired ones.
+
+    Args:
+        engine: Engine to run on
+        now: Current time (default: datetime.utcnow())
+        months_ahead: Upcoming months to create
+            (default: settings.CALCULATIONS_PARTITION_MONTHS_AHEAD)
+        retention_months: Complete months to keep before the current one
+            (default: settings.CALCULATIONS_RETENTION_MONTHS; None keeps all)
+
+    Returns:
+        PartitionStats: Partitions created and dropped, and timing
+    """
+    stats = PartitionStats()
+    started = time.perf_counter()
+    with engine.connect() as connection:
+        if not partitions.is_partitioned(connection):
+            logger.info("Partition maintenance: the calculations table is not partitioned")
+            return stats
+        stats.created = partitions.ensure_partitions(connection, now, months_ahead)
+        connection.commit()
+        stats.dropped = partitions.drop_expired_partitions(connection, now, retention_months)
+
+    stats.elapsed = time.perf_counter() - started
+    logger.info(
+        "Partition maintenance: %d partitions created, %d dropped in %.2fs",
+        len(stats.created), len(stats.dropped), stats.elapsed,
+    )
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Create upcoming and drop expired calculation partitions.")
+    parser.add_argument("--months-ahead", type=int, help="Upcoming monthly partitions to create")
+    parser.add_argument("--retention-months", type=int, help="Months to keep before the current one")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    maintain_partitions(months_ahead=args.months_ahead, retention_months=args.retention_months)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# app/jobs/recompute.py
+"""
+Batch Recompute Job
+
+Re-evaluates the stored `result` of calculations in bulk, e.g. after fixing a
+numeric bug or changing precision rules.
+
+How it works:
+1. Rows are streamed from the calculations table through a server-side cursor
+   (stream_results + yield_per), ordered by primary key, one chunk at a time.
+   Memory use is bounded by the chunk size, not by the table size.
+2. Each chunk is grouped by calculation type and every group is evaluated
+   with Calculation.evaluate_many(), i.e. the vectorized batch kernel. Rows
+   whose result comes out unchanged are not written, so a run without a
+   change to the operations writes nothing.
+3. Changed results are written back with one set-based
+   UPDATE ... FROM (VALUES ...) statement per chunk, on a separate
+   connection, and committed.
+4. After each commit the id of the last row is the checkpoint. A run can be
+   resumed from it with --after, or automatically with --checkpoint FILE.
+5. If any result changed, every stats rollup (app.models.stats) is marked
+   dirty, so it is rebuilt on its next read.
+
+Usage:
+    python -m app.jobs.recompute
+    python -m app.jobs.recompute --type division --type root --chunk-size 10000
+    python -m app.jobs.recompute --checkpoint /tmp/recompute.ckpt
+"""
+
+import argparse
+import logging
+import os
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from sqlalchemy import Float, column, select, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.engine import Engine
+
+from app.database import engine as default_engine
+from app.models.calculation import Calculation
+from app.models.collection_version import CalculationCollectionVersion
+from app.models.stats import CalculationStatsRollupState
+from app.models.user import User  # noqa: F401 - registers the User mapper
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RecomputeStats:
+    """Counters reported by recompute_results()."""
+    rows_read: int = 0
+    rows_updated: int = 0
+    rows_failed: int = 0
+    chunks: int = 0
+    elapsed: float = 0.0
+    last_id: Optional[uuid.UUID] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        """Overall read throughput of the run."""
+        return self.rows_read / self.elapsed if self.elapsed else 0.0
+
+
+def read_checkpoint(path: str) -> Optional[uuid.UUID]:
+    """Return the id stored in a checkpoint file, or None if there is none."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        text = f.read().strip()
+    return uuid.UUID(text) if text else None
+
+
+def write_checkpoint(path: str, last_id: uuid.UUID) -> None:
+    """Atomically store the id of the last committed row."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(str(last_id))
+    os.replace(tmp_path, path)
+
+
+def _update_results(connection, changes: List[tuple]) -> int:
+    """
+    Write (id, result) pairs back with a single UPDATE ... FROM (VALUES ...).
+
+    Rows whose stored result is already equal are skipped by the WHERE
+    clause, so unchanged rows are not rewritten. The collection version of
+    every user with a changed row is bumped in the same transaction.
+
+    Returns:
+        int: Number of rows actually updated
+    """
+    if not changes:
+        return 0
+    table = Calculation.__table__
+    new_results = values(
+        column("id", UUID(as_uuid=True)),
+        column("result", Float),
+        name="new_results",
+    ).data(changes)
+    stmt = (
+        update(table)
+        .where(table.c.id == new_results.c.id)
+        .where(table.c.result.is_distinct_from(new_results.c.result))
+        .values(result=new_results.c.result, updated_at=datetime.utcnow())
+        .returning(table.c.user_id)
+    )
+    user_ids = connection.execute(stmt).scalars().all()
+    # Changed results change the owners' list representations (ETags)
+    for user_id in set(user_ids):
+        CalculationCollectionVersion.bump(connection, user_id)
+    return len(user_ids)
+
+
+def recompute_results(
+    engine: Engine = default_engine,
+    chunk_size: int = 5000,
+    calculation_types: Optional[Iterable[str]] = None,
+    after: Optional[uuid.UUID] = None,
+    checkpoint: Optional[str] = None,
+    dry_run: bool = False,
+) -> RecomputeStats:
+    """
+    Recompute stored calculation results in chunks.
+
+    Args:
+        engine: Engine to read from and write to
+        chunk_size: Rows per server-side cursor fetch and per UPDATE
+        calculation_types: Only recompute these types (default: all)
+        after: Resume after this calculation id (exclusive)
+        checkpoint: Optional file used to resume and to record progress
+        dry_run: Evaluate everything but do not write any results
+
+    Returns:
+        RecomputeStats: Counters and throughput for the run
+    """
+    if after is None and checkpoint:
+        after = read_checkpoint(checkpoint)
+        if after is not None:
+            logger.info("Resuming after checkpoint %s", after)
+
+    table = Calculation.__table__
+    query = select(table.c.id, table.c.type, table.c.inputs).order_by(table.c.id)
+    if calculation_types:
+        query = query.where(table.c.type.in_(list(calculation_types)))
+    if after is not None:
+        query = query.where(table.c.id > after)
+
+    stats = RecomputeStats(last_id=after)
+    started = time.perf_counter()
+    with engine.connect() as reader, engine.connect() as writer:
+        result = reader.execution_options(stream_results=True, yield_per=chunk_size).execute(query)
+        for rows in result.partitions():
+            chunk_started = time.perf_counter()
+
+            groups = defaultdict(list)
+            for row in rows:
+                groups[row.type].append(row)
+
+            changes = []
+            for calculation_type, group in groups.items():
+                results, errors = Calculation.evaluate_many(
+                    calculation_type, [row.inputs for row in group]
+                )
+                for index, error in errors.items():
+                    logger.warning("Calculation %s could not be recomputed: %s", group[index].id, error)
+                stats.rows_failed += len(errors)
+                changes.extend(
+                    (row.id, value) for row, value in zip(group, results) if value is not None
+                )
+
+            if not dry_run:
+                stats.rows_updated += _update_results(writer, changes)
+                writer.commit()
+
+            stats.rows_read += len(rows)
+            stats.chunks += 1
+            stats.last_id = rows[-1].id
+            if checkpoint and not dry_run:
+                write_checkpoint(checkpoint, stats.last_id)
+
+            chunk_elapsed = time.perf_counter() - chunk_started
+            logger.info(
+                "Chunk %d: %d rows in %.3fs (%.0f rows/s), %d updated so far, last id %s",
+                stats.chunks,
+                len(rows),
+                chunk_elapsed,
+                len(rows) / chunk_elapsed if chunk_elapsed else 0.0,
+                stats.rows_updated,
+                stats.last_id,
+            )
+
+        if stats.rows_updated:
+            # Rewritten results invalidate the materialized stats rollups
+            writer.execute(update(CalculationStatsRollupState.__table__).values(dirty=True))
+            writer.commit()
+
+    stats.elapsed = time.perf_counter() - started
+    logger.info(
+        "Recompute finished: %d rows read, %d updated, %d failed in %.2fs (%.0f rows/s)",
+        stats.rows_read,
+        stats.rows_updated,
+        stats.rows_failed,
+        stats.elapsed,
+        stats.rows_per_second,
+    )
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recompute stored calculation results in bulk.")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per fetch and per UPDATE")
+    parser.add_argument("--type", dest="types", action="append", help="Only recompute this type (repeatable)")
+    parser.add_argument("--after", type=uuid.UUID, help="Resume after this calculation id")
+    parser.add_argument("--checkpoint", help="File to resume from and record progress in")
+    parser.add_argument("--dry-run", action="store_true", help="Evaluate without writing results")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    recompute_results(
+        chunk_size=args.chunk_size,
+        calculation_types=args.types,
+        after=args.after,
+        checkpoint=args.checkpoint,
+        dry_run=args.dry_run,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# app/jobs/stats_rollup.py
+"""
+Calculation Stats Rollup Job
+
+Maintains the hourly rollup behind GET /calculations/stats
+(app.models.stats):
+
+1. Users with at least CALCULATION_STATS_ROLLUP_MIN_ROWS calculations get a
+   rollup (CalculationStatsRollup.enable).
+2. Every enabled rollup is refreshed, one user per transaction. A clean
+   rollup only aggregates the hours since its watermark, so a periodic run
+   (e.g. hourly from cron) is cheap. A dirty rollup is rebuilt.
+
+Stats reads also refresh a rollup that is behind, so running this job only
+keeps that work out of the request path.
+
+Usage:
+    python -m app.jobs.stats_rollup
+    python -m app.jobs.stats_rollup --min-rows 50000
+    python -m app.jobs.stats_rollup --no-enable
+"""
+
+import argparse
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import engine as default_engine
+from app.models.calculation import Calculation
+from app.models.stats import CalculationStatsRollup, CalculationStatsRollupState
+from app.models.user import User  # noqa: F401 - registers the User mapper
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RollupStats:
+    """Counters reported by refresh_rollups()."""
+    users_enabled: int = 0
+    users_refreshed: int = 0
+    elapsed: float = 0.0
+
+
+def refresh_rollups(
+    engine: Engine = default_engine,
+    min_rows: Optional[int] = None,
+    enable: bool = True,
+) -> RollupStats:
+    """
+    Enable the rollup for large users and refresh every enabled rollup.
+
+    Args:
+        engine: Engine to run on
+        min_rows: Calculations a user needs to get a rollup
+            (default: settings.CALCULATION_STATS_ROLLUP_MIN_ROWS)
+        enable: Enable new users; if False, only refresh existing rollups
+
+    Returns:
+        RollupStats: Counters and timing for the run
+    """
+    if min_rows is None:
+        min_rows = settings.CALCULATION_STATS_ROLLUP_MIN_ROWS
+
+    stats = RollupStats()
+    started = time.perf_counter()
+    with Session(engine) as db:
+        if enable:
+            enabled = select(CalculationStatsRollupState.user_id)
+            candidates = db.scalars(
+                select(Calculation.user_id)
+                .where(Calculation.user_id.not_in(enabled))
+                .group_by(Calculation.user_id)
+                .having(func.count() >= min_rows)
+            ).all()
+            for user_id in candidates:
+                CalculationStatsRollup.enable(db, user_id)
+            db.commit()
+            stats.users_enabled = len(candidates)
+
+        for user_id in db.scalars(select(CalculationStatsRollupState.user_id)).all():
+            if CalculationStatsRollup.refresh(db, user_id):
+                stats.users_refreshed += 1
+            db.commit()
+
+    stats.elapsed = time.perf_counter() - started
+    logger.info(
+        "Stats rollup: %d users enabled, %d refreshed in %.2fs",
+        stats.users_enabled, stats.users_refreshed, stats.elapsed,
+    )
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Enable and refresh the calculation stats rollups.")
+    parser.add_argument("--min-rows", type=int, help="Calculations a user needs to get a rollup")
+    parser.add_argument("--no-enable", dest="enable", action="store_false", help="Only refresh existing rollups")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    refresh_rollups(min_rows=args.min_rows, enable=args.enable)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ This module defines the main FastAPI application, including:
 - API endpoints for user authentication
 - API endpoints for calculation management (BREAD operations)
 - Web routes for HTML templates
-- Database table creation on startup
+- A schema revision check on startup (migrations run in app.database_init)
 
 The application follows a RESTful API design with proper separation of concerns:
 - Routes handle HTTP requests and responses
@@ -15,59 +15,98 @@ The application follows a RESTful API design with proper separation of concerns:
 - Dependencies handle authentication and database sessions
 """
 
+import os
 from contextlib import asynccontextmanager  # Used for startup/shutdown events
 from datetime import datetime, timezone, timedelta
 from uuid import UUID  # For type validation of UUIDs in path parameters
-from typing import List
+from typing import Any, Dict, List, Optional
 
 # FastAPI imports
-from fastapi import Body, FastAPI, Depends, HTTPException, status, Request, Form
+from fastapi import Body, FastAPI, Depends, File, Header, HTTPException, status, Request, Form, Query, Response, UploadFile
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles  # For serving static files (CSS, JS)
 from fastapi.templating import Jinja2Templates  # For HTML templates
 
-from sqlalchemy.orm import Session  # SQLAlchemy database session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession  # Async database session
+from starlette.concurrency import run_in_threadpool  # Run blocking DB work off the event loop
+from pydantic import ValidationError
 
 import uvicorn  # ASGI server for running FastAPI apps
 
 # Application imports
 from app.auth.dependencies import get_current_active_user  # Authentication dependency
+from app.auth import password_pool  # Process pool for bcrypt hashing
+from app.auth.redis import blacklist_filter, init_redis, close_redis  # Redis pool and revoked-token filter
 from app.models.calculation import Calculation  # Database model for calculations
+from app.models import calculation_reads  # Column-projected read queries
+from app.models import calculation_bulk  # Chunked filter-based bulk changes
+from app import database_migrations  # Schema revision check
 from app.models.user import User  # Database model for users
-from app.schemas.calculation import CalculationBase, CalculationResponse, CalculationUpdate  # API request/response schemas
+from app.models.stats import CalculationStatsRollup, calculation_stats  # Aggregates and hourly rollup
+from app.models.import_job import CalculationImportJob  # Status of bulk imports
+from app.models.collection_version import CalculationCollectionVersion  # Per-user list version (ETags)
+from app.operations import result_cache  # Memoized (type, inputs) -> result
+from app.core.etag import if_match, if_none_match, make_etag  # Conditional requests
+from app.core.response_cache import ResponseCache  # Cached GET /calculations pages
+from app.core.serialization import default_response_class, dump_calculation, dump_calculations  # orjson responses
+from app.schemas.calculation import CalculationBase, CalculationResponse, CalculationUpdate, CalculationType, CalculationCursor, CalculationBatchError, CalculationBatchResponse, CalculationBulkDeleteResponse, CalculationBulkUpdate, CalculationBulkUpdateResponse, CalculationStatsResponse, StatsInterval, ExportFormat, ImportFormat, CalculationImportResponse  # API request/response schemas
 from app.schemas.token import TokenResponse  # API token schema
 from app.schemas.user import UserCreate, UserResponse, UserLogin  # User schemas
-from app.database import Base, get_db, engine  # Database connection
+from app.database import get_async_db, engine, async_engine  # Database connection
+from app.core.config import settings  # Application settings
+from app.core.metrics import metrics  # In-process metrics registry
+from app.jobs.migrate_inputs import current_storage  # Storage mode of calculations.inputs
+from app.export import export_query, get_encoder, stream_export, stream_export_async  # Streaming export
+from app.jobs.import_calculations import detect_format, error_file_path, import_runner, save_upload  # Bulk import
 
 
 # ------------------------------------------------------------------------------
-# Create tables on startup using the lifespan event
+# Schema check on startup using the lifespan event
 # ------------------------------------------------------------------------------
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Lifespan context manager for FastAPI.
     
-    This runs when the application starts and creates all database tables
-    defined in SQLAlchemy models. It's an alternative to using Alembic
-    for simpler applications.
+    This runs when the application starts. The schema is created and
+    upgraded by the migrations (`python -m app.database_init`, run once per
+    deploy before the workers start); each worker only checks that the
+    database is at the revision this code expects, with one cheap query.
     
     Args:
         app: FastAPI application instance
     """
-    print("Creating tables...")
-    Base.metadata.create_all(bind=engine)
-    print("Tables created successfully!")
+    with engine.connect() as connection:
+        warning = database_migrations.check_revision(connection)
+        stored = current_storage(connection)
+    if warning:
+        print(f"WARNING: {warning}")
+    if stored != settings.CALCULATION_INPUTS_STORAGE:
+        print(
+            f"WARNING: calculations.inputs is stored as {stored!r} but "
+            f"CALCULATION_INPUTS_STORAGE is {settings.CALCULATION_INPUTS_STORAGE!r}; "
+            f"run python -m app.jobs.migrate_inputs --to {settings.CALCULATION_INPUTS_STORAGE}"
+        )
+    password_pool.start()
+    init_redis()
+    blacklist_filter.start()
+    import_runner.start()
     yield  # This is where application runs
-    # Cleanup code would go here (after yield), but we don't need any
+    await run_in_threadpool(import_runner.shutdown)
+    await blacklist_filter.stop()
+    await close_redis()
+    await async_engine.dispose()
+    password_pool.shutdown()
 
 # Initialize the FastAPI application with metadata and lifespan
 app = FastAPI(
     title="Calculations API",
     description="API for managing calculations",
     version="1.0.0",
-    lifespan=lifespan  # Pass our lifespan context manager
+    lifespan=lifespan,  # Pass our lifespan context manager
+    default_response_class=default_response_class(),  # orjson when installed
 )
 
 # ------------------------------------------------------------------------------
@@ -170,6 +209,11 @@ def read_health():
     """Health check."""
     return {"status": "ok"}
 
+@app.get("/metrics", tags=["health"])
+def read_metrics():
+    """In-process counters, timers and gauges for this worker."""
+    return metrics.snapshot()
+
 
 # ------------------------------------------------------------------------------
 # User Registration Endpoint
@@ -180,18 +224,24 @@ def read_health():
     status_code=status.HTTP_201_CREATED,
     tags=["auth"]
 )
-def register(user_create: UserCreate, db: Session = Depends(get_db)):
+async def register(user_create: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Create a new user account.
+
+    The password is hashed on the password hashing pool, so the bcrypt work
+    does not block the event loop or a threadpool worker. It is only hashed
+    once the password length and the username and email have been checked,
+    so rejected registrations cost no hash.
     """
     user_data = user_create.dict(exclude={"confirm_password"})
     try:
-        user = User.register(db, user_data)
-        db.commit()
-        db.refresh(user)
+        await db.run_sync(User.validate_registration, user_data)
+        hashed_password = await password_pool.hash_password(user_data["password"])
+        user = await db.run_sync(User.register, user_data, hashed_password)
+        await db.commit()
         return user
     except ValueError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
@@ -199,12 +249,12 @@ def register(user_create: UserCreate, db: Session = Depends(get_db)):
 # User Login Endpoints
 # ------------------------------------------------------------------------------
 @app.post("/auth/login", response_model=TokenResponse, tags=["auth"])
-def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
+async def login_json(user_login: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Login with JSON payload (username & password).
     Returns an access token, refresh token, and user info.
     """
-    auth_result = User.authenticate(db, user_login.username, user_login.password)
+    auth_result = await User.authenticate_async(db, user_login.username, user_login.password)
     if auth_result is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -213,7 +263,8 @@ def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
         )
 
     user = auth_result["user"]
-    db.commit()  # commit the last_login update
+    await db.commit()  # commit the last_login update
+    await db.refresh(user)
 
     # Ensure expires_at is timezone-aware
     expires_at = auth_result.get("expires_at")
@@ -237,12 +288,12 @@ def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
     )
 
 @app.post("/auth/token", tags=["auth"])
-def login_form(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_form(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """
     Login with form data (Swagger/UI).
     Returns an access token.
     """
-    auth_result = User.authenticate(db, form_data.username, form_data.password)
+    auth_result = await User.authenticate_async(db, form_data.username, form_data.password)
     if auth_result is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -266,14 +317,17 @@ def login_form(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = D
     status_code=status.HTTP_201_CREATED,
     tags=["calculations"],
 )
-def create_calculation(
+async def create_calculation(
     calculation_data: CalculationBase,
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new calculation for the authenticated user.
     Automatically computes the 'result'.
+
+    The row is inserted, read back (RETURNING) and the user's collection
+    version is bumped, all in a single statement.
     """
     try:
         new_calculation = Calculation.create(
@@ -281,116 +335,652 @@ def create_calculation(
             user_id=current_user.id,
             inputs=calculation_data.inputs,
         )
-        new_calculation.result = new_calculation.get_result()
+        new_calculation.result = await result_cache.evaluate_async(calculation_data.type, calculation_data.inputs)
 
-        db.add(new_calculation)
-        db.commit()
-        db.refresh(new_calculation)
-        return new_calculation
+        row = await db.run_sync(
+            Calculation.insert_returning,
+            new_calculation,
+            [CalculationCollectionVersion.bump_cte(current_user.id)],
+        )
+        await db.commit()
+        return Response(
+            content=dump_calculation(row),
+            status_code=status.HTTP_201_CREATED,
+            media_type="application/json",
+        )
 
-    except ValueError as e:
-        db.rollback()
+    except (ValueError, ArithmeticError) as e:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
 
 
+# Batch Create (Add many) Calculations
+@app.post(
+    "/calculations/batch",
+    response_model=CalculationBatchResponse,
+    status_code=status.HTTP_201_CREATED,
+    tags=["calculations"],
+)
+async def create_calculations_batch(
+    items: List[Dict[str, Any]] = Body(..., max_length=settings.CALCULATIONS_BATCH_MAX_SIZE),
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create many calculations for the authenticated user in one request.
+
+    Each item has the same shape as the POST /calculations body. Items are
+    validated individually and computed per type in batches (through the
+    result cache); invalid ones are reported in
+    `errors` with their index and do not abort the rest of the batch.
+    All valid items are stored with multi-row INSERTs and one commit.
+    """
+    # Validation is CPU-bound: keep it off the event loop
+    valid, errors = await run_in_threadpool(_validate_batch, items)
+
+    # Evaluate per type through the result cache; misses go to the vectorized kernel
+    by_type: Dict[str, List[int]] = {}
+    for position, (_, calculation_data) in enumerate(valid):
+        by_type.setdefault(calculation_data.type.value, []).append(position)
+    results: Dict[int, float] = {}
+    for calculation_type, positions in by_type.items():
+        computed, failed = await result_cache.evaluate_many_async(
+            calculation_type, [valid[position][1].inputs for position in positions]
+        )
+        for offset, position in enumerate(positions):
+            if offset in failed:
+                errors.append(CalculationBatchError(index=valid[position][0], detail=failed[offset]))
+            else:
+                results[position] = computed[offset]
+
+    calculations = []
+    for position, (_, calculation_data) in enumerate(valid):
+        if position not in results:
+            continue
+        calculation = Calculation.create(
+            calculation_type=calculation_data.type,
+            user_id=current_user.id,
+            inputs=calculation_data.inputs,
+        )
+        calculation.result = results[position]
+        calculations.append(calculation)
+    errors.sort(key=lambda error: error.index)
+
+    await db.run_sync(Calculation.insert_many, calculations)
+    if calculations:
+        await db.run_sync(CalculationCollectionVersion.bump, current_user.id)
+    await db.commit()
+    return CalculationBatchResponse(created=calculations, errors=errors)
+
+
+def _validate_batch(items: List[Dict[str, Any]]):
+    """Validate batch items, returning (index, CalculationBase) pairs and per-item errors."""
+    valid = []
+    errors = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, CalculationBase.model_validate(item)))
+        except ValidationError as e:
+            detail = "; ".join(err["msg"] for err in e.errors())
+            errors.append(CalculationBatchError(index=index, detail=detail))
+    return valid, errors
+
+
 # Browse / List Calculations
 @app.get("/calculations", response_model=List[CalculationResponse], tags=["calculations"])
-def list_calculations(
+async def list_calculations(
+    request: Request,
+    limit: int = Query(
+        settings.CALCULATIONS_PAGE_SIZE,
+        ge=1,
+        le=settings.CALCULATIONS_MAX_PAGE_SIZE,
+        description="Maximum number of calculations to return",
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Opaque cursor from the X-Next-Cursor header of the previous page",
+    ),
+    calculation_type: Optional[CalculationType] = Query(
+        None, alias="type", description="Only return calculations of this type"
+    ),
+    created_after: Optional[datetime] = Query(None, description="Only return calculations created at or after this time"),
+    created_before: Optional[datetime] = Query(None, description="Only return calculations created before this time"),
+    if_none_match_header: Optional[str] = Header(None, alias="If-None-Match"),
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    List the current user's calculations, newest first, one page at a time.
+
+    Pagination is keyset-based on (created_at, id). When more calculations
+    are available, the response carries an X-Next-Cursor header (and a
+    matching Link: rel="next" header); pass it back as ?cursor= to fetch
+    the next page.
+
+    The ETag is derived from the user's collection version and the query
+    parameters. A request whose If-None-Match still matches gets a 304
+    after a single primary-key lookup, without running the list query.
+
+    Serialized pages are cached (list_cache) under the same version, so
+    repeated requests from other tabs and devices are answered without the
+    list query as well. Any write bumps the version, which invalidates every
+    cached page of the user at once.
+    """
+    # Read the version before the page: a write in between only makes the
+    # ETag older than the data, which costs the client one extra refresh
+    version = await db.run_sync(CalculationCollectionVersion.current, current_user.id)
+    etag = make_etag(current_user.id, version, sorted(request.query_params.multi_items()))
+    if if_none_match(if_none_match_header, etag):
+        return _not_modified(etag)
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    # Link holds an absolute URL, so the host is part of the key
+    cache_key = f"{current_user.id}:{version}:{make_etag(etag, request.base_url)[1:-1]}"
+    if settings.LIST_CACHE_ENABLED:
+        cached = await list_cache.get(cache_key)
+        if cached is not None:
+            body, page_headers = cached
+            return Response(content=body, media_type="application/json", headers={**page_headers, **cache_headers})
+
+    after = None
+    if cursor is not None:
+        try:
+            decoded = CalculationCursor.decode(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        after = (decoded.created_at, decoded.id)
+
+    # Fetch one extra row to learn whether another page exists
+    calculations = (await db.execute(calculation_reads.page_query(
+        current_user.id,
+        limit + 1,
+        after=after,
+        calculation_type=calculation_type.value if calculation_type is not None else None,
+        created_after=_as_naive_utc(created_after),
+        created_before=_as_naive_utc(created_before),
+    ))).all()
+    page_headers = {}
+    if len(calculations) > limit:
+        calculations = calculations[:limit]
+        last = calculations[-1]
+        next_cursor = CalculationCursor(created_at=last.created_at, id=last.id).encode()
+        next_url = request.url.include_query_params(cursor=next_cursor)
+        page_headers["X-Next-Cursor"] = next_cursor
+        page_headers["Link"] = f'<{next_url}>; rel="next"'
+
+    body = dump_calculations(calculations)
+    if settings.LIST_CACHE_ENABLED:
+        await list_cache.set(cache_key, body, page_headers)
+    return Response(content=body, media_type="application/json", headers={**page_headers, **cache_headers})
+
+
+# Serialized GET /calculations pages, keyed by user and collection version
+list_cache = ResponseCache(
+    "calculations",
+    ttl=settings.LIST_CACHE_TTL_SECONDS,
+    max_entries=settings.LIST_CACHE_MAX_ENTRIES,
+    max_bytes=settings.LIST_CACHE_MAX_BYTES,
+    max_entry_bytes=settings.LIST_CACHE_MAX_ENTRY_BYTES,
+    use_redis=settings.LIST_CACHE_REDIS,
+    redis_backoff_seconds=settings.LIST_CACHE_REDIS_BACKOFF_SECONDS,
+)
+
+
+def _not_modified(etag: str) -> Response:
+    """304 response for a client whose copy is current."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"},
+    )
+
+
+def _as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware datetime to naive UTC, matching the created_at column."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+# Aggregate Statistics
+# (declared before /calculations/{calc_id} so "stats" is not taken for an id)
+@app.get("/calculations/stats", response_model=CalculationStatsResponse, tags=["calculations"])
+async def calculation_statistics(
+    interval: StatsInterval = Query(StatsInterval.DAY, description="Histogram bucket width"),
+    calculation_type: Optional[CalculationType] = Query(
+        None, alias="type", description="Only aggregate calculations of this type"
+    ),
+    created_after: Optional[datetime] = Query(None, description="Only aggregate calculations created at or after this time"),
+    created_before: Optional[datetime] = Query(None, description="Only aggregate calculations created before this time"),
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Per-type count, sum, min, max and average of the current user's results,
+    plus a histogram of calculations per time bucket and type.
+
+    Aggregated in the database (GROUP BY / date_trunc); for users with a
+    materialized rollup, from the hourly rollup plus the newest rows.
+    """
+    stats = await db.run_sync(
+        calculation_stats,
+        current_user.id,
+        interval=interval.value,
+        calculation_type=calculation_type.value if calculation_type is not None else None,
+        created_after=_as_naive_utc(created_after),
+        created_before=_as_naive_utc(created_before),
+    )
+    if stats["source"] == "rollup":
+        # Persist a refresh done while answering
+        await db.commit()
+    return CalculationStatsResponse(interval=interval, **stats)
+
+
+# Bulk Import Calculations
+@app.post(
+    "/calculations/import",
+    response_model=CalculationImportResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["calculations"],
+)
+async def import_calculations(
+    file: UploadFile = File(..., description="CSV (type, inputs columns) or NDJSON file"),
+    import_format: Optional[ImportFormat] = Query(
+        None, alias="format", description="File format (default: from the file name or content type)"
+    ),
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Start importing calculations from an uploaded file.
+
+    The file is stored and processed in the background; the response is the
+    new import job. Poll GET /calculations/import/{job_id} for progress.
+    """
+    try:
+        fmt = import_format.value if import_format is not None else detect_format(file.filename, file.content_type)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    job = await db.run_sync(CalculationImportJob.create, current_user.id, fmt, file.filename)
+    await run_in_threadpool(save_upload, file.file, job.id)
+    await db.commit()
+    await db.refresh(job)
+    import_runner.submit(job.id)
+    return job
+
+
+async def _get_import_job(db, job_id: str, user_id: UUID) -> CalculationImportJob:
+    """Load an import job of the user, or raise 400/404."""
+    try:
+        job_uuid = UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid import job id format.")
+    job = await db.scalar(
+        select(CalculationImportJob).where(
+            CalculationImportJob.id == job_uuid,
+            CalculationImportJob.user_id == user_id
+        )
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found.")
+    return job
+
+
+@app.get("/calculations/import/{job_id}", response_model=CalculationImportResponse, tags=["calculations"])
+async def get_import_job(
+    job_id: str,
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Status and row counts of an import job."""
+    return await _get_import_job(db, job_id, current_user.id)
+
+
+@app.get("/calculations/import/{job_id}/errors", tags=["calculations"])
+async def get_import_errors(
+    job_id: str,
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Download the rejected records of an import job as CSV (line, detail)."""
+    job = await _get_import_job(db, job_id, current_user.id)
+    path = error_file_path(job.id)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="No error file for this import job.")
+    return FileResponse(path, media_type="text/csv", filename=f"import-{job.id}-errors.csv")
+
+
+# Export Calculations
+@app.get("/calculations/export", tags=["calculations"])
+async def export_calculations(
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format", description="File format"),
+    calculation_type: Optional[CalculationType] = Query(
+        None, alias="type", description="Only export calculations of this type"
+    ),
+    created_after: Optional[datetime] = Query(None, description="Only export calculations created at or after this time"),
+    created_before: Optional[datetime] = Query(None, description="Only export calculations created before this time"),
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
 ):
     """
-    List all calculations belonging to the current authenticated user.
+    Download all of the current user's calculations, newest first.
+
+    The response is streamed: rows are read through a server-side cursor
+    and sent chunk by chunk, so any number of calculations can be exported
+    without being held in memory.
     """
-    calculations = db.query(Calculation).filter(Calculation.user_id == current_user.id).all()
-    return calculations
+    try:
+        encoder = get_encoder(export_format.value)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    query = export_query(
+        current_user.id,
+        calculation_type=calculation_type.value if calculation_type is not None else None,
+        created_after=_as_naive_utc(created_after),
+        created_before=_as_naive_utc(created_before),
+    )
+    if settings.DATABASE_ASYNC:
+        body = stream_export_async(async_engine, query, encoder)
+    else:
+        # Starlette iterates sync generators in the threadpool
+        body = stream_export(engine, query, encoder)
+    return StreamingResponse(
+        body,
+        media_type=encoder.media_type,
+        headers={"Content-Disposition": f'attachment; filename="calculations.{encoder.extension}"'},
+    )
 
 
 # Read / Retrieve a Specific Calculation by ID
 @app.get("/calculations/{calc_id}", response_model=CalculationResponse, tags=["calculations"])
-def get_calculation(
+async def get_calculation(
     calc_id: str,
+    if_none_match_header: Optional[str] = Header(None, alias="If-None-Match"),
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve a single calculation by its UUID, if it belongs to the current user.
+
+    The response carries a strong ETag derived from the id and updated_at.
+    With a matching If-None-Match only updated_at is read, and the response
+    is a 304 without a body. Otherwise only the response columns are read
+    (no ORM entity) and encoded directly.
     """
     try:
         calc_uuid = UUID(calc_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid calculation id format.")
 
-    calculation = db.query(Calculation).filter(
-        Calculation.id == calc_uuid,
-        Calculation.user_id == current_user.id
-    ).first()
-    if not calculation:
+    if if_none_match_header:
+        updated_at = await db.scalar(calculation_reads.owned_query(calc_uuid, current_user.id, names=("updated_at",)))
+        if updated_at is None:
+            raise HTTPException(status_code=404, detail="Calculation not found.")
+        etag = Calculation.etag_for(calc_uuid, updated_at)
+        if if_none_match(if_none_match_header, etag):
+            return _not_modified(etag)
+
+    calculation = (await db.execute(calculation_reads.owned_query(calc_uuid, current_user.id))).first()
+    if calculation is None:
         raise HTTPException(status_code=404, detail="Calculation not found.")
 
-    return calculation
+    return Response(
+        content=dump_calculation(calculation),
+        media_type="application/json",
+        headers={"ETag": Calculation.etag_for(calculation.id, calculation.updated_at), "Cache-Control": "private, no-cache"},
+    )
 
 
 # Edit / Update a Calculation
 @app.put("/calculations/{calc_id}", response_model=CalculationResponse, tags=["calculations"])
-def update_calculation(
+async def update_calculation(
     calc_id: str,
     calculation_update: CalculationUpdate,
+    if_match_header: Optional[str] = Header(None, alias="If-Match"),
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update the inputs (and thus the result) of a specific calculation.
+
+    The update is a single UPDATE ... WHERE id AND user_id RETURNING
+    statement. The stored type is not known before it runs, so the result
+    is computed for every type up front and the statement picks the one of
+    the row's type (no row is read or locked while computing). A row whose
+    type rejects the inputs, including overflows and results that are not
+    real numbers, is rolled back (400); no matching row means 404.
+
+    With an If-Match header the update only happens if the calculation's
+    ETag still matches (optimistic concurrency); otherwise it is rolled
+    back and the response is 412 Precondition Failed. The row is locked
+    while the ETag is checked, so two clients holding the same ETag cannot
+    both succeed.
     """
     try:
         calc_uuid = UUID(calc_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid calculation id format.")
 
-    calculation = db.query(Calculation).filter(
-        Calculation.id == calc_uuid,
-        Calculation.user_id == current_user.id
-    ).first()
-    if not calculation:
+    values = {"updated_at": datetime.utcnow()}
+    errors = {}
+    if calculation_update.inputs is not None:
+        results, errors = await result_cache.evaluate_types_async(list(CalculationType), calculation_update.inputs)
+        if not results:
+            raise HTTPException(status_code=400, detail=next(iter(errors.values())))
+        values["inputs"] = calculation_update.inputs
+        values["result"] = Calculation.result_case(results)
+
+    # The new row comes back from the UPDATE itself (no refresh SELECT)
+    row = await db.run_sync(
+        Calculation.update_returning,
+        calc_uuid,
+        current_user.id,
+        values,
+        [
+            CalculationStatsRollup.mark_dirty_cte(
+                current_user.id, Calculation.created_at_of(current_user.id, [calc_uuid])
+            ),
+            CalculationCollectionVersion.bump_cte(current_user.id),
+        ],
+        return_previous=if_match_header is not None,
+    )
+    if row is None:
+        await db.rollback()
         raise HTTPException(status_code=404, detail="Calculation not found.")
+    if if_match_header is not None:
+        current_etag = Calculation.etag_for(calc_uuid, row.previous_updated_at)
+        if not if_match(if_match_header, current_etag):
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="The calculation was modified by another request.",
+                headers={"ETag": current_etag},
+            )
+    if row.type in errors:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=errors[row.type])
+
+    await db.commit()
+    return Response(
+        content=dump_calculation(row),
+        media_type="application/json",
+        headers={"ETag": Calculation.etag_for(row.id, row.updated_at)},
+    )
 
-    if calculation_update.inputs is not None:
-        calculation.inputs = calculation_update.inputs
-        calculation.result = calculation.get_result()
 
-    calculation.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(calculation)
-    return calculation
+# Bulk Delete / Update Calculations
+def _parse_ids(ids: Optional[List[str]]) -> Optional[List[UUID]]:
+    """Ids of ?ids= (repeated or comma-separated), deduplicated, in order."""
+    if ids is None:
+        return None
+    try:
+        calc_ids = list(dict.fromkeys(UUID(value) for item in ids for value in item.split(",") if value.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid calculation id format.")
+    if not calc_ids:
+        raise HTTPException(status_code=400, detail="No calculation ids given.")
+    if len(calc_ids) > settings.CALCULATIONS_BULK_DELETE_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.CALCULATIONS_BULK_DELETE_MAX_IDS} ids can be given per request.",
+        )
+    return calc_ids
+
+
+def _bulk_filters(
+    calculation_type: Optional[CalculationType],
+    created_after: Optional[datetime],
+    created_before: Optional[datetime],
+) -> Dict[str, Any]:
+    """Filters of a bulk request, as keyword arguments of user_calculations_query()."""
+    filters = {
+        "calculation_type": calculation_type.value if calculation_type is not None else None,
+        "created_after": _as_naive_utc(created_after),
+        "created_before": _as_naive_utc(created_before),
+    }
+    return {name: value for name, value in filters.items() if value is not None}
+
+
+@app.delete("/calculations", response_model=CalculationBulkDeleteResponse, tags=["calculations"])
+async def delete_calculations(
+    ids: Optional[List[str]] = Query(
+        None,
+        description="Calculations to delete; repeat the parameter or separate ids with commas",
+    ),
+    calculation_type: Optional[CalculationType] = Query(
+        None, alias="type", description="Delete all calculations of this type"
+    ),
+    created_after: Optional[datetime] = Query(None, description="Delete calculations created at or after this time"),
+    created_before: Optional[datetime] = Query(None, description="Delete calculations created before this time"),
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Delete many of the current user's calculations, either by id or by
+    filter (type and/or created_at range; filters combine with AND).
+
+    - By ids: one DELETE statement. Ids that do not exist or belong to
+      another user are reported in `missing` instead of failing the request.
+    - By filter: set-based DELETEs of CALCULATIONS_BULK_CHUNK_SIZE rows,
+      each committed on its own so locks stay short (see
+      app/models/calculation_bulk.py).
+
+    At least one of ids or a filter is required, so a bare request cannot
+    delete everything.
+    """
+    calc_ids = _parse_ids(ids)
+    filters = _bulk_filters(calculation_type, created_after, created_before)
+    if calc_ids is not None and filters:
+        raise HTTPException(status_code=400, detail="Delete either by ids or by filter, not both.")
+    if calc_ids is None and not filters:
+        raise HTTPException(status_code=400, detail="Give calculation ids or at least one filter.")
+
+    if filters:
+        deleted = await db.run_sync(calculation_bulk.bulk_delete, current_user.id, filters)
+        return CalculationBulkDeleteResponse(deleted=deleted)
+
+    deleted = await db.run_sync(
+        Calculation.delete_returning,
+        current_user.id,
+        calc_ids,
+        [
+            CalculationStatsRollup.mark_dirty_cte(current_user.id, Calculation.created_at_of(current_user.id, calc_ids)),
+            CalculationCollectionVersion.bump_cte(current_user.id),
+        ],
+    )
+    if not deleted:
+        # Nothing changed: undo the version bump
+        await db.rollback()
+    else:
+        await db.commit()
+    deleted_ids = set(deleted)
+    return CalculationBulkDeleteResponse(
+        deleted=len(deleted_ids),
+        missing=[calc_id for calc_id in calc_ids if calc_id not in deleted_ids],
+    )
+
+
+@app.patch("/calculations", response_model=CalculationBulkUpdateResponse, tags=["calculations"])
+async def update_calculations(
+    change: CalculationBulkUpdate,
+    ids: Optional[List[str]] = Query(
+        None,
+        description="Calculations to update; repeat the parameter or separate ids with commas",
+    ),
+    calculation_type: Optional[CalculationType] = Query(
+        None, alias="type", description="Update all calculations of this type"
+    ),
+    created_after: Optional[datetime] = Query(None, description="Update calculations created at or after this time"),
+    created_before: Optional[datetime] = Query(None, description="Update calculations created before this time"),
+    current_user = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Re-type and/or re-input many of the current user's calculations, and
+    recompute their results.
+
+    The calculations are selected by ids and/or filters (combined with
+    AND); at least one is required. The change runs as set-based UPDATEs of
+    CALCULATIONS_BULK_CHUNK_SIZE rows, each committed on its own. Matching
+    calculations for which the change is invalid (e.g. re-typing [1, 0] to
+    division) are left unchanged and counted in `failed`. New inputs that no
+    matching calculation can take are rejected with 400, as by PUT.
+    """
+    calc_ids = _parse_ids(ids)
+    filters = _bulk_filters(calculation_type, created_after, created_before)
+    if calc_ids is None and not filters:
+        raise HTTPException(status_code=400, detail="Give calculation ids or at least one filter.")
+    if calc_ids is not None:
+        filters["ids"] = calc_ids
+
+    try:
+        updated, failed = await db.run_sync(
+            calculation_bulk.bulk_update,
+            current_user.id,
+            filters,
+            new_type=change.type.value if change.type is not None else None,
+            inputs=change.inputs,
+        )
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    return CalculationBulkUpdateResponse(updated=updated, failed=failed)
 
 
 # Delete a Calculation
 @app.delete("/calculations/{calc_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["calculations"])
-def delete_calculation(
+async def delete_calculation(
     calc_id: str,
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a calculation by its UUID, if it belongs to the current user.
+
+    This is a single DELETE ... WHERE id AND user_id RETURNING id statement;
+    no returned row means 404.
     """
     try:
         calc_uuid = UUID(calc_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid calculation id format.")
 
-    calculation = db.query(Calculation).filter(
-        Calculation.id == calc_uuid,
-        Calculation.user_id == current_user.id
-    ).first()
-    if not calculation:
+    deleted = await db.run_sync(
+        Calculation.delete_returning,
+        current_user.id,
+        [calc_uuid],
+        [
+            CalculationStatsRollup.mark_dirty_cte(current_user.id, Calculation.created_at_of(current_user.id, [calc_uuid])),
+            CalculationCollectionVersion.bump_cte(current_user.id),
+        ],
+    )
+    if not deleted:
+        await db.rollback()
         raise HTTPException(status_code=404, detail="Calculation not found.")
-
-    db.delete(calculation)
-    db.commit()
+    await db.commit()
     return None
 
 
@@ -14,14 +14,25 @@ These models are designed for a calculator application that supports
 basic mathematical operations: addition, subtraction, multiplication, and division.
 """
 
+from array import array
 from datetime import datetime
 import uuid
-from typing import List
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Float
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import Column, String, DateTime, ForeignKey, Float, Index, case, delete, event, func, insert, select, update
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, declared_attr
 from sqlalchemy.ext.declarative import declared_attr
+from app.core.config import settings
+from app.core.etag import make_etag
+from app.core.ids import new_id
 from app.database import Base
+from app.models import partitions
+from app.models.types import FloatList
+from app.operations import vectorized
+
+# Bind parameters allowed in one statement by the Postgres wire protocol
+# (and enforced by asyncpg): a multi-row INSERT is split to stay under it
+MAX_BIND_PARAMETERS = 32767
 
 class AbstractCalculation:
     """
@@ -54,11 +65,14 @@ class AbstractCalculation:
         - Hides record count
         - Allows for distributed systems
         - Improves security (not guessable)
+
+        New ids are time-ordered version 7 UUIDs by default (ID_GENERATOR;
+        see app/core/ids.py), so inserts append to the primary key index.
         """
         return Column(
             UUID(as_uuid=True), 
             primary_key=True, 
-            default=uuid.uuid4,  # Auto-generate UUIDs
+            default=new_id,  # Auto-generate UUIDs
             nullable=False
         )
 
@@ -69,12 +83,15 @@ class AbstractCalculation:
         
         The 'ondelete=CASCADE' means if a user is deleted, all their
         calculations will also be deleted (referential integrity).
+
+        No single-column index is declared here: the composite
+        (user_id, created_at, id) index on Calculation has user_id as its
+        leading column, so it already serves every user_id lookup.
         """
         return Column(
             UUID(as_uuid=True), 
             ForeignKey('users.id', ondelete='CASCADE'),
-            nullable=False,
-            index=True  # Index for faster queries filtering by user_id
+            nullable=False
         )
 
     @declared_attr
@@ -94,12 +111,15 @@ class AbstractCalculation:
     @declared_attr
     def inputs(cls):
         """
-        JSON column storing the input values for the calculation.
-        
-        Using JSON type allows flexible storage of any number of inputs.
+        Column storing the input values for the calculation.
+
+        Any number of inputs is stored in a single column. The storage format
+        (JSON, float8[] or packed float64 bytes) is chosen by the
+        CALCULATION_INPUTS_STORAGE setting; see app/models/types.py. Loaded
+        values are a list or an array('d').
         """
         return Column(
-            JSON, 
+            FloatList(settings.CALCULATION_INPUTS_STORAGE),
             nullable=False
         )
 
@@ -122,10 +142,14 @@ class AbstractCalculation:
         Timestamp when the calculation was created.
         
         Automatically set to the current time when inserted.
+
+        With CALCULATIONS_PARTITIONED this is the partition key, and part of
+        the table's primary key (see app/models/partitions.py).
         """
         return Column(
             DateTime, 
             default=datetime.utcnow,
+            primary_key=settings.CALCULATIONS_PARTITIONED,
             nullable=False
         )
 
@@ -186,6 +210,60 @@ class AbstractCalculation:
             raise ValueError(f"Unsupported calculation type: {calculation_type}")
         return calculation_class(user_id=user_id, inputs=inputs)
 
+    @staticmethod
+    def etag_for(calculation_id: uuid.UUID, updated_at: datetime) -> str:
+        """
+        Strong ETag of a calculation. Every write sets updated_at, so the
+        ETag changes whenever the representation can.
+        """
+        return make_etag(calculation_id, updated_at.isoformat())
+
+    @property
+    def etag(self) -> str:
+        return self.etag_for(self.id, self.updated_at)
+
+    @classmethod
+    def evaluate_many(
+        cls, calculation_type: str, inputs_list: Sequence[Sequence[float]]
+    ) -> Tuple[List[Optional[float]], Dict[int, str]]:
+        """
+        Compute the results of many calculations of the same type at once.
+
+        Rows are evaluated together by the vectorized batch kernel when NumPy
+        is available. Any row the kernel cannot handle (invalid inputs,
+        numeric edge cases) is evaluated by the normal get_result() of the
+        matching subclass, so results and error messages are the same as
+        for single calculations.
+
+        Args:
+            calculation_type: The type of every calculation in the batch
+            inputs_list: The inputs of each calculation
+
+        Returns:
+            A tuple (results, errors): results is aligned with inputs_list
+            (None for failed rows) and errors maps the index of each failed
+            row to its error message. An unsupported calculation_type fails
+            every row.
+        """
+        calculation_type = calculation_type.lower()
+        if vectorized.is_available():
+            results = vectorized.evaluate_batch(calculation_type, inputs_list)
+        else:
+            results = [None] * len(inputs_list)
+
+        errors = {}
+        for index, result in enumerate(results):
+            if result is not None:
+                continue
+            try:
+                result = cls.create(calculation_type, None, inputs_list[index]).get_result()
+                if isinstance(result, complex):
+                    raise ValueError("Result is not a real number.")
+                results[index] = result
+            except (ValueError, ArithmeticError) as e:
+                errors[index] = str(e)
+        return results, errors
+
     def get_result(self) -> float:
         """
         Method to compute calculation result.
@@ -224,9 +302,236 @@ class Calculation(Base, AbstractCalculation):
     __mapper_args__ = {
         "polymorphic_on": "type",
         "polymorphic_identity": "calculation",
+        # Ids are unique on their own; a partitioned table's primary key
+        # also includes created_at, but entities are still identified by id
+        "primary_key": ["id"],
         #"with_polymorphic": "*"  # Eager load all subclass columns (commented out)
     }
 
+    __table_args__ = (
+        # Composite index backing keyset pagination of a user's history.
+        # Matches the ORDER BY of page_for_user() so each page is an index
+        # range scan, regardless of how many rows the user has.
+        Index("ix_calculations_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Covering index for GET /calculations/stats: the per-type and
+        # per-bucket aggregates of a user are index-only scans.
+        Index(
+            "ix_calculations_user_id_type_created_at",
+            "user_id", "type", "created_at",
+            postgresql_include=["result"],
+        ),
+    ) + (
+        # Monthly range partitions on created_at (see app/models/partitions.py)
+        ({"postgresql_partition_by": "RANGE (created_at)"},) if settings.CALCULATIONS_PARTITIONED else ()
+    )
+
+    @classmethod
+    def page_for_user(
+        cls,
+        db,
+        user_id: uuid.UUID,
+        limit: int,
+        after: Optional[tuple] = None,
+        calculation_type: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+    ) -> List["Calculation"]:
+        """
+        Return one page of a user's calculations, newest first, as entities.
+
+        Read-only endpoints use the column projection of the same query
+        (app.models.calculation_reads.page_query) instead.
+
+        Uses keyset (seek) pagination on (created_at, id) instead of OFFSET,
+        so the cost of a page does not grow with the size of the history.
+
+        Args:
+            db: SQLAlchemy database session
+            user_id: The UUID of the user who owns the calculations
+            limit: Maximum number of rows to return
+            after: (created_at, id) of the last row of the previous page
+            calculation_type: Only return calculations of this type
+            created_after: Only return calculations created at or after this time
+            created_before: Only return calculations created before this time
+
+        Returns:
+            List[Calculation]: At most `limit` calculations
+        """
+        from app.models.calculation_reads import page_query
+
+        query = page_query(
+            user_id,
+            limit,
+            calculation_type=calculation_type,
+            created_after=created_after,
+            created_before=created_before,
+            after=after,
+            entities=[cls],
+        )
+        return db.scalars(query).all()
+
+    @classmethod
+    def insert_many(cls, db, calculations: List["Calculation"]) -> None:
+        """
+        Persist many new calculations with multi-row INSERTs.
+
+        This bypasses the ORM unit of work (no identity map, no per-object
+        flush), which is what makes large batches cheap. Primary keys and
+        timestamps are assigned here in Python, so the passed-in objects
+        are fully populated afterwards without reading anything back.
+
+        A statement can carry at most MAX_BIND_PARAMETERS parameters, so
+        the rows are sent in as few INSERTs as that allows (one for up to
+        4681 rows).
+
+        The caller is responsible for committing the transaction.
+
+        Args:
+            db: SQLAlchemy database session
+            calculations: Transient calculation instances with results set
+        """
+        if not calculations:
+            return
+        now = datetime.utcnow()
+        rows = []
+        for calculation in calculations:
+            calculation.id = calculation.id or new_id()
+            calculation.created_at = calculation.created_at or now
+            calculation.updated_at = calculation.updated_at or now
+            rows.append({
+                "id": calculation.id,
+                "user_id": calculation.user_id,
+                "type": calculation.type,
+                "inputs": calculation.inputs,
+                "result": calculation.result,
+                "created_at": calculation.created_at,
+                "updated_at": calculation.updated_at,
+            })
+        rows_per_statement = MAX_BIND_PARAMETERS // len(rows[0])
+        for start in range(0, len(rows), rows_per_statement):
+            db.execute(insert(cls.__table__).values(rows[start:start + rows_per_statement]))
+
+    @classmethod
+    def insert_returning(cls, db, calculation: "Calculation", ctes: Sequence = ()):
+        """
+        INSERT one new calculation and read it back in the same statement
+        (RETURNING), instead of a flush followed by a refresh SELECT.
+
+        Args:
+            db: SQLAlchemy database session
+            calculation: Transient calculation instance with its result set
+            ctes: Data-modifying CTEs to run as part of the same statement,
+                e.g. CalculationCollectionVersion.bump_cte()
+
+        Returns:
+            Row: The inserted row, with every column of the table
+        """
+        table = cls.__table__
+        now = datetime.utcnow()
+        stmt = insert(table).values(
+            id=calculation.id or new_id(),
+            user_id=calculation.user_id,
+            type=calculation.type,
+            inputs=calculation.inputs,
+            result=calculation.result,
+            created_at=calculation.created_at or now,
+            updated_at=calculation.updated_at or now,
+        ).returning(*table.c)
+        for cte in ctes:
+            stmt = stmt.add_cte(cte)
+        return db.execute(stmt).one()
+
+    @classmethod
+    def update_returning(
+        cls,
+        db,
+        calc_id: uuid.UUID,
+        user_id: uuid.UUID,
+        values: dict,
+        ctes: Sequence = (),
+        return_previous: bool = False,
+    ):
+        """
+        UPDATE one of a user's calculations and read it back in the same
+        statement (RETURNING). The ownership check is part of the WHERE
+        clause, so no SELECT is needed first. The caller commits.
+
+        Args:
+            db: SQLAlchemy database session
+            calc_id: The calculation to update
+            user_id: Its owner; other users' calculations are never matched
+            values: Columns to set (see result_case() for the result)
+            ctes: Data-modifying CTEs to run as part of the same statement
+            return_previous: Also lock the row (FOR UPDATE) and return its
+                updated_at before the update as `previous_updated_at`, so
+                the caller can check an If-Match ETag and roll back
+
+        Returns:
+            Optional[Row]: The updated row, or None if nothing matched
+        """
+        table = cls.__table__
+        owned = (table.c.id == calc_id, table.c.user_id == user_id)
+        stmt = update(table).where(*owned).values(**values)
+        returning = list(table.c)
+        if return_previous:
+            previous = select(table.c.id, table.c.updated_at).where(*owned).with_for_update().cte("previous")
+            stmt = stmt.where(table.c.id == previous.c.id)
+            returning.append(previous.c.updated_at.label("previous_updated_at"))
+        stmt = stmt.returning(*returning)
+        for cte in ctes:
+            stmt = stmt.add_cte(cte)
+        return db.execute(stmt).first()
+
+    @classmethod
+    def result_case(cls, results: Dict[str, float]):
+        """
+        SQL expression choosing the result of the row's own type from
+        results computed for several types. Types without a result keep
+        their current value; the caller excludes those rows.
+        """
+        table = cls.__table__
+        return case(results, value=table.c.type, else_=table.c.result)
+
+    @classmethod
+    def created_at_of(cls, user_id: uuid.UUID, calc_ids: Sequence[uuid.UUID]):
+        """
+        Scalar subquery of the oldest created_at among some of a user's
+        calculations, e.g. for CalculationStatsRollup.mark_dirty_cte() in
+        the statement that changes them.
+        """
+        table = cls.__table__
+        return (
+            select(func.min(table.c.created_at))
+            .where(table.c.user_id == user_id, table.c.id.in_(list(calc_ids)))
+            .scalar_subquery()
+        )
+
+    @classmethod
+    def delete_returning(cls, db, user_id: uuid.UUID, calc_ids: Sequence[uuid.UUID], ctes: Sequence = ()) -> List[uuid.UUID]:
+        """
+        DELETE some of a user's calculations in one statement, without
+        loading them. Ids of other users' calculations are ignored. The
+        caller commits.
+
+        Args:
+            db: SQLAlchemy database session
+            user_id: Owner of the calculations
+            calc_ids: Calculations to delete
+            ctes: Data-modifying CTEs to run as part of the same statement
+
+        Returns:
+            List[uuid.UUID]: Ids of the deleted calculations
+        """
+        table = cls.__table__
+        stmt = (
+            delete(table)
+            .where(table.c.user_id == user_id, table.c.id.in_(list(calc_ids)))
+            .returning(table.c.id)
+        )
+        for cte in ctes:
+            stmt = stmt.add_cte(cte)
+        return list(db.scalars(stmt))
+
 class Addition(Calculation):
     """
     Addition calculation subclass.
@@ -250,10 +555,11 @@ class Addition(Calculation):
         Raises:
             ValueError: If inputs are not a list or if fewer than 2 numbers provided
         """
-        if not isinstance(self.inputs, list):
+        if not isinstance(self.inputs, (list, array)):
             raise ValueError("Inputs must be a list of numbers.")
         if len(self.inputs) < 2:
             raise ValueError("Inputs must be a list with at least two numbers.")
+        # No vectorized branch: sum() over a list is already a C loop
         return sum(self.inputs)
 
 class Subtraction(Calculation):
@@ -279,10 +585,14 @@ class Subtraction(Calculation):
         Raises:
             ValueError: If inputs are not a list or if fewer than 2 numbers provided
         """
-        if not isinstance(self.inputs, list):
+        if not isinstance(self.inputs, (list, array)):
             raise ValueError("Inputs must be a list of numbers.")
         if len(self.inputs) < 2:
             raise ValueError("Inputs must be a list with at least two numbers.")
+        if vectorized.should_vectorize(self.inputs):
+            result = vectorized.subtract(self.inputs)
+            if result is not None:
+                return result
         result = self.inputs[0]
         for value in self.inputs[1:]:
             result -= value
@@ -309,10 +619,14 @@ class Multiplication(Calculation):
         Raises:
             ValueError: If inputs are not a list or if fewer than 2 numbers provided
         """
-        if not isinstance(self.inputs, list):
+        if not isinstance(self.inputs, (list, array)):
             raise ValueError("Inputs must be a list of numbers.")
         if len(self.inputs) < 2:
             raise ValueError("Inputs must be a list with at least two numbers.")
+        if vectorized.should_vectorize(self.inputs):
+            result = vectorized.multiply(self.inputs)
+            if result is not None:
+                return result
         result = 1
         for value in self.inputs:
             result *= value
@@ -346,10 +660,14 @@ class Division(Calculation):
             ValueError: If inputs are not a list, if fewer than 2 numbers provided,
                         or if attempting to divide by zero
         """
-        if not isinstance(self.inputs, list):
+        if not isinstance(self.inputs, (list, array)):
             raise ValueError("Inputs must be a list of numbers.")
         if len(self.inputs) < 2:
             raise ValueError("Inputs must be a list with at least two numbers.")
+        if vectorized.should_vectorize(self.inputs):
+            result = vectorized.divide(self.inputs)
+            if result is not None:
+                return result
         result = self.inputs[0]
         for value in self.inputs[1:]:
             if value == 0:
@@ -383,7 +701,7 @@ class Exponentiation(Calculation):
             ValueError: If inputs are not a list, if fewer than 2 numbers provided
         """
 
-        if not isinstance(self.inputs, list):
+        if not isinstance(self.inputs, (list, array)):
             raise ValueError("Inputs must be a list of numbers.")
         if len(self.inputs) < 2:
             raise ValueError("Inputs must be a list with at least two numbers.")
@@ -421,7 +739,7 @@ class Root(Calculation):
                 taking root of negative number, and zero root
         """
 
-        if not isinstance(self.inputs, list):
+        if not isinstance(self.inputs, (list, array)):
             raise ValueError("Inputs must be a list of numbers.")
         if len(self.inputs) < 2:
             raise ValueError("Inputs must be a list with at least two numbers.")
@@ -432,4 +750,9 @@ class Root(Calculation):
             elif value < 0:
                 raise ValueError("Cannot take root with a negative degree.")
             result = result ** (1 / value)
-        return result
\ No newline at end of file
+        return result
+
+
+if settings.CALCULATIONS_PARTITIONED:
+    # Create the default and upcoming monthly partitions with the table
+    event.listen(Calculation.__table__, "after_create", partitions.create_initial_partitions)
@@ -0,0 +1,273 @@
+# app/models/calculation_bulk.py
+"""
+Filter-based bulk changes to a user's calculations.
+
+DELETE /calculations and PATCH /calculations act on every calculation of a
+user that matches a filter: ids, type, and/or a created_at range; see
+app.models.calculation_reads.user_calculations_query(). The filter can match
+millions of rows, so the work is split into chunks of
+CALCULATIONS_BULK_CHUNK_SIZE rows. Each chunk is one set-based statement,
+committed on its own, so row locks are held only for the duration of a
+chunk. Nothing is loaded into the ORM.
+
+Chunks walk the (user_id, created_at, id) index newest first. Each chunk
+statement also carries the collection version bump and the stats rollup
+invalidation as CTEs. A chunk that matches nothing is rolled back, so a
+no-op does not bump the version.
+
+Because every chunk is committed on its own, a failure part-way leaves the
+earlier chunks applied. Callers report the counts of what was done.
+
+Functions:
+- bulk_delete(db, user_id, filters): Delete the matching calculations.
+- bulk_update(db, user_id, filters, new_type, inputs): Re-type and/or
+  re-input the matching calculations, recomputing their results.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+import uuid
+
+from sqlalchemy import Float, DateTime, column, delete, func, select, update, values
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.config import settings
+from app.models.calculation import Calculation
+from app.models.calculation_reads import user_calculations_query
+from app.models.collection_version import CalculationCollectionVersion
+from app.models.stats import CalculationStatsRollup
+from app.operations import result_cache
+
+
+def _chunk(
+    user_id: uuid.UUID,
+    filters: dict,
+    chunk_size: int,
+    after: Optional[tuple] = None,
+    types: Optional[Sequence[str]] = None,
+):
+    """CTE of the next chunk of matching rows (of `types`, if given): (id, created_at)."""
+    table = Calculation.__table__
+    query = user_calculations_query(user_id, after=after, entities=[table.c.id, table.c.created_at], **filters)
+    if types is not None:
+        query = query.where(table.c.type.in_(list(types)))
+    return query.limit(chunk_size).cte("chunk")
+
+
+def _side_effects(user_id: uuid.UUID, chunk) -> list:
+    """Version bump and rollup invalidation for the rows of a chunk."""
+    return [
+        CalculationStatsRollup.mark_dirty_cte(user_id, select(func.min(chunk.c.created_at)).scalar_subquery()),
+        CalculationCollectionVersion.bump_cte(user_id),
+    ]
+
+
+def _run_chunk(db, stmt) -> list:
+    """Execute a chunk statement and commit it, or roll it back if it matched nothing."""
+    rows = db.execute(stmt).all()
+    if rows:
+        db.commit()
+    else:
+        db.rollback()
+    return rows
+
+
+def _last(rows) -> tuple:
+    """Keyset position after a chunk: its oldest (created_at, id)."""
+    return min((row.created_at, row.id) for row in rows)
+
+
+def bulk_delete(db, user_id: uuid.UUID, filters: dict, chunk_size: Optional[int] = None) -> int:
+    """
+    Delete every calculation of the user matching `filters`, one chunk per
+    statement and transaction.
+
+    Args:
+        db: SQLAlchemy database session; committed after every chunk
+        user_id: Owner of the calculations
+        filters: Keyword filters of user_calculations_query()
+        chunk_size: Rows per statement (CALCULATIONS_BULK_CHUNK_SIZE)
+
+    Returns:
+        int: Number of calculations deleted
+    """
+    chunk_size = chunk_size or settings.CALCULATIONS_BULK_CHUNK_SIZE
+    table = Calculation.__table__
+    deleted = 0
+    while True:
+        # Deleted rows no longer match, so every chunk starts from the top
+        chunk = _chunk(user_id, filters, chunk_size)
+        stmt = delete(table).where(table.c.id.in_(select(chunk.c.id))).returning(table.c.id)
+        for cte in _side_effects(user_id, chunk):
+            stmt = stmt.add_cte(cte)
+        rows = _run_chunk(db, stmt)
+        if not rows:
+            return deleted
+        deleted += len(rows)
+
+
+def bulk_update(
+    db,
+    user_id: uuid.UUID,
+    filters: dict,
+    new_type: Optional[str] = None,
+    inputs: Optional[Sequence[float]] = None,
+    chunk_size: Optional[int] = None,
+) -> Tuple[int, int]:
+    """
+    Change the type and/or the inputs of every calculation of the user
+    matching `filters`, and recompute their results.
+
+    - New inputs (with or without a new type) give every row the same
+      inputs, so results are computed up front, once for each type among
+      the matching rows. Each chunk is one UPDATE; rows whose type rejects
+      the inputs are skipped.
+    - A new type alone needs each row's own inputs: each chunk reads its
+      rows, evaluates them together (Calculation.evaluate_many) and writes
+      the results with one UPDATE ... FROM (VALUES ...). Rows modified in
+      between are left unchanged.
+
+    Args:
+        db: SQLAlchemy database session; committed after every chunk
+        user_id: Owner of the calculations
+        filters: Keyword filters of user_calculations_query()
+        new_type: Type to give the calculations
+        inputs: Inputs to give the calculations
+        chunk_size: Rows per statement (CALCULATIONS_BULK_CHUNK_SIZE)
+
+    Returns:
+        (updated, failed): Number of calculations changed, and of matching
+        calculations left unchanged because the change is invalid for them
+
+    Raises:
+        ValueError: If neither new_type nor inputs is given, or if the
+            new inputs are invalid for the new type, or for every type of
+            the matching rows
+    """
+    if new_type is None and inputs is None:
+        raise ValueError("Nothing to update: give a new type and/or new inputs.")
+    chunk_size = chunk_size or settings.CALCULATIONS_BULK_CHUNK_SIZE
+    if inputs is None:
+        return _retype(db, user_id, filters, new_type, chunk_size)
+
+    table = Calculation.__table__
+    if new_type is not None:
+        # Same type and inputs for every row: one result for all of them
+        results: Dict[str, float] = {new_type: _evaluate(new_type, inputs)}
+        failing: List[str] = []
+    else:
+        results, failing, errors = {}, [], []
+        for calculation_type in _matched_types(db, user_id, filters):
+            try:
+                results[calculation_type] = _evaluate(calculation_type, inputs)
+            except ValueError as e:
+                failing.append(calculation_type)
+                errors.append(str(e))
+        if errors and not results:
+            # No matching calculation can take the inputs, as for a single update
+            db.rollback()
+            raise ValueError(errors[0])
+
+    failed = 0
+    if failing:
+        query = user_calculations_query(user_id, entities=[func.count()], **filters)
+        failed = db.scalar(query.where(table.c.type.in_(failing)).order_by(None))
+    if not results:
+        return 0, failed
+
+    changes = {"inputs": inputs, "updated_at": datetime.utcnow()}
+    if new_type is not None:
+        changes["type"] = new_type
+        changes["result"] = results[new_type]
+        types = None
+    else:
+        changes["result"] = Calculation.result_case(results)
+        # Only rows of a type with a result, e.g. not of a type added since
+        types = list(results)
+
+    updated = 0
+    after = None
+    while True:
+        chunk = _chunk(user_id, filters, chunk_size, after, types=types)
+        stmt = (
+            update(table)
+            .where(table.c.id.in_(select(chunk.c.id)))
+            .values(**changes)
+            .returning(table.c.id, table.c.created_at)
+        )
+        for cte in _side_effects(user_id, chunk):
+            stmt = stmt.add_cte(cte)
+        rows = _run_chunk(db, stmt)
+        if not rows:
+            return updated, failed
+        updated += len(rows)
+        after = _last(rows)
+
+
+def _evaluate(calculation_type: str, inputs: Sequence[float]) -> float:
+    """Cached result of the inputs under a type; any invalid result is a ValueError."""
+    try:
+        return result_cache.evaluate(calculation_type, inputs)
+    except ArithmeticError as e:
+        raise ValueError(str(e)) from e
+
+
+def _matched_types(db, user_id: uuid.UUID, filters: dict) -> List[str]:
+    """Types of the calculations matching `filters`, sorted."""
+    if "calculation_type" in filters:
+        return [filters["calculation_type"]]
+    table = Calculation.__table__
+    query = user_calculations_query(user_id, entities=[table.c.type], **filters).order_by(None).distinct()
+    return sorted(db.scalars(query))
+
+
+def _retype(db, user_id: uuid.UUID, filters: dict, new_type: str, chunk_size: int) -> Tuple[int, int]:
+    """bulk_update() with a new type only: results depend on each row's inputs."""
+    table = Calculation.__table__
+    updated = failed = 0
+    after = None
+    while True:
+        query = user_calculations_query(
+            user_id,
+            after=after,
+            entities=[table.c.id, table.c.created_at, table.c.updated_at, table.c.inputs],
+            **filters,
+        ).limit(chunk_size)
+        rows = db.execute(query).all()
+        if not rows:
+            return updated, failed
+        after = _last(rows)
+
+        results, errors = result_cache.evaluate_many(new_type, [row.inputs for row in rows])
+        failed += len(errors)
+        computed = [
+            (row.id, row.updated_at, results[index])
+            for index, row in enumerate(rows)
+            if index not in errors
+        ]
+        if computed:
+            # Only rows that have not changed since they were read
+            chunk = values(
+                column("id", UUID(as_uuid=True)),
+                column("updated_at", DateTime()),
+                column("result", Float()),
+                name="computed",
+            ).data([(calc_id, updated_at, result) for calc_id, updated_at, result in computed])
+            stmt = (
+                update(table)
+                .where(
+                    table.c.user_id == user_id,
+                    table.c.id == chunk.c.id,
+                    table.c.updated_at == chunk.c.updated_at,
+                )
+                .values(type=new_type, result=chunk.c.result, updated_at=datetime.utcnow())
+                .returning(table.c.id)
+            )
+            oldest = min(row.created_at for row in rows)
+            stmt = stmt.add_cte(CalculationStatsRollup.mark_dirty_cte(user_id, oldest))
+            stmt = stmt.add_cte(CalculationCollectionVersion.bump_cte(user_id))
+            changed = len(_run_chunk(db, stmt))
+            updated += changed
+            failed += len(computed) - changed
+        else:
+            db.rollback()
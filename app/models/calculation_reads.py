@@ -0,0 +1,111 @@
+# app/models/calculation_reads.py
+"""
+Read-only queries of calculations.
+
+GET endpoints only serialize calculations, so they do not need ORM
+entities. Loading an entity costs an identity-map registration, the
+instantiation of its polymorphic subclass and change tracking. The queries
+here select just the needed columns from the calculations table instead.
+They return plain Rows with the same attribute names, which
+app.core.serialization encodes directly.
+
+Write paths do not load entities either: single-row changes use
+Calculation.update_returning() / delete_returning(), and filter-based bulk
+changes app.models.calculation_bulk, which builds on
+user_calculations_query().
+
+Functions:
+- user_calculations_query(user_id, ...): Newest-first SELECT of a user's
+  calculations, with the id / type / created_at / keyset filters.
+- page_query(user_id, limit, ...): One keyset page of it.
+- owned_query(calc_id, user_id): One calculation of a user.
+- iter_rows(connection, query, chunk_size): Stream the rows of a large
+  query through a server-side cursor (yield_per).
+"""
+
+from datetime import datetime
+from typing import Iterator, Optional, Sequence
+import uuid
+
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.engine import Row
+
+from app.models.calculation import Calculation
+
+# The fields of CalculationResponse
+RESPONSE_COLUMNS = ("id", "user_id", "type", "inputs", "result", "created_at", "updated_at")
+
+
+def columns(names: Sequence[str] = RESPONSE_COLUMNS) -> list:
+    """Table columns of the given names."""
+    table = Calculation.__table__
+    return [table.c[name] for name in names]
+
+
+def user_calculations_query(
+    user_id: uuid.UUID,
+    calculation_type: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    after: Optional[tuple] = None,
+    entities: Optional[Sequence] = None,
+    ids: Optional[Sequence[uuid.UUID]] = None,
+) -> Select:
+    """
+    SELECT of a user's calculations, newest first.
+
+    The order matches the (user_id, created_at, id) index, so Postgres walks
+    the index and does not sort.
+
+    Args:
+        user_id: The UUID of the user who owns the calculations
+        calculation_type: Only return calculations of this type
+        created_after: Only return calculations created at or after this time
+        created_before: Only return calculations created before this time
+        after: (created_at, id) of the last row of the previous page
+        entities: What to select; the RESPONSE_COLUMNS by default
+        ids: Only return these calculations
+
+    Returns:
+        Select: The query
+    """
+    table = Calculation.__table__
+    query = select(*(entities or columns())).where(table.c.user_id == user_id)
+    if ids is not None:
+        query = query.where(table.c.id.in_(list(ids)))
+    if calculation_type is not None:
+        query = query.where(table.c.type == calculation_type)
+    if created_after is not None:
+        query = query.where(table.c.created_at >= created_after)
+    if created_before is not None:
+        query = query.where(table.c.created_at < created_before)
+    if after is not None:
+        # Row-value comparison lets Postgres seek directly into the index.
+        # The redundant bound on created_at alone lets it also skip the
+        # partitions newer than the cursor (see app/models/partitions.py).
+        query = query.where(
+            tuple_(table.c.created_at, table.c.id) < tuple(after),
+            table.c.created_at <= after[0],
+        )
+    return query.order_by(table.c.created_at.desc(), table.c.id.desc())
+
+
+def page_query(user_id: uuid.UUID, limit: int, **filters) -> Select:
+    """One keyset page of user_calculations_query(); see there for the filters."""
+    return user_calculations_query(user_id, **filters).limit(limit)
+
+
+def owned_query(calc_id: uuid.UUID, user_id: uuid.UUID, names: Sequence[str] = RESPONSE_COLUMNS) -> Select:
+    """SELECT of one calculation, if it belongs to the user."""
+    table = Calculation.__table__
+    return select(*columns(names)).where(table.c.id == calc_id, table.c.user_id == user_id)
+
+
+def iter_rows(connection, query: Select, chunk_size: int = 1000) -> Iterator[Row]:
+    """
+    Rows of a large query, fetched `chunk_size` at a time through a
+    server-side cursor, so memory use does not depend on the row count.
+    """
+    result = connection.execute(query.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        yield from rows
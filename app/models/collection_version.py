@@ -0,0 +1,79 @@
+# app/models/collection_version.py
+"""
+Per-user Calculation Collection Version
+
+A counter per user that changes whenever any of the user's calculations is
+created, updated or deleted. The list endpoint derives its ETag from it:
+the counter lookup is a single primary-key read, so a poll that turns out
+to be unchanged never runs the list query.
+
+The counter is bumped in the same transaction as the write it describes,
+so the version a reader sees can never be ahead of, or behind, the
+committed data. A missing row means version 0.
+"""
+
+import uuid
+
+from sqlalchemy import BigInteger, Column, ForeignKey, literal, select
+from sqlalchemy.dialects.postgresql import UUID, insert
+
+from app.database import Base
+
+
+class CalculationCollectionVersion(Base):
+    """Version of one user's set of calculations."""
+
+    __tablename__ = "calculation_collection_versions"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+    @classmethod
+    def current(cls, db, user_id: uuid.UUID) -> int:
+        """Return the user's current version (0 if never bumped)."""
+        return db.scalar(select(cls.version).where(cls.user_id == user_id)) or 0
+
+    @classmethod
+    def bump_statement(cls, user_id: uuid.UUID):
+        """The upsert that increments the user's version."""
+        table = cls.__table__
+        stmt = insert(table).values(user_id=user_id, version=1)
+        return stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={"version": table.c.version + 1},
+        ).returning(table.c.version)
+
+    @classmethod
+    def bump(cls, db, user_id: uuid.UUID) -> None:
+        """
+        Increment the user's version with one upsert. Call this in the
+        transaction of every write to the user's calculations; the caller
+        commits.
+        """
+        db.execute(cls.bump_statement(user_id))
+
+    @classmethod
+    def bump_cte(cls, user_id: uuid.UUID):
+        """
+        The upsert of bump() as a data-modifying CTE, to attach to the write
+        itself (stmt.add_cte()) so no extra round trip is needed.
+        """
+        return cls.bump_statement(user_id).cte("bump_collection_version")
+
+    @classmethod
+    def bump_users(cls, db, user_ids) -> None:
+        """
+        Increment the version of every user in `user_ids` (a SELECT of user
+        ids) with one upsert, for writes that span many users, e.g. dropping
+        a partition of old calculations. The caller commits.
+        """
+        table = cls.__table__
+        users = user_ids.subquery()
+        stmt = insert(table).from_select(
+            ["user_id", "version"],
+            select(users.c[0], literal(1)).distinct(),
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={"version": table.c.version + 1},
+        ))
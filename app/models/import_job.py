@@ -0,0 +1,87 @@
+# app/models/import_job.py
+"""
+Calculation Import Job Model
+
+One row per POST /calculations/import upload. The import itself runs in
+the background (app.jobs.import_calculations). It updates the row after
+every batch, so GET /calculations/import/{job_id} reports progress while
+the import is running.
+"""
+
+from datetime import datetime
+from typing import Optional
+import uuid
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, String, Text, update
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.database import Base
+
+IMPORT_PENDING = "pending"
+IMPORT_RUNNING = "running"
+IMPORT_COMPLETED = "completed"
+IMPORT_FAILED = "failed"
+
+
+class CalculationImportJob(Base):
+    """Status and row counters of one calculation import."""
+
+    __tablename__ = "calculation_imports"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    format = Column(String(10), nullable=False)
+    filename = Column(String(255), nullable=True)
+    status = Column(String(20), nullable=False, default=IMPORT_PENDING)
+    rows_read = Column(BigInteger, nullable=False, default=0)
+    rows_imported = Column(BigInteger, nullable=False, default=0)
+    rows_failed = Column(BigInteger, nullable=False, default=0)
+    error = Column(Text, nullable=True)  # why the whole job failed, if it did
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+
+    @classmethod
+    def create(cls, db, user_id: uuid.UUID, format: str, filename: Optional[str] = None) -> "CalculationImportJob":
+        """
+        Register a new pending import. The caller commits.
+
+        Args:
+            db: SQLAlchemy database session
+            user_id: Owner of the imported calculations
+            format: "csv" or "ndjson"
+            filename: Name of the uploaded file, for display
+
+        Returns:
+            CalculationImportJob: The new job
+        """
+        job = cls(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            format=format,
+            filename=filename,
+            status=IMPORT_PENDING,
+            rows_read=0,
+            rows_imported=0,
+            rows_failed=0,
+            created_at=datetime.utcnow(),
+        )
+        db.add(job)
+        db.flush()
+        return job
+
+    @classmethod
+    def update_progress(cls, connection, job_id: uuid.UUID, **values) -> None:
+        """
+        Write status or counters of a job with a single UPDATE. The caller
+        commits.
+
+        Args:
+            connection: Connection or session to execute on
+            job_id: The job to update
+            **values: Columns to set
+        """
+        connection.execute(update(cls.__table__).where(cls.__table__.c.id == job_id).values(**values))
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (IMPORT_COMPLETED, IMPORT_FAILED)
@@ -0,0 +1,282 @@
+# app/models/partitions.py
+"""
+Monthly Partitions of the Calculations Table
+
+With CALCULATIONS_PARTITIONED enabled, `calculations` is created as a
+declaratively partitioned table: PARTITION BY RANGE (created_at), with one
+partition per calendar month. Postgres requires the partition key in every
+unique constraint, so the table's primary key becomes (id, created_at). The
+ORM keeps identifying calculations by `id` alone.
+
+- Each month's rows live in their own table and indexes, so index depth and
+  vacuum work are bounded by the size of a month, not of the history.
+- A query bounded on created_at only scans the partitions its range covers
+  (partition pruning). GET /calculations pages are ordered by created_at, so
+  they read the newest partitions first and stop once the page is full.
+- Retention drops whole partitions (DROP TABLE) instead of deleting old
+  rows one by one, which is instant and leaves no dead tuples to vacuum.
+
+Partitions are named calculations_pYYYY_MM. A DEFAULT partition
+(calculations_default) catches rows outside every monthly partition, so an
+insert never fails because maintenance fell behind. When a monthly
+partition is created for a range that already has rows in the default
+partition, those rows are moved into it.
+
+The partitions for the current month and the next
+CALCULATIONS_PARTITION_MONTHS_AHEAD months are created with the table, by
+`python -m app.database_init` on every deploy, and by the
+app.jobs.partition_maintenance job, which also applies
+CALCULATIONS_RETENTION_MONTHS. Partition DDL runs under an advisory lock,
+so concurrent runs wait for each other instead of racing on a partition.
+The application workers never create partitions.
+
+Functions:
+- is_partitioned(connection): Whether the table is partitioned.
+- list_partitions(connection): Its partitions and their ranges.
+- ensure_partitions(connection, now, months_ahead): Create missing partitions.
+- drop_expired_partitions(connection, now, retention_months): Apply retention.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import column, select, table, text
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.models.collection_version import CalculationCollectionVersion
+from app.models.stats import CalculationStatsRollup
+
+TABLE_NAME = "calculations"
+DEFAULT_PARTITION = f"{TABLE_NAME}_default"
+
+# pg_advisory_lock() key held while partitions are created or dropped
+PARTITION_LOCK_ID = 7_210_425_002
+
+# FOR VALUES FROM ('2025-03-01 00:00:00') TO ('2025-04-01 00:00:00')
+_BOUNDS = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+_PARTITION_NAME = re.compile(rf"^{TABLE_NAME}_(p\d{{4}}_\d{{2}}|default)$")
+
+
+@dataclass
+class Partition:
+    """One partition of the calculations table; a default partition has no bounds."""
+    name: str
+    lower: Optional[datetime] = None
+    upper: Optional[datetime] = None
+
+    @property
+    def is_default(self) -> bool:
+        return self.lower is None
+
+
+def month_start(value: datetime) -> datetime:
+    """Start of the month containing `value`."""
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    """Start of the month `months` months after (or before) the month of `value`."""
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime) -> str:
+    """Name of the partition holding the month starting at `month`."""
+    return f"{TABLE_NAME}_p{month:%Y_%m}"
+
+
+def is_partition_name(name: str) -> bool:
+    """Return True if `name` is the name of a partition of the calculations table."""
+    return _PARTITION_NAME.match(name) is not None
+
+
+def is_partitioned(connection: Connection) -> bool:
+    """Return True if the calculations table exists and is partitioned."""
+    return connection.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": TABLE_NAME},
+    ).scalar()
+
+
+def list_partitions(connection: Connection) -> List[Partition]:
+    """Partitions of the calculations table, monthly ones oldest first, default last."""
+    rows = connection.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": TABLE_NAME},
+    ).all()
+    partitions = []
+    for name, bound in rows:
+        match = _BOUNDS.search(bound)
+        if match is None:
+            partitions.append(Partition(name))
+        else:
+            lower, upper = (datetime.fromisoformat(value) for value in match.groups())
+            partitions.append(Partition(name, lower, upper))
+    return sorted(partitions, key=lambda partition: (partition.is_default, partition.lower))
+
+
+def _literal(value: datetime) -> str:
+    return f"'{value:%Y-%m-%d %H:%M:%S}'"
+
+
+def _has_default_rows(connection: Connection, lower: datetime, upper: datetime) -> bool:
+    return connection.execute(
+        text(
+            f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+            "WHERE created_at >= :lower AND created_at < :upper)"
+        ),
+        {"lower": lower, "upper": upper},
+    ).scalar()
+
+
+def create_partition(connection: Connection, month: datetime) -> str:
+    """
+    Create the partition of one month.
+
+    If the default partition already holds rows of that month, Postgres
+    refuses to create the partition. The partition is then built as a
+    standalone table, the rows are moved into it, and it is attached.
+
+    Returns:
+        str: The name of the partition
+    """
+    name = partition_name(month)
+    lower, upper = _literal(month), _literal(add_months(month, 1))
+    exists = connection.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+    if exists:
+        return name
+
+    default_exists = connection.execute(
+        text("SELECT to_regclass(:name) IS NOT NULL"), {"name": DEFAULT_PARTITION}
+    ).scalar()
+    if not default_exists or not _has_default_rows(connection, month, add_months(month, 1)):
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {TABLE_NAME} FOR VALUES FROM ({lower}) TO ({upper})"
+        ))
+        return name
+
+    connection.execute(text(f"CREATE TABLE {name} (LIKE {TABLE_NAME} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    connection.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+        f"WHERE created_at >= {lower} AND created_at < {upper} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ))
+    connection.execute(text(
+        f"ALTER TABLE {TABLE_NAME} ATTACH PARTITION {name} FOR VALUES FROM ({lower}) TO ({upper})"
+    ))
+    return name
+
+
+def ensure_partitions(
+    connection: Connection,
+    now: Optional[datetime] = None,
+    months_ahead: Optional[int] = None,
+) -> List[str]:
+    """
+    Create the default partition and the monthly partitions from the
+    current month through `months_ahead` months ahead, where missing.
+    A no-op if the table is not partitioned. The caller commits, which
+    releases the advisory lock taken here (PARTITION_LOCK_ID).
+
+    Args:
+        connection: Connection to run on
+        now: Current time (default: datetime.utcnow())
+        months_ahead: Upcoming months to create
+            (default: settings.CALCULATIONS_PARTITION_MONTHS_AHEAD)
+
+    Returns:
+        List[str]: Names of the partitions that were created
+    """
+    if not is_partitioned(connection):
+        return []
+    if months_ahead is None:
+        months_ahead = settings.CALCULATIONS_PARTITION_MONTHS_AHEAD
+    current = month_start(now or datetime.utcnow())
+
+    # Another process creating partitions is waited for, then seen below
+    connection.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": PARTITION_LOCK_ID})
+    existing = {partition.name for partition in list_partitions(connection)}
+    created = []
+    if DEFAULT_PARTITION not in existing:
+        connection.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {TABLE_NAME} DEFAULT"))
+        created.append(DEFAULT_PARTITION)
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if partition_name(month) not in existing:
+            created.append(create_partition(connection, month))
+    return created
+
+
+def _invalidate(connection: Connection, user_ids, oldest: Optional[datetime]) -> None:
+    """Bump the collection version and invalidate the stats rollup of the affected users."""
+    CalculationStatsRollup.mark_dirty_users(connection, user_ids, oldest)
+    CalculationCollectionVersion.bump_users(connection, user_ids)
+
+
+def drop_expired_partitions(
+    connection: Connection,
+    now: Optional[datetime] = None,
+    retention_months: Optional[int] = None,
+) -> List[str]:
+    """
+    Drop the monthly partitions that ended more than `retention_months`
+    months before the current month, and delete the rows of that age from
+    the default partition. Each drop is committed on its own, after
+    invalidating the list caches and stats rollups of the users who had
+    rows in it.
+
+    A no-op if the table is not partitioned or no retention is set.
+
+    Args:
+        connection: Connection to run on; committed after every partition
+        now: Current time (default: datetime.utcnow())
+        retention_months: Complete months to keep before the current one
+            (default: settings.CALCULATIONS_RETENTION_MONTHS)
+
+    Returns:
+        List[str]: Names of the partitions that were dropped
+    """
+    if retention_months is None:
+        retention_months = settings.CALCULATIONS_RETENTION_MONTHS
+    if retention_months is None or not is_partitioned(connection):
+        return []
+    cutoff = add_months(month_start(now or datetime.utcnow()), -retention_months)
+
+    # Held across the per-partition commits, so concurrent runs do not
+    # drop the same partition twice
+    connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": PARTITION_LOCK_ID})
+    connection.commit()
+    dropped = []
+    try:
+        for partition in list_partitions(connection):
+            if partition.is_default:
+                expired = table(DEFAULT_PARTITION, column("user_id"), column("created_at"))
+                user_ids = select(expired.c.user_id).where(expired.c.created_at < cutoff)
+                _invalidate(connection, user_ids, None)
+                connection.execute(
+                    text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at < :cutoff"), {"cutoff": cutoff}
+                )
+                connection.commit()
+            elif partition.upper <= cutoff:
+                expired = table(partition.name, column("user_id"))
+                _invalidate(connection, select(expired.c.user_id), partition.lower)
+                connection.execute(text(f"DROP TABLE {partition.name}"))
+                connection.commit()
+                dropped.append(partition.name)
+    finally:
+        connection.rollback()
+        connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": PARTITION_LOCK_ID})
+        connection.commit()
+    return dropped
+
+
+def create_initial_partitions(target, connection: Connection, **kw) -> None:
+    """after_create listener of the calculations table: create its first partitions."""
+    ensure_partitions(connection)
@@ -0,0 +1,353 @@
+# app/models/stats.py
+"""
+Calculation Statistics Module
+
+Server-side aggregates for GET /calculations/stats: per-type count, sum,
+min, max and average of `result`, and a histogram of calculations per time
+bucket (hour, day or week) and type.
+
+Everything is computed in SQL with GROUP BY and date_trunc(); no
+calculation rows are loaded into Python. The live queries are served by
+the (user_id, type, created_at) INCLUDE (result) index on calculations.
+
+For very large users an hourly rollup can be materialized:
+
+- CalculationStatsRollup holds one row per (user, type, hour) with the
+  count, result count, sum, min and max of that hour.
+- CalculationStatsRollupState holds one row per enabled user. Its
+  `watermark` marks the end of the materialized hours, and its `dirty`
+  flag is set when an older calculation changes.
+
+A stats query for an enabled user reads the rollup rows before the
+watermark, plus a live aggregate of the few calculations created after
+it, merged with UNION ALL. The answer is therefore always current, and
+refreshing only moves the watermark forward, aggregating just the new
+hours. Updating or deleting a calculation created before the watermark
+marks the user dirty (mark_dirty()). A dirty rollup is rebuilt on the next
+read before it is used.
+
+The watermark trails the clock by CALCULATION_STATS_ROLLUP_LAG_SECONDS.
+created_at is assigned when a row is created, so a transaction that
+commits late can insert rows slightly in the past. The lag keeps such
+rows out of hours that have already been materialized.
+
+Users are enabled by the app.jobs.stats_rollup job, based on their number
+of calculations.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import uuid
+
+from sqlalchemy import (
+    BigInteger, Boolean, Column, DateTime, Float, ForeignKey, String,
+    cast, delete, func, literal, literal_column, select, union_all, update,
+)
+from sqlalchemy.dialects.postgresql import UUID, insert
+
+from app.core.config import settings
+from app.database import Base
+
+# Epoch used as the watermark of a rollup that has not been built yet
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _trunc(unit: str, column):
+    """
+    date_trunc() with the unit inlined, so the SELECT and GROUP BY
+    expressions are identical even with server-side parameters (asyncpg).
+    """
+    if unit not in ("hour", "day", "week"):
+        raise ValueError(f"Unsupported interval: {unit!r}")
+    return func.date_trunc(literal_column(f"'{unit}'"), column)
+
+
+def _filters(column_created_at, column_type, calculation_type, created_after, created_before) -> list:
+    """WHERE clauses shared by the live and rollup queries."""
+    clauses = []
+    if calculation_type is not None:
+        clauses.append(column_type == calculation_type)
+    if created_after is not None:
+        clauses.append(column_created_at >= created_after)
+    if created_before is not None:
+        clauses.append(column_created_at < created_before)
+    return clauses
+
+
+def _type_row(row) -> Dict[str, Any]:
+    return {
+        "type": row.type,
+        "count": row.count,
+        "sum": row.result_sum,
+        "min": row.result_min,
+        "max": row.result_max,
+        "avg": row.result_sum / row.result_count if row.result_count else None,
+    }
+
+
+def _bucket_row(row) -> Dict[str, Any]:
+    return {
+        "bucket_start": row.bucket_start,
+        "type": row.type,
+        "count": row.count,
+        "sum": row.result_sum,
+        "avg": row.result_sum / row.result_count if row.result_count else None,
+    }
+
+
+def _is_hour_aligned(value: Optional[datetime]) -> bool:
+    return value is None or value == value.replace(minute=0, second=0, microsecond=0)
+
+
+class CalculationStatsRollup(Base):
+    """Hourly per-type aggregates of one user's calculations."""
+
+    __tablename__ = "calculation_stats_rollup"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    type = Column(String(50), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    count = Column(BigInteger, nullable=False)
+    result_count = Column(BigInteger, nullable=False)
+    result_sum = Column(Float, nullable=True)
+    result_min = Column(Float, nullable=True)
+    result_max = Column(Float, nullable=True)
+
+    @classmethod
+    def enable(cls, db, user_id: uuid.UUID) -> None:
+        """
+        Start materializing the rollup of a user.
+
+        The first refresh() (on the next stats read, or from the job)
+        builds it. The caller commits.
+        """
+        state = db.get(CalculationStatsRollupState, user_id)
+        if state is None:
+            db.add(CalculationStatsRollupState(user_id=user_id, watermark=_EPOCH, dirty=True))
+            db.flush()
+
+    @classmethod
+    def mark_dirty(cls, db, user_id: uuid.UUID, created_at: Optional[datetime]) -> None:
+        """
+        Invalidate the user's rollup if a calculation created at `created_at`
+        is part of it. Call this when a calculation is updated or deleted.
+        This is a single cheap UPDATE, and a no-op for users without a
+        rollup.
+        """
+        db.execute(cls.mark_dirty_statement(user_id, created_at))
+
+    @classmethod
+    def mark_dirty_statement(cls, user_id: uuid.UUID, created_at):
+        """The UPDATE of mark_dirty(); `created_at` may be a SQL expression."""
+        state = CalculationStatsRollupState.__table__
+        stmt = update(state).where(state.c.user_id == user_id).values(dirty=True)
+        if created_at is not None:
+            stmt = stmt.where(state.c.watermark > created_at)
+        return stmt.returning(state.c.user_id)
+
+    @classmethod
+    def mark_dirty_cte(cls, user_id: uuid.UUID, created_at):
+        """mark_dirty() as a data-modifying CTE, to attach to the write itself."""
+        return cls.mark_dirty_statement(user_id, created_at).cte("mark_stats_rollup_dirty")
+
+    @classmethod
+    def mark_dirty_users(cls, db, user_ids, created_at: Optional[datetime]) -> None:
+        """
+        mark_dirty() for every user in `user_ids` (a SELECT of user ids) at
+        once, for writes that span many users. The caller commits.
+        """
+        state = CalculationStatsRollupState.__table__
+        stmt = update(state).where(state.c.user_id.in_(user_ids)).values(dirty=True)
+        if created_at is not None:
+            stmt = stmt.where(state.c.watermark > created_at)
+        db.execute(stmt)
+
+    @classmethod
+    def refresh(cls, db, user_id: uuid.UUID, now: Optional[datetime] = None) -> bool:
+        """
+        Bring a user's rollup up to date.
+
+        A clean rollup only aggregates the hours between the old and the new
+        watermark. A dirty one is rebuilt from scratch. The caller commits.
+
+        Returns:
+            bool: False if the rollup is not enabled for the user
+        """
+        from app.models.calculation import Calculation
+
+        # populate_existing re-reads the row after the lock is granted; the
+        # session may already hold a stale copy from calculation_stats()
+        state = db.get(CalculationStatsRollupState, user_id, with_for_update=True, populate_existing=True)
+        if state is None:
+            return False
+
+        now = now or datetime.utcnow()
+        watermark = (now - timedelta(seconds=settings.CALCULATION_STATS_ROLLUP_LAG_SECONDS)).replace(
+            minute=0, second=0, microsecond=0
+        )
+        start = state.watermark
+        if state.dirty:
+            db.execute(delete(cls.__table__).where(cls.user_id == user_id))
+            start = _EPOCH
+        if watermark > start or state.dirty:
+            table = Calculation.__table__
+            bucket = _trunc("hour", table.c.created_at)
+            hourly = (
+                select(
+                    literal(user_id, UUID(as_uuid=True)),
+                    table.c.type,
+                    bucket,
+                    func.count(),
+                    func.count(table.c.result),
+                    func.sum(table.c.result),
+                    func.min(table.c.result),
+                    func.max(table.c.result),
+                )
+                .where(table.c.user_id == user_id, table.c.created_at >= start, table.c.created_at < watermark)
+                .group_by(table.c.type, bucket)
+            )
+            stmt = insert(cls.__table__).from_select(
+                ["user_id", "type", "bucket_start", "count", "result_count", "result_sum", "result_min", "result_max"],
+                hourly,
+            )
+            # A refresh that started from an older watermark may have written
+            # the same hours already; its aggregates are replaced, not added
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["user_id", "type", "bucket_start"],
+                set_={
+                    column: stmt.excluded[column]
+                    for column in ("count", "result_count", "result_sum", "result_min", "result_max")
+                },
+            ))
+            state.watermark = max(watermark, start)
+        state.dirty = False
+        state.refreshed_at = now
+        db.flush()
+        return True
+
+    @classmethod
+    def needs_refresh(cls, state: "CalculationStatsRollupState", now: Optional[datetime] = None) -> bool:
+        """Whether a rollup is dirty or its live tail has grown past an hour."""
+        now = now or datetime.utcnow()
+        lag = timedelta(seconds=settings.CALCULATION_STATS_ROLLUP_LAG_SECONDS)
+        return state.dirty or now - lag - state.watermark >= timedelta(hours=1)
+
+
+class CalculationStatsRollupState(Base):
+    """Rollup bookkeeping of one user: watermark and dirty flag."""
+
+    __tablename__ = "calculation_stats_rollup_state"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    watermark = Column(DateTime, nullable=False)
+    dirty = Column(Boolean, nullable=False, default=False)
+    refreshed_at = Column(DateTime, nullable=True)
+
+
+def calculation_stats(
+    db,
+    user_id: uuid.UUID,
+    interval: str = "day",
+    calculation_type: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Aggregate a user's calculations per type and per time bucket.
+
+    Uses the rollup when it is enabled for the user and the time filters
+    fall on hour boundaries (rollup rows cover whole hours); otherwise
+    aggregates the calculations table directly. A rollup that needs it is
+    refreshed first, so the caller should commit when `source` is "rollup".
+
+    Args:
+        db: SQLAlchemy database session
+        user_id: The user whose calculations are aggregated
+        interval: Histogram bucket width: "hour", "day" or "week"
+        calculation_type: Only aggregate this type
+        created_after: Only calculations created at or after this time
+        created_before: Only calculations created before this time
+
+    Returns:
+        dict: {"types": [...], "histogram": [...], "source": "live" | "rollup"}
+    """
+    from app.models.calculation import Calculation
+
+    table = Calculation.__table__
+    live_filters = [table.c.user_id == user_id] + _filters(
+        table.c.created_at, table.c.type, calculation_type, created_after, created_before
+    )
+
+    state = None
+    if _is_hour_aligned(created_after) and _is_hour_aligned(created_before):
+        state = db.get(CalculationStatsRollupState, user_id)
+        if state is not None and CalculationStatsRollup.needs_refresh(state):
+            CalculationStatsRollup.refresh(db, user_id)
+
+    if state is None:
+        bucket = _trunc(interval, table.c.created_at).label("bucket_start")
+        aggregates = [
+            func.count().label("count"),
+            func.count(table.c.result).label("result_count"),
+            func.sum(table.c.result).label("result_sum"),
+        ]
+        types_query = (
+            select(
+                table.c.type,
+                *aggregates,
+                func.min(table.c.result).label("result_min"),
+                func.max(table.c.result).label("result_max"),
+            )
+            .where(*live_filters)
+            .group_by(table.c.type)
+        )
+        histogram_query = select(bucket, table.c.type, *aggregates).where(*live_filters).group_by(bucket, table.c.type)
+        source = "live"
+    else:
+        rollup = CalculationStatsRollup.__table__
+        materialized = select(
+            rollup.c.type,
+            rollup.c.bucket_start,
+            rollup.c.count,
+            rollup.c.result_count,
+            rollup.c.result_sum,
+            rollup.c.result_min,
+            rollup.c.result_max,
+        ).where(
+            rollup.c.user_id == user_id,
+            *_filters(rollup.c.bucket_start, rollup.c.type, calculation_type, created_after, created_before),
+        )
+        hour = _trunc("hour", table.c.created_at)
+        tail = (
+            select(
+                table.c.type,
+                hour,
+                func.count(),
+                func.count(table.c.result),
+                func.sum(table.c.result),
+                func.min(table.c.result),
+                func.max(table.c.result),
+            )
+            .where(*live_filters, table.c.created_at >= state.watermark)
+            .group_by(table.c.type, hour)
+        )
+        merged = union_all(materialized, tail).subquery("merged")
+        bucket = _trunc(interval, merged.c.bucket_start).label("bucket_start")
+        aggregates = [
+            # sum(bigint) is numeric in Postgres; keep integers integers
+            cast(func.sum(merged.c.count), BigInteger).label("count"),
+            cast(func.sum(merged.c.result_count), BigInteger).label("result_count"),
+            func.sum(merged.c.result_sum).label("result_sum"),
+        ]
+        types_query = select(
+            merged.c.type,
+            *aggregates,
+            func.min(merged.c.result_min).label("result_min"),
+            func.max(merged.c.result_max).label("result_max"),
+        ).group_by(merged.c.type)
+        histogram_query = select(bucket, merged.c.type, *aggregates).group_by(bucket, merged.c.type)
+        source = "rollup"
+
+    types: List[Dict[str, Any]] = [_type_row(row) for row in db.execute(types_query.order_by("type"))]
+    histogram = [_bucket_row(row) for row in db.execute(histogram_query.order_by("bucket_start", "type"))]
+    return {"types": types, "histogram": histogram, "source": source}
@@ -0,0 +1,105 @@
+# app/models/types.py
+"""
+Custom column types.
+
+FloatList stores a list of floats (the calculation inputs) in one of three
+ways, selected by the CALCULATION_INPUTS_STORAGE setting:
+
+- "json":   JSON array text. Every read parses the text into Python floats,
+            and every write serializes them back. This is the original
+            storage.
+- "array":  Native float8[] (ARRAY of DOUBLE PRECISION). Postgres can
+            index, unnest and aggregate the values, e.g.
+            SELECT avg(x) FROM calculations, unnest(inputs) AS x.
+- "binary": Packed big-endian float64 values in a bytea column, i.e. the
+            byte layout of Postgres' float8send(). Reads are decoded
+            straight into an array('d') with one memcpy and no Python float
+            objects. NumPy wraps that buffer without copying
+            (np.asarray / np.frombuffer), which makes this the cheapest mode
+            for large inputs.
+
+Values are returned as a list ("json", "array") or an array('d')
+("binary"). Both are sequences of floats, so model code and the response
+schemas accept either.
+
+Existing rows are converted between modes with app.jobs.migrate_inputs.
+"""
+
+import json
+import sys
+from array import array
+from typing import Optional, Sequence
+
+from sqlalchemy import JSON, LargeBinary
+from sqlalchemy.dialects.postgresql import ARRAY, DOUBLE_PRECISION
+from sqlalchemy.types import TypeDecorator
+
+INPUT_STORAGE_MODES = ("json", "array", "binary")
+
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def pack_floats(values: Sequence[float]) -> bytes:
+    """Pack floats as big-endian float64 (the float8send() byte layout)."""
+    packed = array("d", values)
+    if _LITTLE_ENDIAN:
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_floats(data: bytes) -> array:
+    """Decode big-endian float64 bytes into an array('d') without creating float objects."""
+    values = array("d")
+    values.frombytes(data)
+    if _LITTLE_ENDIAN:
+        values.byteswap()
+    return values
+
+
+class FloatList(TypeDecorator):
+    """A list of floats stored as JSON, float8[] or packed float64 bytes."""
+
+    impl = JSON
+    cache_ok = True
+
+    def __init__(self, storage: str = "json"):
+        """
+        Args:
+            storage: "json", "array" or "binary"
+        """
+        if storage not in INPUT_STORAGE_MODES:
+            raise ValueError(f"Unknown inputs storage mode: {storage!r}")
+        super().__init__()
+        self.storage = storage
+
+    def load_dialect_impl(self, dialect):
+        if self.storage == "array":
+            return dialect.type_descriptor(ARRAY(DOUBLE_PRECISION))
+        if self.storage == "binary":
+            return dialect.type_descriptor(LargeBinary())
+        return dialect.type_descriptor(JSON())
+
+    def process_bind_param(self, value: Optional[Sequence[float]], dialect):
+        if value is None:
+            return None
+        if self.storage == "binary":
+            return pack_floats(value)
+        # Drivers and the JSON serializer do not understand array('d')
+        return value.tolist() if isinstance(value, array) else value
+
+    def process_result_value(self, value, dialect):
+        if value is None or self.storage != "binary":
+            return value
+        return unpack_floats(value)
+
+    def copy_literal(self, value: Sequence[float]) -> str:
+        """
+        Text form of a value for COPY ... FROM STDIN (FORMAT csv): a JSON
+        array, a float8[] literal, or hex-encoded bytea.
+        """
+        if self.storage == "binary":
+            return "\\x" + pack_floats(value).hex()
+        values = value.tolist() if isinstance(value, array) else [float(v) for v in value]
+        if self.storage == "array":
+            return "{" + ",".join(repr(v) for v in values) + "}"
+        return json.dumps(values)
@@ -17,10 +17,12 @@ The User model is designed to follow security best practices:
 
 import uuid
 from datetime import datetime, timezone, timedelta
-from sqlalchemy import Column, String, Boolean, DateTime, or_
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from typing import Optional
+from sqlalchemy import Column, String, Boolean, DateTime, exists, or_, select
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert
 from sqlalchemy.orm import relationship
 from app.core.config import get_settings
+from app.core.ids import new_id
 from app.database import Base
 from app.models.calculation import Calculation
 
@@ -55,11 +57,10 @@ class User(Base):
     __tablename__ = "users"
     
     # Primary key and identifying fields
+    # The primary key index serves lookups by id; no separate index
     id = Column(PG_UUID(as_uuid=True), 
                 primary_key=True, 
-                default=uuid.uuid4,  # Auto-generate UUIDs
-                unique=True, 
-                index=True)          # Index for faster lookups
+                default=new_id)  # Auto-generate (time-ordered) UUIDs
     
     username = Column(String(50), 
                       unique=True,    # Prevent duplicate usernames 
@@ -161,13 +162,39 @@ class User(Base):
         return get_password_hash(password)
 
     @classmethod
-    def register(cls, db, user_data: dict):
+    def validate_registration(cls, db, user_data: dict) -> None:
+        """
+        Check that a registration can succeed before its password is hashed,
+        so rejected registrations do not cost a bcrypt hash. The duplicate
+        check is an index lookup on username and email.
+
+        Args:
+            db: SQLAlchemy database session
+            user_data: Dictionary containing user registration data
+
+        Raises:
+            ValueError: If password is invalid or username/email already exists
+        """
+        password = user_data.get("password")
+        if not password or len(password) < 6:
+            raise ValueError("Password must be at least 6 characters long")
+        taken = db.scalar(select(exists().where(
+            or_(cls.username == user_data["username"], cls.email == user_data["email"])
+        )))
+        if taken:
+            raise ValueError("Username or email already exists")
+
+    @classmethod
+    def register(cls, db, user_data: dict, hashed_password: Optional[str] = None):
         """
         Register a new user.
 
         Args:
             db: SQLAlchemy database session
             user_data: Dictionary containing user registration data
+            hashed_password: Pre-computed hash of user_data["password"], e.g.
+                from the password hashing pool, after validate_registration().
+                Validated and hashed here when omitted.
             
         Returns:
             User: The newly created user instance
@@ -175,20 +202,14 @@ class User(Base):
         Raises:
             ValueError: If password is invalid or username/email already exists
         """
-        password = user_data.get("password")
-        if not password or len(password) < 6:
-            raise ValueError("Password must be at least 6 characters long")
-        
-        # Check for duplicate email or username
-        existing_user = db.query(cls).filter(
-            or_(cls.email == user_data["email"], cls.username == user_data["username"])
-        ).first()
-        if existing_user:
-            raise ValueError("Username or email already exists")
-        
-        # Create new user instance
-        hashed_password = cls.hash_password(password)
-        user = cls(
+        if hashed_password is None:
+            cls.validate_registration(db, user_data)
+            hashed_password = cls.hash_password(user_data["password"])
+
+        # The unique constraints on username and email still reject a
+        # duplicate registered since the check (ON CONFLICT DO NOTHING
+        # returns no row), and RETURNING loads the new user without a refresh
+        stmt = insert(cls).values(
             first_name=user_data["first_name"],
             last_name=user_data["last_name"],
             email=user_data["email"],
@@ -196,30 +217,40 @@ class User(Base):
             password=hashed_password,
             is_active=True,
             is_verified=False
-        )
-        db.add(user)
+        ).on_conflict_do_nothing().returning(cls)
+        user = db.scalars(stmt).first()
+        if user is None:
+            raise ValueError("Username or email already exists")
         return user
 
     @classmethod
-    def authenticate(cls, db, username_or_email: str, password: str):
+    def find_by_login(cls, db, username_or_email: str):
         """
-        Authenticate a user by username/email and password.
-        
+        Look up a user by username or email.
+
         Args:
             db: SQLAlchemy database session
-            username_or_email: Username or email to authenticate
-            password: Password to verify
-            
+            username_or_email: Username or email to look up
+
         Returns:
-            dict: Authentication result with tokens and user data, or None if authentication fails
+            User: The matching user, or None
         """
-        user = db.query(cls).filter(
+        return db.query(cls).filter(
             or_(cls.username == username_or_email, cls.email == username_or_email)
         ).first()
 
-        if not user or not user.verify_password(password):
-            return None
+    @classmethod
+    def complete_login(cls, db, user: "User") -> dict:
+        """
+        Record a successful login and issue the user's tokens.
 
+        Args:
+            db: SQLAlchemy database session
+            user: The user whose password has been verified
+
+        Returns:
+            dict: Authentication result with tokens and user data
+        """
         # Update the last_login timestamp
         user.last_login = utcnow()
         db.flush()
@@ -237,6 +268,47 @@ class User(Base):
             "user": user
         }
 
+    @classmethod
+    def authenticate(cls, db, username_or_email: str, password: str):
+        """
+        Authenticate a user by username/email and password.
+        
+        Args:
+            db: SQLAlchemy database session
+            username_or_email: Username or email to authenticate
+            password: Password to verify
+            
+        Returns:
+            dict: Authentication result with tokens and user data, or None if authentication fails
+        """
+        user = cls.find_by_login(db, username_or_email)
+        if not user or not user.verify_password(password):
+            return None
+        return cls.complete_login(db, user)
+
+    @classmethod
+    async def authenticate_async(cls, db, username_or_email: str, password: str):
+        """
+        Authenticate a user without blocking the event loop.
+
+        Same contract as authenticate(), but the bcrypt verification runs on
+        the password hashing pool and the database work runs through
+        db.run_sync().
+
+        Args:
+            db: AsyncSession (or app.database.SyncSessionAdapter)
+            username_or_email: Username or email to authenticate
+            password: Password to verify
+
+        Returns:
+            dict: Authentication result with tokens and user data, or None if authentication fails
+        """
+        from app.auth import password_pool
+        user = await db.run_sync(cls.find_by_login, username_or_email)
+        if not user or not await password_pool.verify_password(password, user.password):
+            return None
+        return await db.run_sync(cls.complete_login, user)
+
     @classmethod
     def create_access_token(cls, data: dict) -> str:
         """
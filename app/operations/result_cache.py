@@ -0,0 +1,265 @@
+# app/operations/result_cache.py
+"""
+Content-addressed cache of calculation results.
+
+Users submit the same (type, inputs) pairs again and again, and a result
+only depends on that pair. Results are therefore cached under a hash of it,
+in up to two tiers:
+
+- In-process: an LRU TTLCache of RESULT_CACHE_MAX_ENTRIES entries that
+  expire after RESULT_CACHE_TTL_SECONDS. It is used by both the sync and
+  the async API.
+- Redis (when RESULT_CACHE_REDIS is on): `result:v<N>:<type>:<digest>` keys
+  with the same TTL, shared by every worker through the pooled get_redis()
+  client. Only the async API uses this tier. Redis errors never fail a
+  calculation: the tier is skipped for RESULT_CACHE_REDIS_BACKOFF_SECONDS
+  and results are computed locally.
+
+Keys hash the inputs as packed float64s, so [1, 2] and [1.0, 2.0] share an
+entry. Errors (division by zero, ...) are never cached. Bump _KEY_VERSION
+when a change to the operations alters results, so stale entries are not
+served.
+
+Hits and misses of the local tier are counted under "cache.results.*", and
+those of the Redis tier under "result_cache.redis.*".
+
+The recompute job (app.jobs.recompute) deliberately bypasses this cache.
+"""
+
+import hashlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.auth.redis import RedisBackoff, get_redis
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.models.types import pack_floats
+
+settings = get_settings()
+
+# Part of every key; bump it to invalidate all cached results
+_KEY_VERSION = 1
+
+cache = TTLCache(
+    "results",
+    max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+    ttl=settings.RESULT_CACHE_TTL_SECONDS,
+)
+
+redis_backoff = RedisBackoff("result_cache", settings.RESULT_CACHE_REDIS_BACKOFF_SECONDS)
+
+
+def _type_name(calculation_type) -> str:
+    return str(getattr(calculation_type, "value", calculation_type)).lower()
+
+
+def result_key(calculation_type, inputs: Sequence[float]) -> str:
+    """Cache key of a (type, inputs) pair."""
+    name = _type_name(calculation_type)
+    digest = hashlib.sha256(pack_floats(inputs)).hexdigest()
+    return f"result:v{_KEY_VERSION}:{name}:{digest}"
+
+
+def _cacheable(result) -> bool:
+    return isinstance(result, (int, float)) and not isinstance(result, bool)
+
+
+def _compute(calculation_type, inputs: Sequence[float]) -> float:
+    from app.models.calculation import Calculation
+    result = Calculation.create(_type_name(calculation_type), None, inputs).get_result()
+    if isinstance(result, complex):
+        raise ValueError("Result is not a real number.")
+    return result
+
+
+# ------------------------------------------------------------------------------
+# Sync API (in-process tier only)
+# ------------------------------------------------------------------------------
+def evaluate(calculation_type, inputs: Sequence[float]) -> float:
+    """
+    Result of a calculation, from the cache when possible.
+
+    Raises:
+        ValueError: As Calculation.get_result() does for invalid inputs, or
+            if the result is not a real number (e.g. the root of a negative)
+        ArithmeticError: If the result is out of range (OverflowError)
+    """
+    key = result_key(calculation_type, inputs)
+    result = cache.get(key)
+    if result is None:
+        result = _compute(calculation_type, inputs)
+        if _cacheable(result):
+            cache.set(key, result)
+    return result
+
+
+def evaluate_many(
+    calculation_type, inputs_list: Sequence[Sequence[float]]
+) -> Tuple[List[Optional[float]], Dict[int, str]]:
+    """
+    Calculation.evaluate_many() with cached results filled in first: only
+    the misses are sent to the vectorized kernel.
+    """
+    keys = [result_key(calculation_type, inputs) for inputs in inputs_list]
+    results: List[Optional[float]] = [cache.get(key) for key in keys]
+    errors = _evaluate_misses(calculation_type, inputs_list, keys, results)
+    return results, errors
+
+
+def _evaluate_misses(calculation_type, inputs_list, keys, results) -> Dict[int, str]:
+    """Compute the rows of `results` that are still None, caching them locally."""
+    from app.models.calculation import Calculation
+
+    misses = [index for index, result in enumerate(results) if result is None]
+    if not misses:
+        return {}
+    computed, failed = Calculation.evaluate_many(_type_name(calculation_type), [inputs_list[i] for i in misses])
+    errors = {}
+    for position, index in enumerate(misses):
+        if position in failed:
+            errors[index] = failed[position]
+            continue
+        results[index] = computed[position]
+        cache.set(keys[index], computed[position])
+    return errors
+
+
+# ------------------------------------------------------------------------------
+# Async API (in-process tier, then Redis)
+# ------------------------------------------------------------------------------
+def _redis_enabled() -> bool:
+    return settings.RESULT_CACHE_REDIS and redis_backoff.available()
+
+
+async def _redis_get_many(keys: List[str]) -> List[Optional[float]]:
+    if not keys or not _redis_enabled():
+        return [None] * len(keys)
+    try:
+        redis_conn = await get_redis()
+        values = await redis_conn.mget(keys)
+    except Exception as e:
+        redis_backoff.failed(e)
+        return [None] * len(keys)
+    found = sum(value is not None for value in values)
+    metrics.incr("result_cache.redis.hits", found)
+    metrics.incr("result_cache.redis.misses", len(keys) - found)
+    return [float(value) if value is not None else None for value in values]
+
+
+async def _redis_set_many(items: Dict[str, float]) -> None:
+    if not items or not _redis_enabled():
+        return
+    try:
+        redis_conn = await get_redis()
+        async with redis_conn.pipeline(transaction=False) as pipe:
+            for key, result in items.items():
+                # repr() round-trips a float exactly
+                pipe.set(key, repr(float(result)), ex=max(int(settings.RESULT_CACHE_TTL_SECONDS), 1))
+            await pipe.execute()
+    except Exception as e:
+        redis_backoff.failed(e)
+
+
+async def _compute_async(calculation_type, inputs: Sequence[float]) -> float:
+    if len(inputs) >= settings.CALCULATION_VECTORIZE_THRESHOLD:
+        # Large inputs are CPU-bound: keep them off the event loop, as in evaluate_many_async()
+        return await run_in_threadpool(_compute, calculation_type, inputs)
+    return _compute(calculation_type, inputs)
+
+
+async def evaluate_async(calculation_type, inputs: Sequence[float]) -> float:
+    """
+    Result of a calculation, looked up in the local tier, then Redis.
+    A miss with at least CALCULATION_VECTORIZE_THRESHOLD inputs is computed
+    in the threadpool; smaller ones are cheaper to compute inline.
+
+    Raises:
+        ValueError, ArithmeticError: As evaluate() does
+    """
+    key = result_key(calculation_type, inputs)
+    result = cache.get(key)
+    if result is not None:
+        return result
+    (result,) = await _redis_get_many([key])
+    if result is not None:
+        cache.set(key, result)
+        return result
+    result = await _compute_async(calculation_type, inputs)
+    if _cacheable(result):
+        cache.set(key, result)
+        await _redis_set_many({key: result})
+    return result
+
+
+async def evaluate_many_async(
+    calculation_type, inputs_list: Sequence[Sequence[float]]
+) -> Tuple[List[Optional[float]], Dict[int, str]]:
+    """
+    evaluate_many() with the Redis tier: local misses are fetched with one
+    MGET, and newly computed results are written back in one pipeline.
+    """
+    keys = [result_key(calculation_type, inputs) for inputs in inputs_list]
+    results: List[Optional[float]] = [cache.get(key) for key in keys]
+
+    local_misses = [index for index, result in enumerate(results) if result is None]
+    shared = await _redis_get_many([keys[index] for index in local_misses])
+    for index, result in zip(local_misses, shared):
+        if result is not None:
+            results[index] = result
+            cache.set(keys[index], result)
+
+    remaining = [index for index in local_misses if results[index] is None]
+    errors = {}
+    if remaining:
+        # The vectorized kernel is CPU-bound: keep it off the event loop
+        errors = await run_in_threadpool(_evaluate_misses, calculation_type, inputs_list, keys, results)
+        await _redis_set_many({keys[index]: results[index] for index in remaining if index not in errors})
+    return results, errors
+
+
+async def evaluate_types_async(
+    calculation_types: Sequence, inputs: Sequence[float]
+) -> Tuple[Dict[str, float], Dict[str, str]]:
+    """
+    Results of one input list under several calculation types, for writes
+    that do not know the stored type yet (the UPDATE picks the result of
+    the row's type with a CASE). Local misses are fetched with one MGET.
+
+    Inputs that are valid for one type can overflow or have no real result
+    under another; like every other invalid input, that is an error of that
+    type only.
+
+    Returns:
+        (results, errors): Results, and error messages, keyed by type name
+    """
+    names = [_type_name(calculation_type) for calculation_type in calculation_types]
+    keys = [result_key(name, inputs) for name in names]
+    found: List[Optional[float]] = [cache.get(key) for key in keys]
+    local_misses = [index for index, result in enumerate(found) if result is None]
+    shared = dict(zip(local_misses, await _redis_get_many([keys[index] for index in local_misses])))
+
+    results, errors, computed = {}, {}, {}
+    for index, name in enumerate(names):
+        result = found[index]
+        if result is None and shared.get(index) is not None:
+            result = shared[index]
+            cache.set(keys[index], result)
+        if result is None:
+            try:
+                result = await _compute_async(name, inputs)
+            except (ValueError, ArithmeticError) as e:
+                errors[name] = str(e)
+                continue
+            if _cacheable(result):
+                cache.set(keys[index], result)
+                computed[keys[index]] = result
+        results[name] = result
+    await _redis_set_many(computed)
+    return results, errors
+
+
+def clear() -> None:
+    """Drop every entry of the local tier."""
+    cache.clear()
@@ -0,0 +1,220 @@
+# app/operations/vectorized.py
+
+"""
+Module: vectorized.py
+
+Vectorized (NumPy) kernels for the calculation types in app.models.calculation.
+
+The calculation models evaluate their inputs with plain Python loops, which is
+perfectly fine for a handful of numbers but dominates request latency once an
+input list holds hundreds of thousands of values. The functions here evaluate
+the same left-to-right folds with NumPy ufunc reductions, which run the loop
+in C.
+
+Semantics follow the Python loops:
+- Addition, subtraction, multiplication and division are sequential left
+  folds (ufunc.reduce / accumulate), so they produce bit-for-bit the same
+  float results as the models.
+- Except addition on Python 3.12+: there the built-in sum() that
+  Addition uses is compensated (Neumaier) and no ufunc rounds like it, so
+  the addition kernels call sum() themselves.
+- Exponentiation and root have no kernel. Each step depends on the previous
+  result, and folding the exponents into one product ((a ** b) ** c ==
+  a ** (b * c)) rounds differently and skips the overflow checks of the
+  intermediate powers. Results are keyed only by their inputs (result
+  cache, recompute job), so they always use the Python loop.
+- Division by zero is raised with the same message as the models.
+- If a kernel produces a non-finite result (overflow, inf - inf, ...) it
+  returns None and the caller re-evaluates with
+  the Python loop, so edge cases keep Python's exact behaviour.
+
+NumPy is an optional dependency. When it is not installed, should_vectorize()
+always returns False and the models keep using their Python loops.
+
+Functions:
+- is_available() -> bool: Whether NumPy could be imported.
+- should_vectorize(inputs) -> bool: Whether inputs are large enough to vectorize.
+- add/subtract/multiply/divide(inputs) -> Optional[float]
+- evaluate_batch(calculation_type, inputs_list) -> List[Optional[float]]:
+  Evaluate many calculations of one type at once.
+"""
+
+import math
+import sys
+from array import array
+from typing import List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Calculation types evaluate_batch() has a kernel for
+BATCH_TYPES = ("addition", "subtraction", "multiplication", "division")
+
+# Since Python 3.12 sum() of floats uses compensated summation
+_COMPENSATED_SUM = sys.version_info >= (3, 12)
+
+
+def is_available() -> bool:
+    """Return True if the NumPy backend can be used."""
+    return np is not None
+
+
+def should_vectorize(inputs: Sequence[float]) -> bool:
+    """
+    Decide whether a list of inputs should use the vectorized backend.
+
+    Small inputs stay on the Python loop: converting them to an array costs
+    more than the loop itself.
+
+    Parameters:
+    - inputs: The calculation inputs
+
+    Returns:
+    - bool: True if NumPy is available and the input size reaches
+      CALCULATION_VECTORIZE_THRESHOLD.
+    """
+    return np is not None and len(inputs) >= settings.CALCULATION_VECTORIZE_THRESHOLD
+
+
+def _as_array(inputs: Sequence[float]):
+    """
+    Convert inputs to a contiguous float64 array.
+
+    An array('d') (binary inputs storage) is wrapped without copying.
+    """
+    if isinstance(inputs, list):
+        # fromiter with a known count is the cheapest list -> array path
+        return np.fromiter(inputs, dtype=np.float64, count=len(inputs))
+    return np.asarray(inputs, dtype=np.float64)
+
+
+def _finite_or_none(value) -> Optional[float]:
+    """Return value as a Python float, or None if it is inf/nan."""
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def add(inputs: Sequence[float]) -> Optional[float]:
+    """
+    Sum all inputs.
+
+    np.add.reduce uses pairwise summation, which rounds differently from the
+    Python loop, so the running sum is taken with accumulate instead. On
+    Python 3.12+ sum() is compensated and neither matches it, so sum() is
+    used directly.
+
+    Note that for a Python list the built-in sum() already runs in C and is
+    faster than converting the list to an array, so Addition only uses this
+    kernel for inputs that are already arrays.
+    """
+    if _COMPENSATED_SUM:
+        return _finite_or_none(sum(inputs))
+    with np.errstate(all="ignore"):
+        return _finite_or_none(np.add.accumulate(_as_array(inputs))[-1])
+
+
+def subtract(inputs: Sequence[float]) -> Optional[float]:
+    """Subtract every subsequent input from the first one."""
+    with np.errstate(all="ignore"):
+        return _finite_or_none(np.subtract.reduce(_as_array(inputs)))
+
+
+def multiply(inputs: Sequence[float]) -> Optional[float]:
+    """Multiply all inputs."""
+    with np.errstate(all="ignore"):
+        return _finite_or_none(np.multiply.reduce(_as_array(inputs)))
+
+
+def divide(inputs: Sequence[float]) -> Optional[float]:
+    """
+    Divide the first input by every subsequent input.
+
+    Raises:
+    - ValueError: If any divisor is zero.
+    """
+    values = _as_array(inputs)
+    if not np.all(values[1:]):
+        raise ValueError("Cannot divide by zero.")
+    with np.errstate(all="ignore"):
+        return _finite_or_none(np.divide.reduce(values))
+
+
+def evaluate_batch(calculation_type: str, inputs_list: Sequence[Sequence[float]]) -> List[Optional[float]]:
+    """
+    Evaluate many calculations of the same type in one pass.
+
+    All input lists are concatenated into a single array and each calculation
+    becomes one segment of a ufunc.reduceat call, so the per-row work happens
+    in C no matter how many (or how short) the rows are.
+
+    The result list is aligned with inputs_list. An entry is None when the
+    row could not be evaluated here: invalid inputs (too few numbers,
+    division by zero), a non-finite result, or any exponentiation or root
+    row. Callers re-evaluate those rows with the Python loop, which raises
+    the exact validation error or reproduces Python's edge-case behaviour.
+
+    Parameters:
+    - calculation_type: One of the supported calculation types
+    - inputs_list: The inputs of each calculation
+
+    Returns:
+    - List[Optional[float]]: One result (or None) per calculation
+    """
+    count = len(inputs_list)
+    results: List[Optional[float]] = [None] * count
+    if count == 0 or calculation_type not in BATCH_TYPES:
+        return results
+
+    lengths = np.fromiter((len(inputs) for inputs in inputs_list), dtype=np.intp, count=count)
+    rows = np.flatnonzero(lengths >= 2)
+    if rows.size == 0:
+        return results
+    try:
+        if all(isinstance(inputs_list[row], array) for row in rows.tolist()):
+            # Binary inputs storage: join the raw buffers, no float objects
+            flat = np.concatenate([np.frombuffer(inputs_list[row], dtype=np.float64) for row in rows.tolist()])
+        else:
+            flat = np.fromiter(
+                (value for row in rows for value in inputs_list[row]),
+                dtype=np.float64,
+                count=int(lengths[rows].sum()),
+            )
+    except (TypeError, ValueError):
+        # Non-numeric inputs: leave every row to the Python loop
+        return results
+
+    starts = np.concatenate(([0], np.cumsum(lengths[rows])[:-1]))
+    tail = np.ones(flat.size, dtype=bool)
+    tail[starts] = False
+    valid = np.ones(rows.size, dtype=bool)
+
+    with np.errstate(all="ignore"):
+        if calculation_type == "addition" and _COMPENSATED_SUM:
+            # The fold below would differ from the compensated sum() of
+            # Addition.get_result(), so call sum() per row instead
+            segment_results = np.fromiter(
+                (sum(inputs_list[row]) for row in rows.tolist()), dtype=np.float64, count=rows.size
+            )
+        elif calculation_type == "addition":
+            # a - (-b) == a + b exactly; subtract.reduceat is a sequential
+            # fold whereas add.reduceat sums pairwise and rounds differently.
+            values = np.where(tail, -flat, flat)
+            segment_results = np.subtract.reduceat(values, starts)
+        elif calculation_type == "subtraction":
+            segment_results = np.subtract.reduceat(flat, starts)
+        elif calculation_type == "multiplication":
+            segment_results = np.multiply.reduceat(flat, starts)
+        else:
+            valid &= ~np.logical_or.reduceat(tail & (flat == 0), starts)
+            segment_results = np.divide.reduceat(flat, starts)
+
+    valid &= np.isfinite(segment_results)
+    for row, value in zip(rows[valid].tolist(), segment_results[valid].tolist()):
+        results[row] = value
+    return results
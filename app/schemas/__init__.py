@@ -14,7 +14,20 @@ from .calculation import (
     CalculationBase,
     CalculationCreate,
     CalculationUpdate,
-    CalculationResponse
+    CalculationResponse,
+    CalculationCursor,
+    CalculationBatchError,
+    CalculationBatchResponse,
+    CalculationBulkDeleteResponse,
+    CalculationBulkUpdate,
+    CalculationBulkUpdateResponse,
+    StatsInterval,
+    CalculationTypeStats,
+    CalculationStatsBucket,
+    CalculationStatsResponse,
+    ExportFormat,
+    ImportFormat,
+    CalculationImportResponse
 )
 
 __all__ = [
@@ -32,4 +45,17 @@ __all__ = [
     'CalculationCreate',
     'CalculationUpdate',
     'CalculationResponse',
+    'CalculationCursor',
+    'CalculationBatchError',
+    'CalculationBatchResponse',
+    'CalculationBulkDeleteResponse',
+    'CalculationBulkUpdate',
+    'CalculationBulkUpdateResponse',
+    'StatsInterval',
+    'CalculationTypeStats',
+    'CalculationStatsBucket',
+    'CalculationStatsResponse',
+    'ExportFormat',
+    'ImportFormat',
+    'CalculationImportResponse',
 ]
\ No newline at end of file
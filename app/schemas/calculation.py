@@ -12,6 +12,9 @@ The schemas use Pydantic's validation system to ensure data integrity and provid
 clear error messages when validation fails.
 """
 
+import base64
+import json
+from array import array
 from enum import Enum
 from pydantic import BaseModel, Field, ConfigDict, model_validator, field_validator
 from typing import List, Optional
@@ -106,6 +109,9 @@ class CalculationBase(BaseModel):
         Raises:
             ValueError: If the input is not a list
         """
+        if isinstance(v, array):
+            # Inputs loaded from binary storage (see app/models/types.py)
+            return v.tolist()
         if not isinstance(v, list):
             raise ValueError("Input should be a valid list")
         return v
@@ -282,3 +288,200 @@ class CalculationResponse(CalculationBase):
             }
         }
     )
+
+
+class CalculationBatchError(BaseModel):
+    """
+    A single rejected item from POST /calculations/batch.
+
+    The index refers to the position of the item in the submitted list, so
+    clients can match errors back to their input.
+    """
+    index: int = Field(..., description="Position of the rejected item in the request", example=3)
+    detail: str = Field(..., description="Why the item was rejected", example="Cannot divide by zero")
+
+class CalculationBatchResponse(BaseModel):
+    """
+    Response schema for POST /calculations/batch.
+
+    Valid items are stored and returned in `created` (in submission order);
+    invalid items do not abort the batch and are reported in `errors`.
+    """
+    created: List[CalculationResponse] = Field(
+        default_factory=list,
+        description="Calculations that were stored"
+    )
+    errors: List[CalculationBatchError] = Field(
+        default_factory=list,
+        description="Items that were rejected"
+    )
+
+
+class CalculationBulkDeleteResponse(BaseModel):
+    """
+    Response schema for DELETE /calculations.
+
+    `missing` lists requested ids that were not deleted because they do not
+    exist or belong to another user (only when deleting by ids).
+    """
+    deleted: int = Field(..., description="Number of calculations deleted", example=3)
+    missing: List[UUID] = Field(
+        default_factory=list,
+        description="Requested ids that matched no calculation of the user"
+    )
+
+
+class CalculationBulkUpdate(BaseModel):
+    """
+    Request schema for PATCH /calculations: the change applied to every
+    matching calculation. Results are recomputed.
+    """
+    type: Optional[CalculationType] = Field(
+        None,
+        description="New type of the calculations",
+        example="multiplication"
+    )
+    inputs: Optional[List[float]] = Field(
+        None,
+        description="New inputs of the calculations",
+        example=[2, 3]
+    )
+
+    @model_validator(mode='after')
+    def validate_change(self) -> "CalculationBulkUpdate":
+        if self.type is None and self.inputs is None:
+            raise ValueError("Give a new type and/or new inputs")
+        if self.inputs is not None and len(self.inputs) < 2:
+            raise ValueError("At least two numbers are required for calculation")
+        return self
+
+
+class CalculationBulkUpdateResponse(BaseModel):
+    """Response schema for PATCH /calculations."""
+    updated: int = Field(..., description="Number of calculations changed", example=120)
+    failed: int = Field(
+        0,
+        description="Matching calculations left unchanged because the change is invalid for them",
+        example=2
+    )
+
+
+class CalculationCursor(BaseModel):
+    """
+    Opaque keyset-pagination cursor for GET /calculations.
+
+    A cursor records the (created_at, id) position of the last calculation on
+    a page. The next page starts strictly after that position, which keeps
+    pages stable even while new calculations are being created.
+
+    Clients should treat the encoded value as an opaque string and simply
+    pass back whatever the API returned in the X-Next-Cursor header.
+    """
+    created_at: datetime = Field(..., description="created_at of the last row on the page")
+    id: UUID = Field(..., description="id of the last row on the page")
+
+    def encode(self) -> str:
+        """
+        Encode the cursor as a URL-safe string.
+
+        Returns:
+            str: base64url-encoded JSON, without padding
+        """
+        raw = json.dumps([self.created_at.isoformat(), str(self.id)]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "CalculationCursor":
+        """
+        Decode a cursor previously produced by encode().
+
+        Args:
+            token: The encoded cursor string
+
+        Returns:
+            CalculationCursor: The decoded cursor
+
+        Raises:
+            ValueError: If the token is malformed
+        """
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            created_at, calc_id = json.loads(base64.urlsafe_b64decode(padded))
+            return cls(created_at=created_at, id=calc_id)
+        except Exception:
+            raise ValueError("Invalid pagination cursor.")
+
+
+class StatsInterval(str, Enum):
+    """Bucket width of the GET /calculations/stats histogram."""
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+
+class CalculationTypeStats(BaseModel):
+    """
+    Aggregates of one calculation type in GET /calculations/stats.
+
+    min/max/avg/sum are None when no calculation of the type has a result.
+    """
+    type: str = Field(..., description="Calculation type", example="addition")
+    count: int = Field(..., description="Number of calculations", example=42)
+    sum: Optional[float] = Field(None, description="Sum of results", example=630.0)
+    min: Optional[float] = Field(None, description="Smallest result", example=-3.5)
+    max: Optional[float] = Field(None, description="Largest result", example=120.0)
+    avg: Optional[float] = Field(None, description="Average result", example=15.0)
+
+class CalculationStatsBucket(BaseModel):
+    """One histogram bucket (per type) in GET /calculations/stats."""
+    bucket_start: datetime = Field(..., description="Start of the bucket (UTC)")
+    type: str = Field(..., description="Calculation type", example="addition")
+    count: int = Field(..., description="Calculations created in the bucket", example=7)
+    sum: Optional[float] = Field(None, description="Sum of their results", example=105.0)
+    avg: Optional[float] = Field(None, description="Average of their results", example=15.0)
+
+class CalculationStatsResponse(BaseModel):
+    """
+    Response schema for GET /calculations/stats.
+
+    `source` is "rollup" when the aggregates were served from the
+    materialized rollup table (plus the rows newer than it), and "live"
+    when they were computed from the calculations table directly.
+    """
+    interval: StatsInterval = Field(..., description="Histogram bucket width")
+    types: List[CalculationTypeStats] = Field(default_factory=list, description="Aggregates per type")
+    histogram: List[CalculationStatsBucket] = Field(default_factory=list, description="Counts per bucket and type")
+    source: str = Field(..., description='"live" or "rollup"', example="live")
+
+
+class ExportFormat(str, Enum):
+    """File formats of GET /calculations/export."""
+    NDJSON = "ndjson"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+class ImportFormat(str, Enum):
+    """File formats accepted by POST /calculations/import."""
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+class CalculationImportResponse(BaseModel):
+    """
+    Status of a POST /calculations/import job.
+
+    The counters grow while the job is running. Rejected rows, with their
+    line number and reason, can be downloaded from
+    GET /calculations/import/{id}/errors.
+    """
+    id: UUID = Field(..., description="Import job id")
+    status: str = Field(..., description='"pending", "running", "completed" or "failed"', example="running")
+    format: ImportFormat = Field(..., description="Format of the uploaded file")
+    filename: Optional[str] = Field(None, description="Name of the uploaded file", example="calculations.csv")
+    rows_read: int = Field(0, description="Records parsed so far", example=20000)
+    rows_imported: int = Field(0, description="Calculations stored so far", example=19990)
+    rows_failed: int = Field(0, description="Records rejected so far", example=10)
+    error: Optional[str] = Field(None, description="Why the job failed, if it did")
+    created_at: datetime = Field(..., description="When the upload was received")
+    finished_at: Optional[datetime] = Field(None, description="When the job completed or failed")
+
+    model_config = ConfigDict(from_attributes=True)
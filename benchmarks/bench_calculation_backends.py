@@ -0,0 +1,66 @@
+# benchmarks/bench_calculation_backends.py
+"""
+Benchmark: Python loop vs. NumPy backend for Calculation.get_result()
+
+Evaluates every calculation type on input lists of increasing size with both
+backends and prints the best-of-N wall time and the speedup.
+
+Usage:
+    python -m benchmarks.bench_calculation_backends
+    python -m benchmarks.bench_calculation_backends --sizes 1000 100000 1000000 --repeat 5
+"""
+
+import argparse
+import random
+import timeit
+import uuid
+
+from app.models.calculation import Calculation
+from app.models.user import User  # noqa: F401 - registers the User mapper
+from app.operations import vectorized
+
+CALCULATION_TYPES = ["addition", "subtraction", "multiplication", "division", "exponentiation", "root"]
+
+
+def make_inputs(calculation_type: str, size: int) -> list:
+    """Build inputs that stay finite for the given calculation type."""
+    rng = random.Random(size)
+    # Values close to 1 keep long products/quotients/power chains finite;
+    # a non-finite result would make the NumPy backend fall back to the loop.
+    return [2.0] + [rng.uniform(0.999, 1.001) for _ in range(size - 1)]
+
+
+def time_backend(calculation: Calculation, threshold: int, repeat: int) -> float:
+    """Return the best time of `repeat` get_result() calls at the given threshold."""
+    vectorized.settings.CALCULATION_VECTORIZE_THRESHOLD = threshold
+    return min(timeit.repeat(calculation.get_result, number=1, repeat=repeat))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not vectorized.is_available():
+        raise SystemExit("numpy is not installed; nothing to compare.")
+
+    original_threshold = vectorized.settings.CALCULATION_VECTORIZE_THRESHOLD
+    print(f"{'type':<16}{'size':>10}{'python (ms)':>14}{'numpy (ms)':>14}{'speedup':>10}")
+    try:
+        for calculation_type in CALCULATION_TYPES:
+            for size in args.sizes:
+                calculation = Calculation.create(calculation_type, uuid.uuid4(), make_inputs(calculation_type, size))
+                python_time = time_backend(calculation, threshold=size + 1, repeat=args.repeat)
+                numpy_time = time_backend(calculation, threshold=0, repeat=args.repeat)
+                print(
+                    f"{calculation_type:<16}{size:>10}"
+                    f"{python_time * 1000:>14.3f}{numpy_time * 1000:>14.3f}"
+                    f"{python_time / numpy_time:>9.1f}x"
+                )
+    finally:
+        vectorized.settings.CALCULATION_VECTORIZE_THRESHOLD = original_threshold
+
+
+if __name__ == "__main__":
+    main()
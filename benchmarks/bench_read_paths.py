@@ -0,0 +1,111 @@
+# benchmarks/bench_read_paths.py
+"""
+Benchmark: ORM entity loads vs. column-projected Core rows
+
+Inserts a temporary user with N calculations into the configured database
+(DATABASE_URL), then reads them back in two ways and prints the best-of-N
+throughput of each:
+
+- orm:   select(Calculation) with yield_per; every row becomes a polymorphic
+         entity in the identity map.
+- core:  app.models.calculation_reads with yield_per; plain Rows of the
+         response columns.
+
+Both paths also encode the rows with dump_calculations(), as the GET
+endpoints do. The temporary user and its calculations are deleted at the
+end.
+
+Usage:
+    python -m benchmarks.bench_read_paths
+    python -m benchmarks.bench_read_paths --rows 100000 --chunk-size 2000 --repeat 5
+"""
+
+import argparse
+import random
+import timeit
+import uuid
+
+from sqlalchemy import select
+
+from app.core.serialization import dump_calculations
+from app.database import SessionLocal, engine
+from app.database_init import init_db
+from app.models.calculation import Calculation
+from app.models.calculation_reads import iter_rows, user_calculations_query
+from app.models.user import User
+
+CALCULATION_TYPES = ["addition", "subtraction", "multiplication", "division"]
+
+
+def seed(rows: int) -> uuid.UUID:
+    """Create a temporary user with `rows` calculations; return its id."""
+    rng = random.Random(rows)
+    with SessionLocal() as db:
+        user = User(
+            first_name="Bench",
+            last_name="Reads",
+            email=f"bench.reads.{uuid.uuid4()}@example.com",
+            username=f"bench_{uuid.uuid4().hex[:12]}",
+            password=User.hash_password("BenchPass123!"),
+        )
+        db.add(user)
+        db.flush()
+        for start in range(0, rows, 5000):
+            calculations = []
+            for _ in range(min(5000, rows - start)):
+                calculation = Calculation.create(rng.choice(CALCULATION_TYPES), user.id, [rng.uniform(1, 100) for _ in range(3)])
+                calculation.result = calculation.get_result()
+                calculations.append(calculation)
+            Calculation.insert_many(db, calculations)
+        db.commit()
+        return user.id
+
+
+def read_orm(user_id: uuid.UUID, chunk_size: int) -> int:
+    count = 0
+    with SessionLocal() as db:
+        query = select(Calculation).where(Calculation.user_id == user_id).execution_options(yield_per=chunk_size)
+        for calculations in db.scalars(query).partitions():
+            dump_calculations(calculations)
+            count += len(calculations)
+    return count
+
+
+def read_core(user_id: uuid.UUID, chunk_size: int) -> int:
+    count = 0
+    with engine.connect() as connection:
+        chunk = []
+        for row in iter_rows(connection, user_calculations_query(user_id), chunk_size):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                dump_calculations(chunk)
+                count += len(chunk)
+                chunk = []
+        dump_calculations(chunk)
+        count += len(chunk)
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    init_db()
+    user_id = seed(args.rows)
+    try:
+        print(f"{'path':<8}{'rows':>10}{'best (ms)':>12}{'rows/s':>12}")
+        for name, read in (("orm", read_orm), ("core", read_core)):
+            assert read(user_id, args.chunk_size) == args.rows
+            best = min(timeit.repeat(lambda: read(user_id, args.chunk_size), number=1, repeat=args.repeat))
+            print(f"{name:<8}{args.rows:>10}{best * 1000:>12.1f}{args.rows / best:>12.0f}")
+    finally:
+        with SessionLocal() as db:
+            db.delete(db.get(User, user_id))
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
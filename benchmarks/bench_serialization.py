@@ -0,0 +1,93 @@
+# benchmarks/bench_serialization.py
+"""
+Benchmark: FastAPI response serialization vs. dump_calculations()
+
+Serializes lists of Calculation ORM objects to JSON bytes in three ways and
+prints the best-of-N wall time of each:
+
+- fastapi:    what a route with response_model=List[CalculationResponse]
+              did before: validate, jsonable_encoder(), then stdlib json.
+- pydantic:   validate into CalculationResponse models, then dump_json().
+- direct:     app.core.serialization.dump_calculations() (orjson if
+              installed), without pydantic models.
+
+Usage:
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --sizes 1000 10000 --repeat 5
+"""
+
+import argparse
+import json
+import random
+import timeit
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core import serialization
+from app.models.calculation import Calculation
+from app.models.user import User  # noqa: F401 - registers the User mapper
+from app.schemas.calculation import CalculationResponse
+
+CALCULATION_TYPES = ["addition", "subtraction", "multiplication", "division"]
+
+adapter = TypeAdapter(List[CalculationResponse])
+
+
+def make_calculations(size: int) -> List[Calculation]:
+    """Build transient calculations shaped like rows loaded from the database."""
+    rng = random.Random(size)
+    user_id = uuid.uuid4()
+    start = datetime(2025, 1, 1)
+    calculations = []
+    for index in range(size):
+        calculation = Calculation.create(
+            rng.choice(CALCULATION_TYPES), user_id, [rng.uniform(1, 100) for _ in range(rng.randint(2, 5))]
+        )
+        calculation.id = uuid.uuid4()
+        calculation.result = calculation.get_result()
+        calculation.created_at = calculation.updated_at = start + timedelta(seconds=index)
+        calculations.append(calculation)
+    return calculations
+
+
+def fastapi_path(calculations) -> bytes:
+    models = adapter.validate_python(calculations, from_attributes=True)
+    return json.dumps(jsonable_encoder(models)).encode()
+
+
+def pydantic_path(calculations) -> bytes:
+    return adapter.dump_json(adapter.validate_python(calculations, from_attributes=True))
+
+
+def direct_path(calculations) -> bytes:
+    return serialization.dump_calculations(calculations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"orjson: {'yes' if serialization.is_available() else 'no (stdlib json fallback)'}")
+    print(f"{'size':>8}{'fastapi (ms)':>15}{'pydantic (ms)':>15}{'direct (ms)':>13}{'speedup':>10}")
+    for size in args.sizes:
+        calculations = make_calculations(size)
+        # Same document either way
+        assert json.loads(direct_path(calculations)) == json.loads(pydantic_path(calculations))
+        times = [
+            min(timeit.repeat(lambda: path(calculations), number=1, repeat=args.repeat))
+            for path in (fastapi_path, pydantic_path, direct_path)
+        ]
+        print(
+            f"{size:>8}{times[0] * 1000:>15.2f}{times[1] * 1000:>15.2f}{times[2] * 1000:>13.2f}"
+            f"{times[0] / times[2]:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# benchmarks/bench_uuid_keys.py
+"""
+Benchmark: random (v4) vs time-ordered (v7) UUID primary keys
+
+For each generator, creates a scratch table shaped like calculations
+(uuid primary key, user_id, type, result, timestamps) in the configured
+database (DATABASE_URL) and loads N rows into it in batches with COPY, as
+the import job does. Keys are generated before each batch is timed, so
+only the database work is measured. Prints, per generator:
+
+- insert throughput over the whole load, and of the last 10% of batches,
+  when the index is largest and random keys miss the cache most;
+- the size of the primary key index and of the table;
+- the average leaf page density of the index (pgstattuple, if the
+  extension is available).
+
+The cost of generating the keys in Python is printed as well. The scratch
+tables are dropped at the end unless --keep is given.
+
+Usage:
+    python -m benchmarks.bench_uuid_keys
+    python -m benchmarks.bench_uuid_keys --rows 5000000 --batch-size 20000
+"""
+
+import argparse
+import io
+import time
+import timeit
+import uuid
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import text
+
+from app.core.ids import uuid7
+from app.database import engine
+
+GENERATORS = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+
+def create_table(name: str) -> None:
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        connection.execute(text(
+            f"CREATE TABLE {name} ("
+            "id uuid PRIMARY KEY, user_id uuid NOT NULL, type varchar(50) NOT NULL, "
+            "result float8, created_at timestamp NOT NULL, updated_at timestamp NOT NULL)"
+        ))
+
+
+def load(name: str, generate: Callable[[], uuid.UUID], rows: int, batch_size: int) -> tuple:
+    """COPY `rows` rows into the table; return (total seconds, seconds and rows of the last 10%)."""
+    user_id = uuid.uuid4()
+    now = datetime.utcnow().isoformat()
+    total = tail = 0.0
+    tail_rows = 0
+    tail_start = rows - rows // 10
+    raw = engine.raw_connection()
+    try:
+        for start in range(0, rows, batch_size):
+            count = min(batch_size, rows - start)
+            buffer = io.StringIO("".join(
+                f"{generate()}\t{user_id}\taddition\t{index}\t{now}\t{now}\n"
+                for index in range(start, start + count)
+            ))
+            started = time.perf_counter()
+            with raw.cursor() as cursor:
+                cursor.copy_expert(f"COPY {name} FROM STDIN", buffer)
+            raw.commit()
+            elapsed = time.perf_counter() - started
+            total += elapsed
+            if start >= tail_start:
+                tail += elapsed
+                tail_rows += count
+    finally:
+        raw.close()
+    return total, tail, tail_rows
+
+
+def sizes(name: str) -> tuple:
+    """(index bytes, table bytes, avg leaf density % or None)."""
+    with engine.connect() as connection:
+        index_bytes = connection.execute(text(f"SELECT pg_relation_size('{name}_pkey')")).scalar()
+        table_bytes = connection.execute(text(f"SELECT pg_relation_size('{name}')")).scalar()
+        density: Optional[float] = None
+        try:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pgstattuple"))
+            density = connection.execute(text(f"SELECT avg_leaf_density FROM pgstatindex('{name}_pkey')")).scalar()
+            connection.commit()
+        except Exception:
+            connection.rollback()
+    return index_bytes, table_bytes, density
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch tables")
+    args = parser.parse_args()
+
+    print(f"{'generator':<10}{'us/key':>10}")
+    for name, generate in GENERATORS.items():
+        best = min(timeit.repeat(generate, number=100_000, repeat=3))
+        print(f"{name:<10}{best * 10:>10.2f}")
+    print()
+
+    print(
+        f"{'generator':<10}{'rows':>10}{'rows/s':>12}{'last 10% rows/s':>17}"
+        f"{'index MB':>10}{'table MB':>10}{'leaf density %':>16}"
+    )
+    for name, generate in GENERATORS.items():
+        table = f"bench_uuid_keys_{name}"
+        create_table(table)
+        try:
+            total, tail, tail_rows = load(table, generate, args.rows, args.batch_size)
+            index_bytes, table_bytes, density = sizes(table)
+            print(
+                f"{name:<10}{args.rows:>10}{args.rows / total:>12.0f}{tail_rows / tail if tail else 0:>17.0f}"
+                f"{index_bytes / 2 ** 20:>10.1f}{table_bytes / 2 ** 20:>10.1f}"
+                f"{density if density is not None else float('nan'):>16.1f}"
+            )
+        finally:
+            if not args.keep:
+                with engine.begin() as connection:
+                    connection.execute(text(f"DROP TABLE IF EXISTS {table}"))
+
+
+if __name__ == "__main__":
+    main()
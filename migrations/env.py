@@ -0,0 +1,69 @@
+# migrations/env.py
+"""
+Alembic environment.
+
+Migrations run against settings.DATABASE_URL (or the connection passed in
+by app.database_migrations.upgrade()), one transaction per migration, so a
+migration can step out of its transaction for CREATE INDEX CONCURRENTLY
+(see app.database_migrations.create_index_concurrently()).
+
+A session-level advisory lock serializes concurrent runs, e.g. several
+containers starting at once: the first applies the migrations, the others
+wait and then find nothing to do.
+"""
+
+from alembic import context
+from sqlalchemy import create_engine, pool, text
+
+from app.core.config import settings
+from app.database_migrations import MIGRATION_LOCK_ID, include_object, target_metadata
+
+config = context.config
+
+
+def run_migrations_offline() -> None:
+    """Emit the migrations as SQL (alembic upgrade head --sql)."""
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata(),
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        transaction_per_migration=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def _run(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata(),
+        include_object=include_object,
+        transaction_per_migration=True,
+    )
+    connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+    connection.commit()
+    try:
+        with context.begin_transaction():
+            context.run_migrations()
+    finally:
+        connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+        connection.commit()
+
+
+def run_migrations_online() -> None:
+    """Apply the migrations on a live connection."""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run(connection)
+        return
+    engine = create_engine(settings.DATABASE_URL, poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        _run(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,128 @@
+"""Baseline: the schema as Base.metadata.create_all() built it
+
+Databases created before migrations existed are stamped at this revision
+instead of running it (see app.database_migrations.upgrade()).
+
+As with create_all(), the storage of calculations.inputs follows
+CALCULATION_INPUTS_STORAGE, and calculations is partitioned by month when
+CALCULATIONS_PARTITIONED is set.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 07:29:45.096495
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+from app.models import partitions
+from app.models.types import FloatList
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('users',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('username', sa.String(length=50), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('password', sa.String(), nullable=False),
+    sa.Column('first_name', sa.String(length=50), nullable=False),
+    sa.Column('last_name', sa.String(length=50), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_login', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=True)
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+    op.create_table('calculation_collection_versions',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('calculation_imports',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('format', sa.String(length=10), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('rows_read', sa.BigInteger(), nullable=False),
+    sa.Column('rows_imported', sa.BigInteger(), nullable=False),
+    sa.Column('rows_failed', sa.BigInteger(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_calculation_imports_user_id'), 'calculation_imports', ['user_id'], unique=False)
+    op.create_table('calculation_stats_rollup',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('count', sa.BigInteger(), nullable=False),
+    sa.Column('result_count', sa.BigInteger(), nullable=False),
+    sa.Column('result_sum', sa.Float(), nullable=True),
+    sa.Column('result_min', sa.Float(), nullable=True),
+    sa.Column('result_max', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'type', 'bucket_start')
+    )
+    op.create_table('calculation_stats_rollup_state',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('watermark', sa.DateTime(), nullable=False),
+    sa.Column('dirty', sa.Boolean(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    if settings.CALCULATIONS_PARTITIONED:
+        primary_key = sa.PrimaryKeyConstraint('id', 'created_at')
+        table_kwargs = {'postgresql_partition_by': 'RANGE (created_at)'}
+    else:
+        primary_key = sa.PrimaryKeyConstraint('id')
+        table_kwargs = {}
+    op.create_table('calculations',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('inputs', FloatList(settings.CALCULATION_INPUTS_STORAGE), nullable=False),
+    sa.Column('result', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    primary_key,
+    **table_kwargs
+    )
+    op.create_index(op.f('ix_calculations_type'), 'calculations', ['type'], unique=False)
+    op.create_index('ix_calculations_user_id_created_at_id', 'calculations', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_calculations_user_id_type_created_at', 'calculations', ['user_id', 'type', 'created_at'], unique=False, postgresql_include=['result'])
+    partitions.ensure_partitions(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('calculations')
+    op.drop_table('calculation_stats_rollup_state')
+    op.drop_table('calculation_stats_rollup')
+    op.drop_index(op.f('ix_calculation_imports_user_id'), table_name='calculation_imports')
+    op.drop_table('calculation_imports')
+    op.drop_table('calculation_collection_versions')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
@@ -0,0 +1,34 @@
+"""Drop the redundant ix_users_id index
+
+users.id was declared with unique=True and index=True on top of being the
+primary key, so every user insert maintained two identical unique B-trees
+(users_pkey and ix_users_id). The index is dropped concurrently, so
+logins and registrations are not blocked while it goes.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 07:45:12.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.database_migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    drop_index_concurrently(op.f('ix_users_id'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    create_index_concurrently(op.f('ix_users_id'), 'users', ['id'], unique=True)
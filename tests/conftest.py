@@ -94,8 +94,7 @@ def setup_test_database(request):
     """
     logger.info("Setting up test database...")
     try:
-        Base.metadata.drop_all(bind=test_engine)
-        Base.metadata.create_all(bind=test_engine)
+        drop_db()
         init_db()
         logger.info("Test database initialized.")
     except Exception as e:
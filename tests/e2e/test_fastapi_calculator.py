@@ -1,3 +1,5 @@
+import json
+import time
 from datetime import datetime, timezone
 from uuid import uuid4
 import pytest
@@ -5,6 +7,7 @@ import requests
 from playwright.sync_api import Page
 
 # Import the Calculation model for direct model tests.
+from app.core.config import settings
 from app.models.calculation import Calculation
 
 # ---------------------------------------------------------------------------
@@ -288,6 +291,392 @@ def test_list_get_update_delete_calculation(base_url: str):
     get_response_after_delete = requests.get(get_url, headers=headers)
     assert get_response_after_delete.status_code == 404, "Expected 404 after deletion"
 
+def test_list_calculations_pagination(base_url: str):
+    user_data = {
+        "first_name": "Calc",
+        "last_name": "Pager",
+        "email": f"calc.pager{uuid4()}@example.com",
+        "username": f"calc_pager_{uuid4()}",
+        "password": "SecurePass123!",
+        "confirm_password": "SecurePass123!"
+    }
+    token_data = register_and_login(base_url, user_data)
+    headers = {"Authorization": f"Bearer {token_data['access_token']}"}
+    url = f"{base_url}/calculations"
+
+    created_ids = []
+    for i in range(5):
+        payload = {"type": "addition" if i % 2 == 0 else "subtraction", "inputs": [i, 1]}
+        response = requests.post(url, json=payload, headers=headers)
+        assert response.status_code == 201, f"Calculation creation failed: {response.text}"
+        created_ids.append(response.json()["id"])
+
+    # Walk every page with limit=2 and collect the ids
+    seen_ids = []
+    params = {"limit": 2}
+    while True:
+        response = requests.get(url, params=params, headers=headers)
+        assert response.status_code == 200, f"List calculations failed: {response.text}"
+        page = response.json()
+        assert len(page) <= 2
+        seen_ids.extend(c["id"] for c in page)
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        params = {"limit": 2, "cursor": next_cursor}
+
+    assert seen_ids == list(reversed(created_ids)), "Pages should list every calculation once, newest first"
+
+    # Filter by type
+    response = requests.get(url, params={"type": "subtraction"}, headers=headers)
+    assert response.status_code == 200
+    assert {c["type"] for c in response.json()} == {"subtraction"}
+    assert len(response.json()) == 2
+
+    # A malformed cursor is rejected
+    response = requests.get(url, params={"cursor": "garbage"}, headers=headers)
+    assert response.status_code == 400
+
+def test_create_calculations_batch(base_url: str):
+    user_data = {
+        "first_name": "Calc",
+        "last_name": "Batcher",
+        "email": f"calc.batch{uuid4()}@example.com",
+        "username": f"calc_batch_{uuid4()}",
+        "password": "SecurePass123!",
+        "confirm_password": "SecurePass123!"
+    }
+    token_data = register_and_login(base_url, user_data)
+    headers = {"Authorization": f"Bearer {token_data['access_token']}"}
+    url = f"{base_url}/calculations/batch"
+    payload = [
+        {"type": "addition", "inputs": [1, 2, 3]},
+        {"type": "division", "inputs": [10, 0]},        # rejected: divide by zero
+        {"type": "multiplication", "inputs": [2, 5]},
+        {"type": "modulo", "inputs": [5, 2]},           # rejected: unknown type
+        {"type": "root", "inputs": [81, 4]},
+    ]
+    response = requests.post(url, json=payload, headers=headers)
+    assert response.status_code == 201, f"Batch creation failed: {response.text}"
+    data = response.json()
+
+    assert [c["result"] for c in data["created"]] == [6, 10, 3]
+    assert [e["index"] for e in data["errors"]] == [1, 3]
+
+    # The stored calculations are visible through the list endpoint
+    list_response = requests.get(f"{base_url}/calculations", headers=headers)
+    assert {c["id"] for c in list_response.json()} == {c["id"] for c in data["created"]}
+
+def test_create_calculations_batch_of_max_size(base_url: str):
+    user_data = {
+        "first_name": "Calc",
+        "last_name": "Bulk",
+        "email": f"calc.bulk{uuid4()}@example.com",
+        "username": f"calc_bulk_{uuid4()}",
+        "password": "SecurePass123!",
+        "confirm_password": "SecurePass123!"
+    }
+    token_data = register_and_login(base_url, user_data)
+    headers = {"Authorization": f"Bearer {token_data['access_token']}"}
+    # More rows than fit in one INSERT's bind parameters
+    size = settings.CALCULATIONS_BATCH_MAX_SIZE
+    payload = [{"type": "addition", "inputs": [i, 1]} for i in range(size)]
+    response = requests.post(f"{base_url}/calculations/batch", json=payload, headers=headers)
+    assert response.status_code == 201, f"Batch creation failed: {response.text}"
+    data = response.json()
+    assert len(data["created"]) == size
+    assert data["errors"] == []
+
+    response = requests.get(f"{base_url}/calculations/stats", headers=headers)
+    assert response.json()["types"][0]["count"] == size
+
+def test_calculation_stats(base_url: str):
+    user_data = {
+        "first_name": "Calc",
+        "last_name": "Stats",
+        "email": f"calc.stats{uuid4()}@example.com",
+        "username": f"calc_stats_{uuid4()}",
+        "password": "SecurePass123!",
+        "confirm_password": "SecurePass123!"
+    }
+    token_data = register_and_login(base_url, user_data)
+    headers = {"Authorization": f"Bearer {token_data['access_token']}"}
+    payload = [
+        {"type": "addition", "inputs": [1, 2]},
+        {"type": "addition", "inputs": [10, 20]},
+        {"type": "multiplication", "inputs": [2, 5]},
+    ]
+    response = requests.post(f"{base_url}/calculations/batch", json=payload, headers=headers)
+    assert response.status_code == 201, f"Batch creation failed: {response.text}"
+
+    response = requests.get(f"{base_url}/calculations/stats", params={"interval": "hour"}, headers=headers)
+    assert response.status_code == 200, f"Stats failed: {response.text}"
+    data = response.json()
+    assert data["interval"] == "hour"
+    assert data["source"] == "live"
+    by_type = {row["type"]: row for row in data["types"]}
+    assert by_type["addition"] == {"type": "addition", "count": 2, "sum": 33.0, "min": 3.0, "max": 30.0, "avg": 16.5}
+    assert by_type["multiplication"]["count"] == 1
+    assert sum(bucket["count"] for bucket in data["histogram"]) == 3
+
+    # Filtering by type
+    response = requests.get(f"{base_url}/calculations/stats", params={"type": "multiplication"}, headers=headers)
+    assert [row["type"] for row in response.json()["types"]] == ["multiplication"]
+
+    # Unknown intervals are rejected
+    response = requests.get(f"{base_url}/calculations/stats", params={"interval": "month"}, headers=headers)
+    assert response.status_code == 422
+
+def test_export_calculations(base_url: str):
+    user_data = {
+        "first_name": "Calc",
+        "last_name": "Exporter",
+        "email": f"calc.export{uuid4()}@example.com",
+        "username": f"calc_export_{uuid4()}",
+        "password": "SecurePass123!",
+        "confirm_password": "SecurePass123!"
+    }
+    token_data = register_and_login(base_url, user_data)
+    headers = {"Authorization": f"Bearer {token_data['access_token']}"}
+    payload = [{"type": "addition", "inputs": [i, 1]} for i in range(5)]
+    response = requests.post(f"{base_url}/calculations/batch", json=payload, headers=headers)
+    assert response.status_code == 201, f"Batch creation failed: {response.text}"
+
+    response = requests.get(f"{base_url}/calculations/export", headers=headers, stream=True)
+    assert response.status_code == 200, f"Export failed: {response.text}"
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert "calculations.ndjson" in response.headers["content-disposition"]
+    records = [json.loads(line) for line in response.iter_lines() if line]
+    assert sorted(r["result"] for r in records) == [1, 2, 3, 4, 5]
+
+    response = requests.get(f"{base_url}/calculations/export", params={"format": "csv"}, headers=headers)
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines[0] == "id,type,inputs,result,created_at,updated_at"
+    assert len(lines) == 6
+
+    response = requests.get(f"{base_url}/calculations/export", params={"format": "xml"}, headers=headers)
+    assert response.status_code == 422
+
+def test_import_calculations(base_url: str):
+    user_data = {
+        "first_name": "Calc",
+        "last_name": "Importer",
+        "email": f"calc.import{uuid4()}@example.com",
+        "username": f"calc_import_{uuid4()}",
+        "password": "SecurePass123!",
+        "confirm_password": "SecurePass123!"
+    }
+    token_data = register_and_login(base_url, user_data)
+    headers = {"Authorization": f"Bearer {token_data['access_token']}"}
+    content = "type,inputs\naddition,\"[1, 2]\"\ndivision,\"[1, 0]\"\nroot,\"[16, 2]\"\n"
+    response = requests.post(
+        f"{base_url}/calculations/import",
+        files={"file": ("data.csv", content, "text/csv")},
+        headers=headers,
+    )
+    assert response.status_code == 202, f"Import failed: {response.text}"
+    job = response.json()
+    assert job["format"] == "csv"
+
+    # Poll the job until it has finished
+    deadline = time.time() + 10
+    while job["status"] not in ("completed", "failed") and time.time() < deadline:
+        time.sleep(0.1)
+        job = requests.get(f"{base_url}/calculations/import/{job['id']}", headers=headers).json()
+    assert job["status"] == "completed", job
+    assert (job["rows_read"], job["rows_imported"], job["rows_failed"]) == (3, 2, 1)
+
+    list_response = requests.get(f"{base_url}/calculations", headers=headers)
+    assert sorted(c["result"] for c in list_response.json()) == [3, 4]
+
+    errors = requests.get(f"{base_url}/calculations/import/{job['id']}/errors", headers=headers)
+    assert errors.status_code == 200
+    assert errors.text.splitlines()[1].startswith("3,")
+
+    # Unknown formats are rejected up front
+    response = requests.post(
+        f"{base_url}/calculations/import",
+        files={"file": ("data.xlsx", b"...", "application/octet-stream")},
+        headers=headers,
+    )
+    assert response.status_code == 400
+
+def test_conditional_requests(base_url: str):
+    user_data = {
+        "first_name": "Calc",
+        "last_name": "Poller",
+        "email": f"calc.etag{uuid4()}@example.com",
+        "username": f"calc_etag_{uuid4()}",
+        "password": "SecurePass123!",
+        "confirm_password": "SecurePass123!"
+    }
+    token_data = register_and_login(base_url, user_data)
+    headers = {"Authorization": f"Bearer {token_data['access_token']}"}
+    created = requests.post(
+        f"{base_url}/calculations", json={"type": "addition", "inputs": [1, 2]}, headers=headers
+    ).json()
+    calc_url = f"{base_url}/calculations/{created['id']}"
+
+    # Single calculation: 304 while unchanged
+    response = requests.get(calc_url, headers=headers)
+    etag = response.headers["ETag"]
+    response = requests.get(calc_url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    # List: 304 while unchanged, new ETag after a write
+    list_etag = requests.get(f"{base_url}/calculations", headers=headers).headers["ETag"]
+    response = requests.get(f"{base_url}/calculations", headers={**headers, "If-None-Match": list_etag})
+    assert response.status_code == 304
+
+    # If-Match: a stale ETag is rejected, the current one succeeds
+    response = requests.put(calc_url, json={"inputs": [5, 5]}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 200
+    new_etag = response.headers["ETag"]
+    assert new_etag != etag
+    response = requests.put(calc_url, json={"inputs": [6, 6]}, headers={**headers, "If-Match": etag})
+    assert response.status_code == 412
+
+    response = requests.get(calc_url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["result"] == 10
+    response = requests.get(f"{base_url}/calculations", headers={**headers, "If-None-Match": list_etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != list_etag
+
+def test_bulk_delete_and_update_errors(base_url: str):
+    user_data = {
+        "first_name": "Calc",
+        "last_name": "Cleaner",
+        "email": f"calc.cleaner{uuid4()}@example.com",
+        "username": f"calc_clean_{uuid4()}",
+        "password": "SecurePass123!",
+        "confirm_password": "SecurePass123!"
+    }
+    token_data = register_and_login(base_url, user_data)
+    headers = {"Authorization": f"Bearer {token_data['access_token']}"}
+    url = f"{base_url}/calculations"
+    ids = [
+        requests.post(url, json={"type": "division", "inputs": [i + 1, 2]}, headers=headers).json()["id"]
+        for i in range(3)
+    ]
+
+    # Inputs invalid for the stored type are rejected and nothing changes
+    response = requests.put(f"{url}/{ids[0]}", json={"inputs": [1, 0]}, headers=headers)
+    assert response.status_code == 400
+    assert requests.get(f"{url}/{ids[0]}", headers=headers).json()["result"] == 0.5
+    response = requests.put(f"{url}/{uuid4()}", json={"inputs": [1, 2]}, headers=headers)
+    assert response.status_code == 404
+
+    # Inputs are only evaluated under the stored type: they may overflow or
+    # have no real result under other types
+    addition_id = requests.post(url, json={"type": "addition", "inputs": [1, 2]}, headers=headers).json()["id"]
+    response = requests.put(f"{url}/{addition_id}", json={"inputs": [1e200, 2]}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["result"] == 1e200
+    response = requests.put(f"{url}/{addition_id}", json={"inputs": [-8, 2]}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["result"] == -6
+    root_id = requests.post(url, json={"type": "root", "inputs": [8, 3]}, headers=headers).json()["id"]
+    response = requests.put(f"{url}/{root_id}", json={"inputs": [-8, 2]}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Result is not a real number."
+    requests.delete(f"{url}/{addition_id}", headers=headers)
+    requests.delete(f"{url}/{root_id}", headers=headers)
+
+    unknown = str(uuid4())
+    response = requests.delete(url, params={"ids": f"{ids[0]},{ids[1]}"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"deleted": 2, "missing": []}
+    response = requests.delete(url, params=[("ids", ids[2]), ("ids", unknown)], headers=headers)
+    assert response.json() == {"deleted": 1, "missing": [unknown]}
+    assert requests.get(url, headers=headers).json() == []
+
+    assert requests.delete(url, params={"ids": "not-a-uuid"}, headers=headers).status_code == 400
+    assert requests.delete(f"{url}/{ids[0]}", headers=headers).status_code == 404
+
+def test_bulk_changes_by_filter(base_url: str):
+    user_data = {
+        "first_name": "Calc",
+        "last_name": "Bulk",
+        "email": f"calc.bulk{uuid4()}@example.com",
+        "username": f"calc_bulk_{uuid4()}",
+        "password": "SecurePass123!",
+        "confirm_password": "SecurePass123!"
+    }
+    token_data = register_and_login(base_url, user_data)
+    headers = {"Authorization": f"Bearer {token_data['access_token']}"}
+    url = f"{base_url}/calculations"
+    for calculation in [
+        {"type": "addition", "inputs": [1, 2]},
+        {"type": "division", "inputs": [8, 2]},
+        {"type": "addition", "inputs": [3, 4]},
+    ]:
+        requests.post(url, json=calculation, headers=headers)
+
+    # Re-type every addition; results follow each row's inputs
+    response = requests.patch(url, params={"type": "addition"}, json={"type": "multiplication"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"updated": 2, "failed": 0}
+    assert sorted(c["result"] for c in requests.get(url, headers=headers).json()) == [2, 4, 12]
+
+    # New inputs that are invalid for some rows leave those rows unchanged
+    response = requests.patch(url, params={"created_after": "2000-01-01T00:00:00Z"}, json={"inputs": [5, 0]}, headers=headers)
+    assert response.json() == {"updated": 2, "failed": 1}
+    assert requests.patch(url, json={"inputs": [1, 2]}, headers=headers).status_code == 400
+    assert requests.patch(url, params={"type": "division"}, json={}, headers=headers).status_code == 422
+
+    # Inputs are only evaluated under the matching types; none can take them: 400
+    response = requests.patch(url, params={"type": "multiplication"}, json={"inputs": [-8, 2]}, headers=headers)
+    assert response.json() == {"updated": 2, "failed": 0}
+    response = requests.patch(url, params={"type": "multiplication"}, json={"inputs": [1e200, 2]}, headers=headers)
+    assert response.json() == {"updated": 2, "failed": 0}
+    response = requests.patch(url, params={"type": "division"}, json={"inputs": [1, 0]}, headers=headers)
+    assert response.status_code == 400
+    response = requests.patch(url, params={"type": "division"}, json={"type": "exponentiation", "inputs": [1e200, 2]}, headers=headers)
+    assert response.status_code == 400
+
+    response = requests.delete(url, params={"type": "multiplication"}, headers=headers)
+    assert response.json() == {"deleted": 2, "missing": []}
+    assert [c["type"] for c in requests.get(url, headers=headers).json()] == ["division"]
+
+    # A filter is required, and it cannot be combined with ids
+    assert requests.delete(url, headers=headers).status_code == 400
+    assert requests.delete(url, params={"ids": str(uuid4()), "type": "division"}, headers=headers).status_code == 400
+
+def test_list_cache_follows_writes(base_url: str):
+    user_data = {
+        "first_name": "Calc",
+        "last_name": "Dashboard",
+        "email": f"calc.dashboard{uuid4()}@example.com",
+        "username": f"calc_dash_{uuid4()}",
+        "password": "SecurePass123!",
+        "confirm_password": "SecurePass123!"
+    }
+    token_data = register_and_login(base_url, user_data)
+    headers = {"Authorization": f"Bearer {token_data['access_token']}"}
+    url = f"{base_url}/calculations"
+    first = requests.post(url, json={"type": "addition", "inputs": [1, 1]}, headers=headers).json()
+    requests.post(url, json={"type": "addition", "inputs": [2, 2]}, headers=headers)
+
+    # A repeated page (served from the cache) keeps its body and headers
+    page = requests.get(url, params={"limit": 1}, headers=headers)
+    again = requests.get(url, params={"limit": 1}, headers=headers)
+    assert again.status_code == 200
+    assert again.content == page.content
+    assert again.headers["X-Next-Cursor"] == page.headers["X-Next-Cursor"]
+    assert again.headers["ETag"] == page.headers["ETag"]
+
+    # Create, update and delete are all visible on the next read
+    requests.post(url, json={"type": "addition", "inputs": [3, 3]}, headers=headers)
+    assert [c["result"] for c in requests.get(url, headers=headers).json()] == [6, 4, 2]
+    requests.put(f"{url}/{first['id']}", json={"inputs": [5, 5]}, headers=headers)
+    assert [c["result"] for c in requests.get(url, headers=headers).json()] == [6, 4, 10]
+    requests.delete(f"{url}/{first['id']}", headers=headers)
+    assert [c["result"] for c in requests.get(url, headers=headers).json()] == [6, 4]
+
 # simulating creating an exponentiation calculation
 def test_create_calculation_exponentiation(base_url: str):
     user_data = {
@@ -1,5 +1,6 @@
 import pytest
 import uuid
+from datetime import datetime, timedelta
 
 from app.models.calculation import (
     Calculation,
@@ -10,6 +11,7 @@ from app.models.calculation import (
     Division,
     Root
 )
+from app.models.collection_version import CalculationCollectionVersion
 
 # Helper function to create a dummy user_id for testing.
 def dummy_user_id():
@@ -280,3 +282,98 @@ def test_invalid_inputs_for_root():
     root = Root(user_id=dummy_user_id(), inputs=[10])
     with pytest.raises(ValueError, match="Inputs must be a list with at least two numbers."):
         root.get_result()
+
+def test_page_for_user_keyset_pagination(db_session, test_user):
+    """
+    Test that page_for_user walks a user's history newest first, one
+    keyset page at a time, without repeating or skipping rows.
+    """
+    base = datetime(2025, 1, 1)
+    for i in range(5):
+        calc = Calculation.create("addition", test_user.id, [i, 1])
+        calc.result = calc.get_result()
+        calc.created_at = base + timedelta(minutes=i)
+        db_session.add(calc)
+    db_session.commit()
+
+    seen = []
+    after = None
+    while True:
+        page = Calculation.page_for_user(db_session, test_user.id, limit=2, after=after)
+        if not page:
+            break
+        seen.extend(page)
+        after = (page[-1].created_at, page[-1].id)
+
+    assert [c.inputs[0] for c in seen] == [4, 3, 2, 1, 0]
+
+def test_page_for_user_filters(db_session, test_user):
+    """
+    Test that page_for_user applies the type and created_at range filters.
+    """
+    base = datetime(2025, 2, 1)
+    for i, calc_type in enumerate(["addition", "division", "addition"]):
+        calc = Calculation.create(calc_type, test_user.id, [8, 2])
+        calc.result = calc.get_result()
+        calc.created_at = base + timedelta(days=i)
+        db_session.add(calc)
+    db_session.commit()
+
+    additions = Calculation.page_for_user(
+        db_session, test_user.id, limit=10, calculation_type="addition"
+    )
+    assert [c.type for c in additions] == ["addition", "addition"]
+
+    in_range = Calculation.page_for_user(
+        db_session,
+        test_user.id,
+        limit=10,
+        created_after=base + timedelta(days=1),
+        created_before=base + timedelta(days=2),
+    )
+    assert [c.type for c in in_range] == ["division"]
+
+@pytest.mark.parametrize("calculation_type, rows", [
+    ("addition", [[1, 2, 3], [0.1, 0.2, 0.3], [1e16, 1, -1e16]]),
+    ("subtraction", [[10, 3, 2], [0.3, 0.1]]),
+    ("multiplication", [[2, 3, 4], [0.1, 3]]),
+    ("division", [[100, 2, 5], [1, 3], [5, 0, 1]]),
+    ("exponentiation", [[2, 3], [4, 0.5], [-8, 3], [2, 0.5, 2], [1.1, 3, 7], [10, 400, 0.001]]),
+    ("root", [[81, 4], [64, 2, 3], [64, 0], [64, -2], [-8, 3], [1.1, 3, 7]]),
+])
+def test_evaluate_many_matches_get_result(calculation_type, rows):
+    """
+    Test that evaluate_many gives the same results and errors as calling
+    get_result() on each calculation individually.
+    """
+    results, errors = Calculation.evaluate_many(calculation_type, rows)
+
+    for index, inputs in enumerate(rows):
+        calculation = Calculation.create(calculation_type, dummy_user_id(), inputs)
+        try:
+            expected = calculation.get_result()
+        except (ValueError, ArithmeticError) as e:
+            assert errors[index] == str(e)
+            assert results[index] is None
+            continue
+        if isinstance(expected, complex):
+            assert index in errors
+            continue
+        assert index not in errors
+        # Exactly equal: a result must not depend on the path that computed it
+        assert results[index] == expected
+
+def test_evaluate_many_rejects_short_inputs():
+    """Test that rows with fewer than two inputs are reported as errors."""
+    results, errors = Calculation.evaluate_many("addition", [[1], [1, 2]])
+    assert results == [None, 3]
+    assert errors == {0: "Inputs must be a list with at least two numbers."}
+
+
+def test_collection_version_bump(db_session, test_user):
+    """Test that bumping the collection version increments it per user."""
+    assert CalculationCollectionVersion.current(db_session, test_user.id) == 0
+    CalculationCollectionVersion.bump(db_session, test_user.id)
+    CalculationCollectionVersion.bump(db_session, test_user.id)
+    db_session.commit()
+    assert CalculationCollectionVersion.current(db_session, test_user.id) == 2
@@ -0,0 +1,153 @@
+# tests/integration/test_calculation_bulk.py
+"""
+Integration tests for the chunked filter-based bulk changes.
+
+A chunk size of 2 makes every bulk change span several chunks.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.models import calculation_bulk
+from app.models.calculation import Calculation
+from app.models.collection_version import CalculationCollectionVersion
+
+
+def add_calculations(db_session, user, specs, start=datetime(2025, 3, 1)):
+    """Add calculations of (type, inputs), one minute apart; return their ids."""
+    ids = []
+    for i, (calculation_type, inputs) in enumerate(specs):
+        calc = Calculation.create(calculation_type, user.id, inputs)
+        calc.result = calc.get_result()
+        calc.created_at = start + timedelta(minutes=i)
+        db_session.add(calc)
+        db_session.flush()
+        ids.append(calc.id)
+    db_session.commit()
+    return ids
+
+
+def stored(db_session, user_id):
+    """(type, inputs, result) of the user's calculations, oldest first."""
+    table = Calculation.__table__
+    rows = db_session.execute(
+        select(table.c.type, table.c.inputs, table.c.result)
+        .where(table.c.user_id == user_id)
+        .order_by(table.c.created_at)
+    ).all()
+    return [(row.type, list(row.inputs), row.result) for row in rows]
+
+
+def test_bulk_delete_by_filter_in_chunks(db_session, seed_users):
+    owner, other = seed_users[:2]
+    owner_id, other_id = owner.id, other.id
+    add_calculations(db_session, owner, [("addition", [i, 1]) for i in range(5)] + [("subtraction", [5, 1])])
+    add_calculations(db_session, other, [("addition", [1, 1])])
+    version = CalculationCollectionVersion.current(db_session, owner_id)
+
+    deleted = calculation_bulk.bulk_delete(db_session, owner_id, {"calculation_type": "addition"}, chunk_size=2)
+
+    assert deleted == 5
+    assert stored(db_session, owner_id) == [("subtraction", [5, 1], 4)]
+    assert len(stored(db_session, other_id)) == 1
+    assert CalculationCollectionVersion.current(db_session, owner_id) == version + 3
+
+    # Nothing left to match: no change, no version bump
+    assert calculation_bulk.bulk_delete(db_session, owner_id, {"calculation_type": "addition"}, chunk_size=2) == 0
+    assert CalculationCollectionVersion.current(db_session, owner_id) == version + 3
+
+
+def test_bulk_delete_by_created_at_range(db_session, test_user):
+    user_id = test_user.id
+    add_calculations(db_session, test_user, [("addition", [i, 1]) for i in range(5)])
+
+    deleted = calculation_bulk.bulk_delete(
+        db_session,
+        user_id,
+        {"created_after": datetime(2025, 3, 1, 0, 1), "created_before": datetime(2025, 3, 1, 0, 4)},
+        chunk_size=2,
+    )
+
+    assert deleted == 3
+    assert [inputs for _, inputs, _ in stored(db_session, user_id)] == [[0, 1], [4, 1]]
+
+
+def test_bulk_update_inputs_recomputes_each_type(db_session, test_user):
+    user_id = test_user.id
+    add_calculations(
+        db_session,
+        test_user,
+        [("addition", [1, 1]), ("division", [4, 2]), ("multiplication", [3, 3]), ("division", [9, 3])],
+    )
+
+    updated, failed = calculation_bulk.bulk_update(db_session, user_id, {}, inputs=[6, 0], chunk_size=3)
+
+    # Division by zero is invalid, so the divisions keep their inputs
+    assert (updated, failed) == (2, 2)
+    assert stored(db_session, user_id) == [
+        ("addition", [6, 0], 6),
+        ("division", [4, 2], 2),
+        ("multiplication", [6, 0], 0),
+        ("division", [9, 3], 3),
+    ]
+
+
+def test_bulk_update_type_and_inputs(db_session, test_user):
+    user_id = test_user.id
+    ids = add_calculations(db_session, test_user, [("addition", [i, 1]) for i in range(5)])
+
+    updated, failed = calculation_bulk.bulk_update(
+        db_session, user_id, {"ids": ids[1:4]}, new_type="multiplication", inputs=[2, 5], chunk_size=2
+    )
+
+    assert (updated, failed) == (3, 0)
+    assert [result for _, _, result in stored(db_session, user_id)] == [1, 10, 10, 10, 5]
+
+    with pytest.raises(ValueError):
+        calculation_bulk.bulk_update(db_session, user_id, {}, new_type="division", inputs=[1, 0])
+    with pytest.raises(ValueError):
+        calculation_bulk.bulk_update(db_session, user_id, {})
+
+
+def test_bulk_update_type_uses_each_rows_inputs(db_session, test_user):
+    user_id = test_user.id
+    add_calculations(db_session, test_user, [("addition", [8, 2]), ("addition", [5, 0]), ("subtraction", [9, 3])])
+    version = CalculationCollectionVersion.current(db_session, user_id)
+
+    updated, failed = calculation_bulk.bulk_update(
+        db_session, user_id, {"calculation_type": "addition"}, new_type="division", chunk_size=1
+    )
+
+    assert (updated, failed) == (1, 1)
+    assert stored(db_session, user_id) == [
+        ("division", [8, 2], 4),
+        ("addition", [5, 0], 5),
+        ("subtraction", [9, 3], 6),
+    ]
+    # Only the chunk that changed something bumped the version
+    assert CalculationCollectionVersion.current(db_session, user_id) == version + 1
+
+
+def test_bulk_update_inputs_only_evaluates_matching_types(db_session, test_user):
+    user_id = test_user.id
+    add_calculations(db_session, test_user, [("addition", [1, 1]), ("root", [8, 3])])
+
+    # Overflow under exponentiation and a complex root do not matter to additions
+    assert calculation_bulk.bulk_update(
+        db_session, user_id, {"calculation_type": "addition"}, inputs=[1e200, 2]
+    ) == (1, 0)
+    assert calculation_bulk.bulk_update(
+        db_session, user_id, {"calculation_type": "addition"}, inputs=[-8, 2]
+    ) == (1, 0)
+    # Mixed types: the root keeps its inputs
+    assert calculation_bulk.bulk_update(db_session, user_id, {}, inputs=[-8, 2]) == (1, 1)
+    assert stored(db_session, user_id) == [("addition", [-8, 2], -6), ("root", [8, 3], 2)]
+
+    # Invalid for every matching calculation: rejected like a single update
+    with pytest.raises(ValueError, match="not a real number"):
+        calculation_bulk.bulk_update(db_session, user_id, {"calculation_type": "root"}, inputs=[-8, 2])
+    with pytest.raises(ValueError):
+        calculation_bulk.bulk_update(db_session, user_id, {}, new_type="exponentiation", inputs=[1e200, 2])
+    assert stored(db_session, user_id) == [("addition", [-8, 2], -6), ("root", [8, 3], 2)]
@@ -0,0 +1,59 @@
+# tests/integration/test_calculation_reads.py
+"""
+Integration tests for the column-projected read queries.
+"""
+
+from datetime import datetime, timedelta
+
+from app.database import engine
+from app.models.calculation import Calculation
+from app.models.calculation_reads import RESPONSE_COLUMNS, iter_rows, owned_query, page_query, user_calculations_query
+
+
+def add_calculations(db_session, user, count, start=datetime(2025, 3, 1)):
+    calculations = []
+    for i in range(count):
+        calc = Calculation.create("addition", user.id, [i, 1])
+        calc.result = calc.get_result()
+        calc.created_at = start + timedelta(minutes=i)
+        db_session.add(calc)
+        calculations.append(calc)
+    db_session.commit()
+    return calculations
+
+
+def test_page_query_returns_rows_not_entities(db_session, test_user):
+    """Test that a page is read as plain rows, leaving the identity map alone."""
+    user_id = test_user.id
+    add_calculations(db_session, test_user, 3)
+    db_session.expunge_all()
+
+    rows = db_session.execute(page_query(user_id, 2)).all()
+
+    assert [row.inputs[0] for row in rows] == [2, 1]
+    assert list(rows[0]._fields) == list(RESPONSE_COLUMNS)
+    assert rows[0].result == 3
+    assert len(db_session.identity_map) == 0
+
+
+def test_page_query_matches_page_for_user(db_session, test_user):
+    add_calculations(db_session, test_user, 4)
+    entities = Calculation.page_for_user(db_session, test_user.id, limit=10, created_after=datetime(2025, 3, 1, 0, 1))
+    rows = db_session.execute(page_query(test_user.id, 10, created_after=datetime(2025, 3, 1, 0, 1))).all()
+    assert [row.id for row in rows] == [calc.id for calc in entities]
+
+
+def test_owned_query_is_scoped_to_the_user(db_session, seed_users):
+    owner, other = seed_users[:2]
+    (calc,) = add_calculations(db_session, owner, 1)
+
+    assert db_session.execute(owned_query(calc.id, owner.id)).first().id == calc.id
+    assert db_session.execute(owned_query(calc.id, other.id)).first() is None
+    assert db_session.scalar(owned_query(calc.id, owner.id, names=("updated_at",))) == calc.updated_at
+
+
+def test_iter_rows_streams_in_chunks(db_session, test_user):
+    add_calculations(db_session, test_user, 5)
+    with engine.connect() as connection:
+        rows = list(iter_rows(connection, user_calculations_query(test_user.id), chunk_size=2))
+    assert [row.inputs[0] for row in rows] == [4, 3, 2, 1, 0]
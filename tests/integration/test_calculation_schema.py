@@ -7,7 +7,8 @@ from app.schemas.calculation import (
     CalculationCreate,
     CalculationType,
     CalculationUpdate,
-    CalculationResponse
+    CalculationResponse,
+    CalculationCursor
 )
 
 def test_calculation_create_valid():
@@ -126,4 +127,17 @@ def test_validate_inputs_root_negative_degree():
     errors = exc_info.value.errors()
     print(errors)
 
-    assert any("negative degree" in e['msg'].lower() for e in errors)
\ No newline at end of file
+    assert any("negative degree" in e['msg'].lower() for e in errors)
+
+
+def test_calculation_cursor_round_trip():
+    """Test that a CalculationCursor survives encode/decode unchanged."""
+    cursor = CalculationCursor(created_at=datetime(2025, 1, 1, 12, 30), id=uuid4())
+    decoded = CalculationCursor.decode(cursor.encode())
+    assert decoded == cursor
+
+
+def test_calculation_cursor_invalid():
+    """Test that decoding a malformed cursor raises ValueError."""
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        CalculationCursor.decode("not-a-cursor")
@@ -0,0 +1,184 @@
+# tests/integration/test_calculation_stats.py
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, select
+
+from app.jobs.stats_rollup import refresh_rollups
+from app.models.calculation import Calculation
+from app.models.stats import (
+    CalculationStatsRollup,
+    CalculationStatsRollupState,
+    calculation_stats,
+)
+from tests.conftest import TestingSessionLocal, test_engine
+
+NOW = datetime(2024, 5, 10, 12, 30)
+
+
+def _seed(db_session, user, rows):
+    """Store (type, inputs, hours ago) calculations with fixed created_at times."""
+    calculations = []
+    for calculation_type, inputs, hours_ago in rows:
+        calculation = Calculation.create(calculation_type, user.id, inputs)
+        calculation.result = calculation.get_result()
+        calculation.created_at = NOW - timedelta(hours=hours_ago)
+        calculations.append(calculation)
+    db_session.add_all(calculations)
+    db_session.commit()
+    return calculations
+
+
+@pytest.fixture
+def history(db_session, test_user):
+    return _seed(db_session, test_user, [
+        ("addition", [1, 2], 50),
+        ("addition", [10, 20], 30),
+        ("addition", [5, 5], 2),
+        ("multiplication", [2, 3], 26),
+        ("multiplication", [4, 4], 1),
+        ("division", [9, 3], 0),
+    ])
+
+
+def _strip_source(stats):
+    return {key: value for key, value in stats.items() if key != "source"}
+
+
+def test_live_stats_aggregate_per_type_and_bucket(db_session, test_user, history):
+    """Test the per-type aggregates and the daily histogram computed in SQL."""
+    stats = calculation_stats(db_session, test_user.id, interval="day")
+
+    assert stats["source"] == "live"
+    by_type = {row["type"]: row for row in stats["types"]}
+    assert by_type["addition"] == {"type": "addition", "count": 3, "sum": 43.0, "min": 3.0, "max": 30.0, "avg": 43.0 / 3}
+    assert by_type["multiplication"]["count"] == 2
+    assert by_type["multiplication"]["max"] == 16.0
+    assert by_type["division"]["avg"] == 3.0
+
+    day = datetime(2024, 5, 10)
+    today = {row["type"]: row["count"] for row in stats["histogram"] if row["bucket_start"] == day}
+    assert today == {"addition": 1, "division": 1, "multiplication": 1}
+    assert sum(row["count"] for row in stats["histogram"]) == len(history)
+
+
+def test_live_stats_filters(db_session, test_user, history):
+    """Test the type and created_at filters."""
+    stats = calculation_stats(
+        db_session, test_user.id, interval="hour",
+        calculation_type="addition", created_after=NOW - timedelta(hours=40),
+    )
+    assert [row["type"] for row in stats["types"]] == ["addition"]
+    assert stats["types"][0]["count"] == 2
+    assert len(stats["histogram"]) == 2
+
+
+def test_rollup_matches_live_stats(db_session, test_user, history, monkeypatch):
+    """Test that rollup + live tail answers exactly like the live query."""
+    intervals = ("hour", "day", "week")
+    live = {interval: calculation_stats(db_session, test_user.id, interval=interval) for interval in intervals}
+
+    CalculationStatsRollup.enable(db_session, test_user.id)
+    # Materialize everything up to 3 hours ago; the rest is the live tail
+    CalculationStatsRollup.refresh(db_session, test_user.id, now=NOW - timedelta(hours=3))
+    db_session.commit()
+    monkeypatch.setattr(CalculationStatsRollup, "needs_refresh", classmethod(lambda cls, state, now=None: False))
+
+    for interval in intervals:
+        rollup_stats = calculation_stats(db_session, test_user.id, interval=interval)
+        assert rollup_stats["source"] == "rollup"
+        assert _strip_source(rollup_stats) == _strip_source(live[interval])
+
+    rollup_rows = db_session.scalars(
+        select(CalculationStatsRollup).where(CalculationStatsRollup.user_id == test_user.id)
+    ).all()
+    assert sum(row.count for row in rollup_rows) == 3
+
+
+def test_rollup_refresh_is_incremental(db_session, test_user, history):
+    """Test that a clean refresh only aggregates the hours after the watermark."""
+    CalculationStatsRollup.enable(db_session, test_user.id)
+    CalculationStatsRollup.refresh(db_session, test_user.id, now=NOW - timedelta(hours=28))
+    db_session.commit()
+    first = db_session.get(CalculationStatsRollupState, test_user.id)
+    assert first.dirty is False
+    first_watermark = first.watermark
+
+    CalculationStatsRollup.refresh(db_session, test_user.id, now=NOW + timedelta(hours=2))
+    db_session.commit()
+    state = db_session.get(CalculationStatsRollupState, test_user.id)
+    assert state.watermark > first_watermark
+    rows = db_session.scalars(
+        select(CalculationStatsRollup).where(CalculationStatsRollup.user_id == test_user.id)
+    ).all()
+    # Each calculation sits in its own hour, so no hour was aggregated twice
+    assert len(rows) == len(history)
+    assert sum(row.count for row in rows) == len(history)
+
+
+def test_concurrent_refreshes_do_not_aggregate_twice(db_session, test_user, history):
+    """Test that a refresh re-reads a watermark moved by another session while it waited."""
+    CalculationStatsRollup.enable(db_session, test_user.id)
+    CalculationStatsRollup.refresh(db_session, test_user.id, now=NOW - timedelta(hours=28))
+    db_session.commit()
+    # This session keeps the clean state loaded while another one refreshes
+    loaded = db_session.get(CalculationStatsRollupState, test_user.id)
+    assert loaded.dirty is False and loaded.watermark < NOW
+
+    other = TestingSessionLocal()
+    try:
+        assert CalculationStatsRollup.refresh(other, test_user.id, now=NOW + timedelta(hours=2))
+        other.commit()
+    finally:
+        other.close()
+
+    assert CalculationStatsRollup.refresh(db_session, test_user.id, now=NOW + timedelta(hours=2))
+    db_session.commit()
+    assert loaded.watermark == datetime(2024, 5, 10, 14)
+    rows = db_session.scalars(
+        select(CalculationStatsRollup).where(CalculationStatsRollup.user_id == test_user.id)
+    ).all()
+    assert sum(row.count for row in rows) == len(history)
+
+
+def test_changing_old_calculation_marks_rollup_dirty(db_session, test_user, history):
+    """Test that deleting a materialized calculation triggers a rebuild on the next read."""
+    CalculationStatsRollup.enable(db_session, test_user.id)
+    CalculationStatsRollup.refresh(db_session, test_user.id, now=NOW + timedelta(hours=2))
+    db_session.commit()
+
+    oldest = history[0]
+    db_session.execute(delete(Calculation.__table__).where(Calculation.__table__.c.id == oldest.id))
+    CalculationStatsRollup.mark_dirty(db_session, test_user.id, oldest.created_at)
+    db_session.commit()
+    db_session.expire_all()
+    assert db_session.get(CalculationStatsRollupState, test_user.id).dirty is True
+
+    stats = calculation_stats(db_session, test_user.id)
+    db_session.commit()
+    assert stats["source"] == "rollup"
+    by_type = {row["type"]: row for row in stats["types"]}
+    assert by_type["addition"]["count"] == 2
+    assert db_session.get(CalculationStatsRollupState, test_user.id).dirty is False
+
+
+def test_unaligned_filters_use_live_query(db_session, test_user, history):
+    """Test that filters inside an hour bypass the rollup, which only has whole hours."""
+    CalculationStatsRollup.enable(db_session, test_user.id)
+    db_session.commit()
+
+    stats = calculation_stats(db_session, test_user.id, created_after=NOW - timedelta(minutes=100))
+    assert stats["source"] == "live"
+    assert sum(row["count"] for row in stats["types"]) == 2
+
+
+def test_rollup_job_enables_large_users(db_session, test_user, history):
+    """Test that the job enables users above the threshold and refreshes them."""
+    result = refresh_rollups(test_engine, min_rows=len(history))
+
+    assert result.users_enabled >= 1
+    assert result.users_refreshed >= 1
+    db_session.expire_all()
+    state = db_session.get(CalculationStatsRollupState, test_user.id)
+    assert state is not None and state.dirty is False
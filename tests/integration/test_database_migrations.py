@@ -0,0 +1,59 @@
+# tests/integration/test_database_migrations.py
+"""
+Integration tests for the schema migrations.
+
+The test database is built by init_db(), i.e. by running the migrations, so
+these tests check the migrated schema and the startup revision check.
+"""
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import text
+
+from app.database import engine
+from app.database_migrations import (
+    check_revision, create_index_concurrently, current_revision, drop_index_concurrently,
+    head_revision, include_object, target_metadata,
+)
+
+
+def test_migrations_match_the_models():
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={"include_object": include_object})
+        assert compare_metadata(context, target_metadata()) == []
+
+
+def test_check_revision_accepts_head_and_newer_revisions():
+    with engine.connect() as connection:
+        assert current_revision(connection) == head_revision()
+        assert check_revision(connection) is None
+
+        connection.execute(text("UPDATE alembic_version SET version_num = 'ffffffff'"))
+        assert "newer" in check_revision(connection)
+        connection.rollback()
+
+
+def test_check_revision_rejects_an_outdated_schema():
+    with engine.connect() as connection:
+        connection.execute(text("UPDATE alembic_version SET version_num = '0001'"))
+        with pytest.raises(RuntimeError, match="python -m app.database_init"):
+            check_revision(connection)
+        connection.rollback()
+
+
+def test_index_is_created_and_dropped_concurrently():
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection)
+        with Operations.context(context), context.begin_transaction():
+            create_index_concurrently("ix_users_last_login", "users", ["last_login"])
+            # Re-running is a no-op
+            create_index_concurrently("ix_users_last_login", "users", ["last_login"])
+        assert connection.execute(text(
+            "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass('ix_users_last_login')"
+        )).scalar() is True
+
+        with Operations.context(context), context.begin_transaction():
+            drop_index_concurrently("ix_users_last_login")
+        assert connection.execute(text("SELECT to_regclass('ix_users_last_login')")).scalar() is None
@@ -103,3 +103,64 @@ def test_get_current_active_user_inactive(mock_verify_token):
 
     assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
     assert exc_info.value.detail == "Inactive user"
+
+# ------------------------------------------------------------------------------
+# Verified token cache
+# ------------------------------------------------------------------------------
+from datetime import timedelta
+from app.auth import token_cache
+from app.auth.jwt import create_token
+from app.schemas.token import TokenType
+
+@pytest.fixture
+def empty_token_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+# Repeat requests with the same token skip verification
+def test_get_current_user_caches_verified_token(mock_verify_token, empty_token_cache):
+    token = create_token(sample_user_data["id"], TokenType.ACCESS)
+    mock_verify_token.return_value = sample_user_data
+
+    first = get_current_user(token=token)
+    second = get_current_user(token=token)
+
+    assert second is first
+    assert second.username == sample_user_data["username"]
+    mock_verify_token.assert_called_once_with(token)
+
+# Failed verifications are never cached
+def test_get_current_user_does_not_cache_invalid_token(mock_verify_token, empty_token_cache):
+    token = create_token(sample_user_data["id"], TokenType.ACCESS)
+    mock_verify_token.return_value = None
+
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            get_current_user(token=token)
+
+    assert mock_verify_token.call_count == 2
+
+# The cache never outlives the token's exp claim
+def test_expired_token_is_not_cached(empty_token_cache):
+    token = create_token(sample_user_data["id"], TokenType.ACCESS, expires_delta=timedelta(seconds=-1))
+
+    token_cache.put(token, UserResponse(**sample_user_data))
+
+    assert token_cache.get(token) is None
+
+# Revoking a token's jti drops it from the cache
+def test_revoked_token_is_invalidated(mock_verify_token, empty_token_cache):
+    token = create_token(sample_user_data["id"], TokenType.ACCESS)
+    other = create_token(sample_user_data["id"], TokenType.ACCESS)
+    mock_verify_token.return_value = sample_user_data
+    get_current_user(token=token)
+    get_current_user(token=other)
+
+    jti = token_cache.cache.get(token_cache.token_digest(token)).claims["jti"]
+    assert token_cache.invalidate_jti(jti) == 1
+
+    assert token_cache.get(token) is None
+    assert token_cache.get(other) is not None
+    get_current_user(token=token)
+    assert mock_verify_token.call_count == 3
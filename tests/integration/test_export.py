@@ -0,0 +1,84 @@
+# tests/integration/test_export.py
+
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+
+from app import database
+from app.core.metrics import metrics
+from app.export import export_query, get_encoder, stream_export, stream_export_async
+from app.models.calculation import Calculation
+from tests.conftest import test_engine
+
+
+@pytest.fixture
+def calculations(db_session, test_user):
+    rows = [("addition", [1, 2, 3]), ("division", [9, 3]), ("root", [81, 4]), ("multiplication", [2, 5])]
+    created = []
+    for calculation_type, inputs in rows:
+        calculation = Calculation.create(calculation_type, test_user.id, inputs)
+        calculation.result = calculation.get_result()
+        created.append(calculation)
+    db_session.add_all(created)
+    db_session.commit()
+    return created
+
+
+def _export(user_id, export_format, chunk_size=2, **filters):
+    return list(stream_export(test_engine, export_query(user_id, **filters), get_encoder(export_format), chunk_size))
+
+
+def test_ndjson_export_streams_in_chunks(test_user, calculations):
+    """Test that each chunk of rows becomes one block of NDJSON lines."""
+    metrics.reset()
+    chunks = _export(test_user.id, "ndjson")
+
+    # begin, two chunks of two rows, end
+    assert len(chunks) == 4
+    records = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert {r["id"] for r in records} == {str(c.id) for c in calculations}
+    by_type = {r["type"]: r for r in records}
+    assert by_type["addition"]["inputs"] == [1.0, 2.0, 3.0]
+    assert by_type["root"]["result"] == 3.0
+    assert metrics.snapshot()["counters"]["export.rows"] == 4
+
+
+def test_csv_export_has_header_and_json_inputs(test_user, calculations):
+    """Test the CSV layout and the type filter."""
+    data = b"".join(_export(test_user.id, "csv", calculation_type="division")).decode()
+    rows = list(csv.DictReader(io.StringIO(data)))
+
+    assert len(rows) == 1
+    assert rows[0]["type"] == "division"
+    assert json.loads(rows[0]["inputs"]) == [9.0, 3.0]
+    assert float(rows[0]["result"]) == 3.0
+
+
+def test_parquet_export(test_user, calculations):
+    """Test that the row groups and footer form a readable Parquet file."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    table = pq.read_table(io.BytesIO(b"".join(_export(test_user.id, "parquet"))))
+
+    assert table.num_rows == 4
+    assert sorted(table.column("type").to_pylist()) == ["addition", "division", "multiplication", "root"]
+
+
+def test_unknown_export_format():
+    with pytest.raises(ValueError):
+        get_encoder("xml")
+
+
+def test_async_export_matches_sync(test_user, calculations):
+    """Test that the asyncpg stream produces the same bytes."""
+    async def scenario():
+        engine = database.create_async_engine(database.async_database_url(test_engine.url.render_as_string(hide_password=False)))
+        try:
+            query = export_query(test_user.id)
+            return [chunk async for chunk in stream_export_async(engine, query, get_encoder("ndjson"), 3)]
+        finally:
+            await engine.dispose()
+
+    assert b"".join(asyncio.run(scenario())) == b"".join(_export(test_user.id, "ndjson", chunk_size=3))
@@ -0,0 +1,125 @@
+# tests/integration/test_import_calculations.py
+
+import csv
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.export import export_query, get_encoder, stream_export
+from app.jobs.import_calculations import detect_format, error_file_path, iter_records, run_import
+from app.models.calculation import Calculation
+from app.models.import_job import CalculationImportJob
+from tests.conftest import test_engine
+
+
+@pytest.fixture(autouse=True)
+def import_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CALCULATIONS_IMPORT_DIR", str(tmp_path / "imports"))
+    return tmp_path
+
+
+def _run(db_session, user, path, import_format, batch_size=2):
+    job = CalculationImportJob.create(db_session, user.id, import_format, path.name)
+    db_session.commit()
+    return run_import(job.id, path=str(path), engine=test_engine, batch_size=batch_size)
+
+
+def _stored(db_session, user):
+    db_session.expire_all()
+    return db_session.scalars(select(Calculation).where(Calculation.user_id == user.id)).all()
+
+
+def test_csv_import_loads_valid_rows_and_reports_errors(db_session, test_user, import_dir):
+    """Test a CSV import with valid, invalid and unevaluable records."""
+    path = import_dir / "data.csv"
+    path.write_text(
+        "type,inputs\n"
+        "addition,\"[1, 2, 3]\"\n"
+        "division,\"[10, 0]\"\n"        # line 3: divide by zero
+        "modulo,\"[5, 2]\"\n"           # line 4: unknown type
+        "multiplication,\"[2, 5]\"\n"
+        "root,not-json\n"               # line 6: unparseable inputs
+        "root,\"[81, 4]\"\n"
+    )
+
+    job = _run(db_session, test_user, path, "csv")
+
+    assert job.status == "completed"
+    assert (job.rows_read, job.rows_imported, job.rows_failed) == (6, 3, 3)
+    assert job.finished_at is not None
+    assert sorted(c.result for c in _stored(db_session, test_user)) == [3, 6, 10]
+    with open(error_file_path(job.id)) as f:
+        errors = list(csv.DictReader(f))
+    assert sorted(int(e["line"]) for e in errors) == [3, 4, 6]
+
+
+def test_ndjson_import(db_session, test_user, import_dir):
+    """Test an NDJSON import, including blank and malformed lines."""
+    path = import_dir / "data.ndjson"
+    path.write_text(
+        json.dumps({"type": "subtraction", "inputs": [10, 3]}) + "\n"
+        "\n"
+        "{not json\n"
+        + json.dumps({"type": "exponentiation", "inputs": [2, 3]}) + "\n"
+    )
+
+    job = _run(db_session, test_user, path, "ndjson", batch_size=100)
+
+    assert (job.rows_read, job.rows_imported, job.rows_failed) == (3, 2, 1)
+    calculations = {c.type: c for c in _stored(db_session, test_user)}
+    assert calculations["subtraction"].result == 7
+    assert list(calculations["exponentiation"].inputs) == [2.0, 3.0]
+
+
+def test_export_can_be_imported_again(db_session, test_user, seed_users, import_dir):
+    """Test that a CSV export of one user is a valid import file for another."""
+    for inputs in ([1, 2], [3, 4], [5, 6]):
+        calculation = Calculation.create("addition", test_user.id, inputs)
+        calculation.result = calculation.get_result()
+        db_session.add(calculation)
+    db_session.commit()
+    path = import_dir / "export.csv"
+    path.write_bytes(b"".join(stream_export(test_engine, export_query(test_user.id), get_encoder("csv"))))
+
+    other = seed_users[0]
+    job = _run(db_session, other, path, "csv")
+
+    assert job.rows_imported == 3
+    assert sorted(c.result for c in _stored(db_session, other)) == [3, 7, 11]
+
+
+@pytest.mark.parametrize("seed_users", [1], indirect=True)
+def test_missing_csv_columns_fail_the_job(db_session, seed_users, import_dir):
+    path = import_dir / "bad.csv"
+    path.write_text("kind,values\naddition,1\n")
+
+    job = _run(db_session, seed_users[0], path, "csv")
+
+    assert job.status == "failed"
+    assert "type" in job.error
+
+
+@pytest.mark.parametrize("filename, content_type, expected", [
+    ("data.csv", None, "csv"),
+    ("data.JSONL", None, "ndjson"),
+    ("upload", "application/x-ndjson", "ndjson"),
+    (None, "text/csv; charset=utf-8", "csv"),
+])
+def test_detect_format(filename, content_type, expected):
+    assert detect_format(filename, content_type) == expected
+
+
+def test_detect_format_unknown():
+    with pytest.raises(ValueError):
+        detect_format("data.xlsx", "application/octet-stream")
+
+
+def test_iter_records_is_incremental(tmp_path):
+    """Test that records are produced lazily while the file is read."""
+    path = tmp_path / "data.ndjson"
+    path.write_text("\n".join(json.dumps({"type": "addition", "inputs": [i, 1]}) for i in range(3)))
+    with open(path) as text:
+        records = iter_records(text, "ndjson")
+        assert next(records) == (1, {"type": "addition", "inputs": [0, 1]}, None)
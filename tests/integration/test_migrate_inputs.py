@@ -0,0 +1,125 @@
+# tests/integration/test_migrate_inputs.py
+
+import uuid
+
+import pytest
+from sqlalchemy import Column, MetaData, Table, select, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.config import settings
+from app.jobs.migrate_inputs import current_storage, migrate_inputs
+from app.models.calculation import Calculation
+from app.models.types import FloatList
+from tests.conftest import test_engine
+
+TABLE_NAME = "inputs_migration_test"
+
+ROWS = [
+    [1.0, 2.0, 3.0],
+    [0.1, -2.5],
+    [1e300, 5e-324, -0.0],
+]
+
+
+@pytest.fixture
+def migration_table():
+    """A small JSON-inputs table shaped like calculations, dropped afterwards."""
+    metadata = MetaData()
+    table = Table(
+        TABLE_NAME,
+        metadata,
+        Column("id", UUID(as_uuid=True), primary_key=True),
+        Column("inputs", FloatList("json"), nullable=False),
+    )
+    metadata.create_all(test_engine)
+    ids = [uuid.uuid4() for _ in ROWS]
+    with test_engine.begin() as connection:
+        connection.execute(table.insert(), [{"id": i, "inputs": inputs} for i, inputs in zip(ids, ROWS)])
+    yield ids
+    metadata.drop_all(test_engine)
+
+
+def _read_inputs(ids, storage):
+    """Read the inputs back, decoded as the given storage mode."""
+    table = Table(
+        TABLE_NAME,
+        MetaData(),
+        Column("id", UUID(as_uuid=True), primary_key=True),
+        Column("inputs", FloatList(storage)),
+    )
+    with test_engine.connect() as connection:
+        assert current_storage(connection, TABLE_NAME) == storage
+        stored = dict(connection.execute(select(table.c.id, table.c.inputs)).all())
+    return [list(stored[i]) for i in ids]
+
+
+@pytest.mark.parametrize("path", [
+    ["array", "binary", "json"],
+    ["binary", "array", "json"],
+])
+def test_migrate_between_storage_modes(migration_table, path):
+    """Every conversion keeps the values and their order exactly"""
+    for target in path:
+        stats = migrate_inputs(target, engine=test_engine, table_name=TABLE_NAME, chunk_size=2)
+
+        assert stats.target == target
+        assert stats.rows_converted == len(ROWS)
+        assert stats.chunks == 2
+        assert _read_inputs(migration_table, target) == ROWS
+
+    with test_engine.connect() as connection:
+        columns = connection.execute(text(
+            "SELECT column_name FROM information_schema.columns WHERE table_name = :table"
+        ), {"table": TABLE_NAME}).scalars().all()
+    assert sorted(columns) == ["id", "inputs"]
+
+
+def test_migrate_to_current_mode_is_a_no_op(migration_table):
+    stats = migrate_inputs("json", engine=test_engine, table_name=TABLE_NAME)
+
+    assert stats.rows_converted == 0
+    assert _read_inputs(migration_table, "json") == ROWS
+
+
+def test_rows_updated_during_backfill_are_converted_again(migration_table, monkeypatch):
+    """The trigger clears inputs_new on concurrent updates, so the swap reconverts them"""
+    from app.jobs import migrate_inputs as job
+    original = job._convert_chunk_sql
+    calls = []
+
+    def convert_chunk_with_concurrent_write(*args, **kwargs):
+        if len(calls) == 1:
+            # The app changes every row after the first chunk was committed
+            with test_engine.begin() as connection:
+                connection.execute(text(f"UPDATE {TABLE_NAME} SET inputs = '[7.0, 8.0]'::json"))
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(job, "_convert_chunk_sql", convert_chunk_with_concurrent_write)
+    migrate_inputs("array", engine=test_engine, table_name=TABLE_NAME, chunk_size=2)
+
+    assert _read_inputs(migration_table, "array") == [[7.0, 8.0]] * len(ROWS)
+
+
+def test_backfill_pages_by_primary_key(migration_table, monkeypatch):
+    """Each chunk starts after the last id of the previous one, the swap from the first id"""
+    from app.jobs import migrate_inputs as job
+    original = job._convert_chunk_sql
+    starts = []
+
+    def record_start(*args):
+        starts.append(args[-1])
+        return original(*args)
+
+    monkeypatch.setattr(job, "_convert_chunk_sql", record_start)
+    migrate_inputs("array", engine=test_engine, table_name=TABLE_NAME, chunk_size=2)
+
+    ids = sorted(migration_table)
+    assert starts == [uuid.UUID(int=0), ids[1], ids[2], uuid.UUID(int=0)]
+
+
+def test_models_use_configured_storage():
+    """The mapped column type and the created table follow CALCULATION_INPUTS_STORAGE"""
+    assert Calculation.__table__.c.inputs.type.storage == settings.CALCULATION_INPUTS_STORAGE
+    with test_engine.connect() as connection:
+        assert current_storage(connection) == settings.CALCULATION_INPUTS_STORAGE
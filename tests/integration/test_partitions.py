@@ -0,0 +1,127 @@
+# tests/integration/test_partitions.py
+"""
+Integration tests for the monthly partitions of the calculations table.
+
+The partition tests only run when the suite runs with
+CALCULATIONS_PARTITIONED=true, since the setting decides how the table is
+created.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.database import engine
+from app.jobs.partition_maintenance import maintain_partitions
+from app.models import partitions
+from app.models.calculation import Calculation
+from app.models.calculation_reads import page_query
+from app.models.collection_version import CalculationCollectionVersion
+
+partitioned_only = pytest.mark.skipif(
+    not settings.CALCULATIONS_PARTITIONED, reason="requires CALCULATIONS_PARTITIONED=true"
+)
+
+
+def add_calculation(db_session, user, created_at):
+    calc = Calculation.create("addition", user.id, [1, 2])
+    calc.result = calc.get_result()
+    calc.created_at = created_at
+    db_session.add(calc)
+    db_session.commit()
+    return calc.id
+
+
+def partition_of(db_session, calc_id):
+    return db_session.execute(
+        text("SELECT tableoid::regclass::text FROM calculations WHERE id = :id"), {"id": calc_id}
+    ).scalar()
+
+
+def test_month_helpers():
+    assert partitions.month_start(datetime(2025, 3, 17, 12, 30)) == datetime(2025, 3, 1)
+    assert partitions.add_months(datetime(2025, 11, 5), 3) == datetime(2026, 2, 1)
+    assert partitions.add_months(datetime(2025, 1, 31), -1) == datetime(2024, 12, 1)
+    assert partitions.partition_name(datetime(2025, 3, 1)) == "calculations_p2025_03"
+
+
+@pytest.mark.skipif(settings.CALCULATIONS_PARTITIONED, reason="requires an unpartitioned table")
+def test_maintenance_is_a_no_op_without_partitioning():
+    stats = maintain_partitions(engine, retention_months=1)
+    assert stats.created == [] and stats.dropped == []
+
+
+@partitioned_only
+def test_table_is_created_with_upcoming_partitions():
+    with engine.connect() as connection:
+        names = [partition.name for partition in partitions.list_partitions(connection)]
+    current = partitions.month_start(datetime.utcnow())
+    for offset in range(settings.CALCULATIONS_PARTITION_MONTHS_AHEAD + 1):
+        assert partitions.partition_name(partitions.add_months(current, offset)) in names
+    assert names[-1] == partitions.DEFAULT_PARTITION
+
+
+@partitioned_only
+def test_new_partition_takes_over_rows_from_the_default_partition(db_session, test_user):
+    calc_id = add_calculation(db_session, test_user, datetime(2021, 5, 9))
+    assert partition_of(db_session, calc_id) == partitions.DEFAULT_PARTITION
+    db_session.commit()
+
+    with engine.begin() as connection:
+        created = partitions.ensure_partitions(connection, now=datetime(2021, 5, 20), months_ahead=1)
+
+    assert created == ["calculations_p2021_05", "calculations_p2021_06"]
+    assert partition_of(db_session, calc_id) == "calculations_p2021_05"
+    assert db_session.get(Calculation, calc_id).result == 3
+
+
+@partitioned_only
+def test_retention_drops_whole_partitions(db_session, test_user):
+    user_id = test_user.id
+    with engine.begin() as connection:
+        partitions.ensure_partitions(connection, now=datetime(2020, 1, 1), months_ahead=1)
+    old = add_calculation(db_session, test_user, datetime(2020, 1, 15))
+    kept = add_calculation(db_session, test_user, datetime(2020, 2, 15))
+    straggler = add_calculation(db_session, test_user, datetime(2019, 6, 1))
+    version = CalculationCollectionVersion.current(db_session, user_id)
+    db_session.commit()
+
+    stats = maintain_partitions(engine, now=datetime(2020, 3, 10), months_ahead=0, retention_months=1)
+
+    assert stats.dropped == ["calculations_p2020_01"]
+    remaining = {row.id for row in db_session.execute(page_query(user_id, 10)).all()}
+    assert kept in remaining and old not in remaining and straggler not in remaining
+    assert CalculationCollectionVersion.current(db_session, user_id) > version
+
+
+@partitioned_only
+def test_pages_after_a_cursor_skip_newer_partitions(db_session, test_user):
+    with engine.begin() as connection:
+        partitions.ensure_partitions(connection, now=datetime(2022, 1, 1), months_ahead=2)
+    cursor = (datetime(2022, 1, 20), test_user.id)
+
+    query = page_query(test_user.id, 10, after=cursor).compile(engine, compile_kwargs={"literal_binds": True})
+    plan = "\n".join(db_session.execute(text(f"EXPLAIN {query}")).scalars())
+
+    assert "calculations_p2022_01" in plan
+    assert "calculations_p2022_02" not in plan
+    assert "calculations_p2022_03" not in plan
+
+
+@partitioned_only
+def test_concurrent_runs_create_each_partition_once():
+    barrier = threading.Barrier(4)
+
+    def ensure():
+        with engine.begin() as connection:
+            barrier.wait()
+            return partitions.ensure_partitions(connection, now=datetime(2023, 6, 1), months_ahead=1)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        created = list(pool.map(lambda _: ensure(), range(4)))
+
+    assert sorted(name for names in created for name in names) == ["calculations_p2023_06", "calculations_p2023_07"]
@@ -0,0 +1,85 @@
+# tests/integration/test_password_pool.py
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.auth import password_pool
+from app.core.metrics import metrics
+from app.database import SyncSessionAdapter
+from app.models.user import User
+
+
+@pytest.fixture
+def single_worker_pool(monkeypatch):
+    """Run the password pool with one worker process and tear it down after."""
+    monkeypatch.setattr(password_pool.settings, "PASSWORD_HASH_WORKERS", 1)
+    password_pool.shutdown()
+    metrics.reset()
+    yield
+    password_pool.shutdown()
+
+
+def test_hash_and_verify_round_trip(single_worker_pool):
+    """Hashes produced on the pool verify with the model and vice versa"""
+    hashed = asyncio.run(password_pool.hash_password("TestPass123"))
+
+    assert hashed != "TestPass123"
+    assert asyncio.run(password_pool.verify_password("TestPass123", hashed)) is True
+    assert asyncio.run(password_pool.verify_password("WrongPass123", hashed)) is False
+    assert asyncio.run(password_pool.verify_password("TestPass123", User.hash_password("TestPass123"))) is True
+
+
+def test_timings_are_recorded(single_worker_pool):
+    """Queue wait and hash time are observed once per operation"""
+    asyncio.run(password_pool.hash_password("TestPass123"))
+
+    timers = metrics.snapshot()["timers"]
+    assert timers["password_hash.queue_wait"]["count"] == 1
+    assert timers["password_hash.hash_time"]["count"] == 1
+    assert timers["password_hash.hash_time"]["total"] > 0
+    assert password_pool.in_flight() == 0
+
+
+def test_full_queue_is_rejected_with_503(single_worker_pool, monkeypatch):
+    """Beyond PASSWORD_HASH_MAX_QUEUE callers get a 503 with Retry-After"""
+    monkeypatch.setattr(password_pool.settings, "PASSWORD_HASH_MAX_QUEUE", 0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(password_pool.hash_password("TestPass123"))
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == "1"
+    assert metrics.snapshot()["counters"]["password_hash.rejected"] == 1
+    assert password_pool.in_flight() == 0
+
+
+def test_pool_disabled_uses_threadpool(monkeypatch):
+    """PASSWORD_HASH_WORKERS=0 hashes without starting any process"""
+    monkeypatch.setattr(password_pool.settings, "PASSWORD_HASH_WORKERS", 0)
+    password_pool.shutdown()
+
+    hashed = asyncio.run(password_pool.hash_password("TestPass123"))
+
+    assert password_pool._executor is None
+    assert User.verify_password(User(password=hashed), "TestPass123") is True
+
+
+def test_authenticate_async(db_session, fake_user_data, monkeypatch):
+    """authenticate_async matches authenticate() for good and bad passwords"""
+    monkeypatch.setattr(password_pool.settings, "PASSWORD_HASH_WORKERS", 0)
+    password_pool.shutdown()
+    fake_user_data["password"] = "TestPass123"
+    user = User.register(db_session, fake_user_data)
+    db_session.commit()
+
+    db = SyncSessionAdapter(db_session)
+
+    result = asyncio.run(User.authenticate_async(db, user.username, "TestPass123"))
+    assert result["user"].id == user.id
+    assert result["access_token"]
+    assert result["user"].last_login is not None
+
+    assert asyncio.run(User.authenticate_async(db, user.email, "WrongPass123")) is None
+    assert asyncio.run(User.authenticate_async(db, "nobody", "TestPass123")) is None
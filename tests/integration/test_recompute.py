@@ -0,0 +1,107 @@
+# tests/integration/test_recompute.py
+
+import pytest
+
+from app.jobs.recompute import read_checkpoint, recompute_results
+from app.models.calculation import Calculation
+from app.models.collection_version import CalculationCollectionVersion
+from tests.conftest import test_engine
+
+
+def _seed(db_session, user, rows):
+    """Store calculations with deliberately wrong results."""
+    calculations = []
+    for calculation_type, inputs in rows:
+        calculation = Calculation.create(calculation_type, user.id, inputs)
+        calculation.result = -12345.0
+        calculations.append(calculation)
+    db_session.add_all(calculations)
+    db_session.commit()
+    return calculations
+
+
+def test_recompute_fixes_stored_results(db_session, test_user, tmp_path):
+    """
+    Test that the job recomputes every stored result, one chunk at a time,
+    and records the last processed id as its checkpoint.
+    """
+    calculations = _seed(db_session, test_user, [
+        ("addition", [1, 2, 3]),
+        ("subtraction", [10, 3, 2]),
+        ("multiplication", [2, 3, 4]),
+        ("division", [100, 2, 5]),
+        ("exponentiation", [2, 3]),
+        ("root", [81, 4]),
+    ])
+    checkpoint = tmp_path / "recompute.ckpt"
+
+    stats = recompute_results(test_engine, chunk_size=2, checkpoint=str(checkpoint))
+
+    assert stats.rows_updated >= len(calculations)
+    assert stats.rows_failed == 0
+    assert read_checkpoint(str(checkpoint)) == stats.last_id
+    for calculation in calculations:
+        db_session.refresh(calculation)
+    assert [c.result for c in calculations] == [6, 5, 24, 10, 8, 3]
+    # The owner's list ETag changes with the results
+    assert CalculationCollectionVersion.current(db_session, test_user.id) >= 1
+
+
+def test_recompute_dry_run_and_type_filter(db_session, test_user):
+    """Test that a dry run evaluates rows without writing anything back."""
+    (division,) = _seed(db_session, test_user, [("division", [9, 3])])
+
+    stats = recompute_results(test_engine, calculation_types=["division"], dry_run=True)
+
+    assert stats.rows_read >= 1
+    assert stats.rows_updated == 0
+    db_session.refresh(division)
+    assert division.result == -12345.0
+
+
+def test_recompute_resumes_after_checkpoint(db_session, test_user):
+    """Test that rows at or before the `after` id are skipped."""
+    calculations = _seed(db_session, test_user, [("addition", [1, 1]), ("addition", [2, 2])])
+    first, second = sorted(calculations, key=lambda c: c.id)
+
+    recompute_results(test_engine, after=first.id)
+
+    db_session.refresh(first)
+    db_session.refresh(second)
+    assert first.result == -12345.0
+    assert second.result == sum(second.inputs)
+
+
+def test_recompute_without_changes_writes_nothing(db_session, test_user):
+    """
+    Test that a run with unchanged operations rewrites no row: stored
+    results are exactly what get_result() gives, including power folds
+    that round differently when vectorized.
+    """
+    rows = [
+        ("exponentiation", [2, 0.5, 2]),
+        ("exponentiation", [1.1, 3, 7]),
+        ("root", [1.1, 3, 7]),
+        ("addition", [0.1, 0.2, 0.3]),
+        ("division", [1, 3, 7]),
+    ]
+    calculations = []
+    for calculation_type, inputs in rows:
+        calculation = Calculation.create(calculation_type, test_user.id, inputs)
+        calculation.result = calculation.get_result()
+        calculations.append(calculation)
+    db_session.add_all(calculations)
+    db_session.commit()
+    # Bring every other stored row up to date first
+    recompute_results(test_engine)
+    version = CalculationCollectionVersion.current(db_session, test_user.id)
+    updated_at = [c.updated_at for c in calculations]
+
+    stats = recompute_results(test_engine, chunk_size=2)
+
+    assert stats.rows_read >= len(rows)
+    assert stats.rows_updated == 0
+    for calculation in calculations:
+        db_session.refresh(calculation)
+    assert [c.updated_at for c in calculations] == updated_at
+    assert CalculationCollectionVersion.current(db_session, test_user.id) == version
@@ -0,0 +1,68 @@
+# tests/integration/test_response_cache.py
+"""
+Integration tests for the Redis tier of ResponseCache, against an embedded
+Redis server from the redislite package.
+"""
+
+import asyncio
+
+import pytest
+
+from app.auth import redis as redis_client
+from app.core.metrics import metrics
+from app.core.response_cache import ResponseCache
+
+redislite = pytest.importorskip("redislite")
+
+
+@pytest.fixture(scope="module")
+def redis_server(tmp_path_factory):
+    server = redislite.Redis(str(tmp_path_factory.mktemp("redis") / "redis.db"))
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def run(redis_server):
+    """Run a coroutine function against an empty Redis server."""
+    redis_server.flushall()
+    metrics.reset()
+
+    def runner(coro_fn, url=f"unix://{redis_server.socket_file}"):
+        async def wrapper():
+            redis_client.init_redis(url)
+            try:
+                return await coro_fn()
+            finally:
+                await redis_client.close_redis()
+        return asyncio.run(wrapper())
+    return runner
+
+
+def make_cache():
+    return ResponseCache("pages", ttl=60, max_entries=100, max_bytes=10000, max_entry_bytes=1000, use_redis=True)
+
+
+def test_pages_are_shared_through_redis(redis_server, run):
+    """Test that a page cached by one worker is served to another."""
+    writer = make_cache()
+    run(lambda: writer.set("user:1:v3", b'[{"result": 4.0}]', {"Link": "<next>"}))
+    assert redis_server.ttl("response:pages:user:1:v3") > 0
+
+    # Another process: empty local tier, same Redis
+    reader = make_cache()
+    assert run(lambda: reader.get("user:1:v3")) == (b'[{"result": 4.0}]', {"Link": "<next>"})
+    assert reader.hits == 1
+
+
+def test_redis_errors_fall_back_to_local(run, monkeypatch):
+    """Test that an unreachable Redis still leaves the in-process tier working."""
+    monkeypatch.setattr(redis_client.settings, "REDIS_RETRY_ATTEMPTS", 0)
+    cache = make_cache()
+
+    async def scenario():
+        await cache.set("key", b"[]")
+        return await cache.get("key")
+
+    assert run(scenario, url="unix:///nonexistent/redis.sock") == (b"[]", {})
+    assert metrics.snapshot()["counters"]["response_cache.pages.redis.errors"] == 1
@@ -0,0 +1,84 @@
+# tests/integration/test_result_cache.py
+"""
+Integration tests for the Redis tier of the result cache, against an
+embedded Redis server from the redislite package.
+"""
+
+import asyncio
+
+import pytest
+
+from app.auth import redis as redis_client
+from app.core.metrics import metrics
+from app.operations import result_cache
+
+redislite = pytest.importorskip("redislite")
+
+
+@pytest.fixture(scope="module")
+def redis_server(tmp_path_factory):
+    server = redislite.Redis(str(tmp_path_factory.mktemp("redis") / "redis.db"))
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def run(redis_server, monkeypatch):
+    """Run a coroutine function with the Redis tier on, against an empty server."""
+    redis_server.flushall()
+    result_cache.clear()
+    metrics.reset()
+    monkeypatch.setattr(result_cache.settings, "RESULT_CACHE_REDIS", True)
+    result_cache.redis_backoff.reset()
+
+    def runner(coro_fn, url=f"unix://{redis_server.socket_file}"):
+        async def wrapper():
+            redis_client.init_redis(url)
+            try:
+                return await coro_fn()
+            finally:
+                await redis_client.close_redis()
+        return asyncio.run(wrapper())
+    yield runner
+    result_cache.clear()
+    result_cache.redis_backoff.reset()
+
+
+def test_results_are_shared_through_redis(redis_server, run):
+    """Test that a result computed by one worker is found by another."""
+    run(lambda: result_cache.evaluate_async("root", [81, 2]))
+    key = result_cache.result_key("root", [81, 2])
+    assert float(redis_server.get(key)) == 9.0
+    assert redis_server.ttl(key) > 0
+
+    # Another process: empty local tier, same Redis
+    result_cache.clear()
+    redis_server.set(key, "9.5")  # prove the value comes from Redis
+    assert run(lambda: result_cache.evaluate_async("root", [81, 2])) == 9.5
+    assert metrics.snapshot()["counters"]["result_cache.redis.hits"] == 1
+
+
+def test_batch_reads_and_writes_through_redis(redis_server, run):
+    redis_server.set(result_cache.result_key("addition", [1, 1]), "2.0")
+
+    results, errors = run(lambda: result_cache.evaluate_many_async("addition", [[1, 1], [2, 2], [3, 3]]))
+
+    assert results == [2, 4, 6]
+    assert errors == {}
+    assert float(redis_server.get(result_cache.result_key("addition", [3, 3]))) == 6.0
+    counters = metrics.snapshot()["counters"]
+    assert counters["result_cache.redis.hits"] == 1
+    assert counters["result_cache.redis.misses"] == 2
+
+
+def test_redis_errors_fall_back_to_local(run, monkeypatch):
+    """Test that an unreachable Redis does not fail calculations and is skipped afterwards."""
+    monkeypatch.setattr(redis_client.settings, "REDIS_RETRY_ATTEMPTS", 0)
+
+    async def scenario():
+        first = await result_cache.evaluate_async("multiplication", [3, 4])
+        second = await result_cache.evaluate_async("multiplication", [5, 6])
+        return first, second
+
+    assert run(scenario, url="unix:///nonexistent/redis.sock") == (12, 30)
+    assert metrics.snapshot()["counters"]["result_cache.redis.errors"] == 1
@@ -0,0 +1,184 @@
+# tests/integration/test_token_blacklist.py
+"""
+Integration tests for the Redis token blacklist and its local Bloom filter.
+
+These run against an embedded Redis server from the redislite package and
+are skipped when it is not installed.
+"""
+
+import asyncio
+
+import pytest
+import redis.asyncio as redis
+
+from app.auth import redis as blacklist
+from app.core.metrics import metrics
+
+redislite = pytest.importorskip("redislite")
+
+
+@pytest.fixture(scope="module")
+def redis_server(tmp_path_factory):
+    server = redislite.Redis(str(tmp_path_factory.mktemp("redis") / "redis.db"))
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def use_redis(redis_server, monkeypatch):
+    """Point the shared pool at an empty embedded server and use a fresh filter."""
+    redis_server.flushall()
+    monkeypatch.setattr(blacklist, "blacklist_filter", blacklist.BlacklistFilter())
+    metrics.reset()
+    return redis_server
+
+
+@pytest.fixture
+def run(use_redis):
+    """Run a coroutine function against a fresh pool on a new event loop."""
+    def runner(coro_fn):
+        async def wrapper():
+            blacklist.init_redis(f"unix://{use_redis.socket_file}")
+            try:
+                return await coro_fn()
+            finally:
+                await blacklist.close_redis()
+        return asyncio.run(wrapper())
+    return runner
+
+
+@pytest.fixture
+def pipeline_calls(monkeypatch):
+    """Count pipeline round trips."""
+    calls = []
+    original = redis.client.Pipeline.execute
+
+    async def execute(self, *args, **kwargs):
+        calls.append(len(self.command_stack))
+        return await original(self, *args, **kwargs)
+
+    monkeypatch.setattr(redis.client.Pipeline, "execute", execute)
+    return calls
+
+
+def test_checks_go_to_redis_until_synced(use_redis, run):
+    use_redis.set("blacklist:revoked-jti", "1")
+
+    async def scenario():
+        assert await blacklist.is_blacklisted("revoked-jti") is True
+        assert await blacklist.is_blacklisted("valid-jti") is False
+
+    run(scenario)
+    assert not blacklist.blacklist_filter.ready
+    assert "blacklist_filter.negative" not in metrics.snapshot()["counters"]
+
+
+def test_synced_filter_answers_valid_tokens_locally(use_redis, run):
+    use_redis.set("blacklist:revoked-jti", "1")
+
+    async def scenario():
+        assert await blacklist.blacklist_filter.sync(await blacklist.get_redis()) == 1
+        assert await blacklist.is_blacklisted("revoked-jti") is True
+        for i in range(100):
+            assert await blacklist.is_blacklisted(f"valid-{i}") is False
+
+    run(scenario)
+    counters = metrics.snapshot()["counters"]
+    assert counters["blacklist_filter.positive"] == 1
+    assert counters["blacklist_filter.negative"] + counters.get("blacklist_filter.false_positive", 0) == 100
+    assert counters["blacklist_filter.negative"] >= 95
+
+
+def test_add_to_blacklist_updates_redis_and_filter(use_redis, run):
+    async def scenario():
+        await blacklist.blacklist_filter.sync(await blacklist.get_redis())
+        assert await blacklist.is_blacklisted("new-jti") is False
+        await blacklist.add_to_blacklist("new-jti", 60)
+        assert await blacklist.is_blacklisted("new-jti") is True
+
+    run(scenario)
+    assert use_redis.ttl("blacklist:new-jti") > 0
+
+
+def test_revocations_from_other_processes_arrive_by_pubsub(use_redis, run):
+    async def scenario():
+        blacklist.blacklist_filter.start()
+        for _ in range(100):
+            if blacklist.blacklist_filter.ready:
+                break
+            await asyncio.sleep(0.05)
+        assert blacklist.blacklist_filter.ready
+
+        # Another process revokes a token: key + publish, without touching our filter
+        other = await blacklist.get_redis()
+        await other.set("blacklist:remote-jti", "1", ex=60)
+        await other.publish(blacklist.BLACKLIST_CHANNEL, "remote-jti")
+        for _ in range(100):
+            if blacklist.blacklist_filter.might_contain("remote-jti"):
+                break
+            await asyncio.sleep(0.05)
+
+        assert await blacklist.is_blacklisted("remote-jti") is True
+        await blacklist.blacklist_filter.stop()
+
+    run(scenario)
+
+
+def test_filter_metrics_are_reported(use_redis, run):
+    async def scenario():
+        await blacklist.blacklist_filter.sync(await blacklist.get_redis())
+
+    run(scenario)
+    snapshot = metrics.snapshot()
+    assert snapshot["gauges"]["blacklist_filter.ready"] == 1
+    assert snapshot["gauges"]["blacklist_filter.memory_bytes"] > 0
+    assert snapshot["timers"]["blacklist_filter.sync_time"]["count"] == 1
+
+
+def test_add_many_to_blacklist_is_one_round_trip(use_redis, run, pipeline_calls):
+    async def scenario():
+        await blacklist.blacklist_filter.sync(await blacklist.get_redis())
+        await blacklist.add_many_to_blacklist([(f"session-{i}", 60) for i in range(20)])
+
+    run(scenario)
+    assert pipeline_calls == [40]  # one SET + one PUBLISH per token
+    assert all(use_redis.ttl(f"blacklist:session-{i}") > 0 for i in range(20))
+    assert all(blacklist.blacklist_filter.might_contain(f"session-{i}") for i in range(20))
+
+
+def test_are_blacklisted_only_asks_redis_about_filter_hits(use_redis, run, pipeline_calls):
+    use_redis.set("blacklist:revoked-1", "1")
+    use_redis.set("blacklist:revoked-2", "1")
+    jtis = ["valid-1", "revoked-1", "valid-2", "revoked-2"]
+
+    async def scenario():
+        await blacklist.blacklist_filter.sync(await blacklist.get_redis())
+        return await blacklist.are_blacklisted(jtis)
+
+    assert run(scenario) == [False, True, False, True]
+    assert len(pipeline_calls) == 1
+    assert pipeline_calls[0] < len(jtis)
+
+
+def test_are_blacklisted_without_filter_is_one_round_trip(use_redis, run, pipeline_calls):
+    use_redis.set("blacklist:revoked-1", "1")
+
+    async def scenario():
+        return await blacklist.are_blacklisted(["valid-1", "revoked-1", "valid-2"])
+
+    assert run(scenario) == [False, True, False]
+    assert pipeline_calls == [3]
+
+
+def test_pool_is_configured_from_settings(use_redis, run):
+    async def scenario():
+        client = await blacklist.get_redis()
+        await client.ping()
+        pool = client.connection_pool
+        assert isinstance(pool, redis.BlockingConnectionPool)
+        assert pool.max_connections == blacklist.settings.REDIS_MAX_CONNECTIONS
+        assert pool.connection_kwargs["socket_timeout"] == blacklist.settings.REDIS_SOCKET_TIMEOUT
+        assert metrics.snapshot()["gauges"]["redis.pool.max_connections"] == pool.max_connections
+
+    run(scenario)
+    assert blacklist._client is None
@@ -0,0 +1,123 @@
+# tests/integration/test_write_round_trips.py
+"""
+Query-count tests for the write endpoints: each write is a single SQL
+statement (RETURNING replaces the refresh SELECT). Registration also looks
+up the username and email first, so a rejected one costs no password hash.
+
+The route functions are called directly on a SyncSessionAdapter, and every
+statement sent on the sync engine is recorded.
+"""
+
+import asyncio
+import json
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+
+from app import main
+from app.auth import password_pool
+from app.database import SessionLocal, SyncSessionAdapter, engine
+from app.schemas.calculation import CalculationBase, CalculationUpdate
+from app.schemas.user import UserCreate
+
+
+@pytest.fixture
+def statements():
+    """SQL statements executed on the sync engine while the test runs."""
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine function with a fresh session adapter."""
+    def runner(coro_fn):
+        async def wrapper():
+            db = SyncSessionAdapter(SessionLocal())
+            try:
+                return await coro_fn(db)
+            finally:
+                await db.close()
+        return asyncio.run(wrapper())
+    return runner
+
+
+def test_register_checks_before_hashing(run, statements, monkeypatch):
+    hashed = []
+
+    async def fake_hash(password):
+        hashed.append(password)
+        return "hashed-" + password
+    monkeypatch.setattr(password_pool, "hash_password", fake_hash)
+    suffix = uuid4().hex[:10]
+    user_create = UserCreate(
+        first_name="One",
+        last_name="Trip",
+        email=f"one.trip.{suffix}@example.com",
+        username=f"one_trip_{suffix}",
+        password="SecurePass123!",
+        confirm_password="SecurePass123!",
+    )
+
+    user = run(lambda db: main.register(user_create, db=db))
+
+    # An index lookup for duplicates, then the INSERT ... RETURNING
+    assert len(statements) == 2
+    assert statements[0].lstrip().startswith("SELECT EXISTS")
+    assert statements[1].lstrip().startswith("INSERT INTO users")
+    assert hashed == ["SecurePass123!"]
+    assert user.username == f"one_trip_{suffix}"
+    assert user.created_at is not None
+
+    # A duplicate is rejected by the lookup, without hashing its password
+    statements.clear()
+    with pytest.raises(main.HTTPException) as excinfo:
+        run(lambda db: main.register(user_create, db=db))
+    assert excinfo.value.status_code == 400
+    assert len(statements) == 1
+    assert hashed == ["SecurePass123!"]
+
+
+def test_create_and_update_are_one_statement_each(test_user, run, statements):
+    created = run(lambda db: main.create_calculation(
+        CalculationBase(type="addition", inputs=[1, 2]), current_user=test_user, db=db
+    ))
+    body = json.loads(created.body)
+
+    assert created.status_code == 201
+    assert body["result"] == 3
+    assert len(statements) == 1
+    assert "INSERT INTO calculation_collection_versions" in statements[0]
+    assert "RETURNING" in statements[0]
+
+    statements.clear()
+    updated = run(lambda db: main.update_calculation(
+        body["id"], CalculationUpdate(inputs=[5, 5]), if_match_header=None, current_user=test_user, db=db
+    ))
+
+    assert json.loads(updated.body)["result"] == 10
+    assert updated.headers["ETag"]
+    # Ownership check, version bump and RETURNING in one UPDATE statement;
+    # the result of the stored type is picked by a CASE, without a SELECT
+    assert len(statements) == 1
+    assert "UPDATE calculations" in statements[0]
+    assert "FOR UPDATE" not in statements[0]
+
+
+def test_delete_is_one_statement(test_user, run, statements):
+    created = json.loads(run(lambda db: main.create_calculation(
+        CalculationBase(type="addition", inputs=[1, 2]), current_user=test_user, db=db
+    )).body)
+
+    statements.clear()
+    run(lambda db: main.delete_calculation(created["id"], current_user=test_user, db=db))
+
+    assert len(statements) == 1
+    assert "DELETE FROM calculations" in statements[0]
@@ -0,0 +1,51 @@
+# tests/unit/test_bloom.py
+"""
+Unit tests for the Bloom filter in app/core/bloom.py.
+"""
+
+import pytest
+
+from app.core.bloom import BloomFilter
+
+
+def test_added_items_are_always_found():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"jti-{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    assert len(bloom) == 1000
+
+
+def test_empty_filter_contains_nothing():
+    bloom = BloomFilter(capacity=100, error_rate=0.01)
+
+    assert "anything" not in bloom
+    assert bloom.estimated_error_rate == 0.0
+
+
+def test_false_positive_rate_is_near_target():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"revoked-{i}")
+
+    false_positives = sum(f"valid-{i}" in bloom for i in range(20_000))
+
+    assert false_positives / 20_000 < 0.02
+    assert bloom.estimated_error_rate == pytest.approx(0.01, rel=0.2)
+
+
+def test_sizing_follows_capacity_and_error_rate():
+    bloom = BloomFilter(capacity=100_000, error_rate=0.001)
+
+    # ~14.4 bits and 10 hashes per item for p = 0.1%
+    assert bloom.num_bits == pytest.approx(1_437_759, rel=0.001)
+    assert bloom.num_hashes == 10
+    assert bloom.memory_bytes == (bloom.num_bits + 7) // 8
+
+
+@pytest.mark.parametrize("capacity, error_rate", [(0, 0.01), (100, 0), (100, 1)])
+def test_invalid_parameters(capacity, error_rate):
+    with pytest.raises(ValueError):
+        BloomFilter(capacity=capacity, error_rate=error_rate)
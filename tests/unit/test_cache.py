@@ -0,0 +1,113 @@
+# tests/unit/test_cache.py
+"""
+Unit tests for the in-process LRU/TTL cache in app/core/cache.py.
+"""
+
+from app.core.cache import TTLCache
+from app.core.metrics import metrics
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_returns_cached_value():
+    cache = TTLCache("test", max_entries=10, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+    assert cache.get("missing", "default") == "default"
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache("test", max_entries=10, ttl=60, clock=clock)
+    cache.set("default", 1)
+    cache.set("short", 2, ttl=5)
+
+    clock.now = 5
+    assert cache.get("short") is None
+    assert cache.get("default") == 1
+
+    clock.now = 60
+    assert cache.get("default") is None
+    assert len(cache) == 0
+
+
+def test_non_positive_ttl_is_not_stored():
+    cache = TTLCache("test", max_entries=10, ttl=60)
+    cache.set("a", 1, ttl=0)
+    cache.set("b", 1, ttl=-3)
+
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache("test", max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now the least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_zero_max_entries_disables_cache():
+    cache = TTLCache("test", max_entries=0, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+
+
+def test_pop_and_pop_where():
+    cache = TTLCache("test", max_entries=10, ttl=60)
+    for key in range(5):
+        cache.set(key, key)
+
+    assert cache.pop(0) == 0
+    assert cache.pop(0) is None
+    assert cache.pop_where(lambda value: value % 2 == 0) == 2
+    assert sorted(cache._entries) == [1, 3]
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_hits_and_misses_are_counted():
+    metrics.reset()
+    cache = TTLCache("counted", max_entries=1, ttl=60)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    cache.set("b", 2)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["cache.counted.hits"] == 1
+    assert snapshot["counters"]["cache.counted.misses"] == 1
+    assert snapshot["counters"]["cache.counted.evictions"] == 1
+    assert snapshot["gauges"]["cache.counted.size"] == 1
+
+
+def test_max_bytes_evicts_least_recently_used():
+    cache = TTLCache("sized", max_entries=100, ttl=60, max_bytes=10)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    cache.get("a")
+    cache.set("c", b"1234")   # 12 bytes: "b" is evicted
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234" and cache.get("c") == b"1234"
+
+    cache.set("big", b"x" * 11)  # larger than the whole cache: not stored
+    assert cache.get("big") is None
+    cache.set("a", b"12")  # replacing an entry releases its old size
+    assert cache._bytes == 6
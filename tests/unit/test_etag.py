@@ -0,0 +1,36 @@
+# tests/unit/test_etag.py
+
+import pytest
+
+from app.core.etag import if_match, if_none_match, make_etag
+
+
+def test_make_etag_is_quoted_and_deterministic():
+    etag = make_etag("a", 1)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag("a", 1)
+    assert etag != make_etag("a", 2)
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ('"abc"', True),
+    ('"other", "abc"', True),
+    ('W/"abc"', True),   # weak comparison
+    ("*", True),
+    ('"other"', False),
+])
+def test_if_none_match(header, expected):
+    assert if_none_match(header, '"abc"') is expected
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, True),        # unconditional write
+    ('"abc"', True),
+    ('"other", "abc"', True),
+    ("*", True),
+    ('W/"abc"', False),  # strong comparison
+    ('"other"', False),
+])
+def test_if_match(header, expected):
+    assert if_match(header, '"abc"') is expected
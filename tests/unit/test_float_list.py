@@ -0,0 +1,68 @@
+# tests/unit/test_float_list.py
+"""
+Unit tests for the FloatList column type in app/models/types.py.
+"""
+
+import struct
+from array import array
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.types import FloatList, pack_floats, unpack_floats
+
+dialect = postgresql.dialect()
+
+
+def test_pack_matches_float8send_layout():
+    """Packed values are big-endian IEEE 754 doubles, like Postgres float8send()"""
+    assert pack_floats([1.5, -2.0]) == struct.pack(">2d", 1.5, -2.0)
+
+
+def test_unpack_round_trip():
+    values = [0.1, -3.25, 1e308, 5e-324]
+    unpacked = unpack_floats(pack_floats(values))
+
+    assert isinstance(unpacked, array)
+    assert unpacked.typecode == "d"
+    assert unpacked.tolist() == values
+
+
+@pytest.mark.parametrize("storage, ddl", [
+    ("json", "JSON"),
+    ("array", "DOUBLE PRECISION[]"),
+    ("binary", "BYTEA"),
+])
+def test_column_type_per_storage_mode(storage, ddl):
+    assert FloatList(storage).compile(dialect=dialect) == ddl
+
+
+def test_binary_bind_and_result():
+    column_type = FloatList("binary")
+
+    stored = column_type.process_bind_param([1.0, 2.0], dialect)
+    assert stored == struct.pack(">2d", 1.0, 2.0)
+    assert column_type.process_result_value(stored, dialect) == array("d", [1.0, 2.0])
+
+
+@pytest.mark.parametrize("storage", ["json", "array"])
+def test_array_values_are_bound_as_lists(storage):
+    column_type = FloatList(storage)
+
+    assert column_type.process_bind_param(array("d", [1.0, 2.0]), dialect) == [1.0, 2.0]
+    assert column_type.process_result_value([1.0, 2.0], dialect) == [1.0, 2.0]
+
+
+def test_unknown_storage_mode():
+    with pytest.raises(ValueError, match="Unknown inputs storage mode"):
+        FloatList("xml")
+
+
+@pytest.mark.parametrize("storage, expected", [
+    ("json", "[1.5, -2.0]"),
+    ("array", "{1.5,-2.0}"),
+    ("binary", "\\x3ff8000000000000c000000000000000"),
+])
+def test_copy_literal(storage, expected):
+    assert FloatList(storage).copy_literal([1.5, -2]) == expected
+    assert FloatList(storage).copy_literal(array("d", [1.5, -2.0])) == expected
@@ -0,0 +1,44 @@
+# tests/unit/test_ids.py
+"""
+Unit tests for primary key generation (app/core/ids.py).
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from app.core import ids
+
+
+def test_uuid7_layout():
+    value = ids.uuid7()
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert abs(ids.uuid7_time(value) - datetime.utcnow()) < timedelta(seconds=5)
+
+
+def test_uuid7_is_strictly_increasing():
+    values = [ids.uuid7() for _ in range(10000)]
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+
+
+def test_uuid7_is_increasing_when_the_clock_goes_back():
+    first = ids.uuid7()
+    with patch.object(ids.time, "time_ns", return_value=0):
+        second = ids.uuid7()
+    assert second > first
+    assert second.version == 7
+
+
+def test_uuid7_time_rejects_other_versions():
+    with pytest.raises(ValueError):
+        ids.uuid7_time(uuid.uuid4())
+
+
+@pytest.mark.parametrize("generator, version", [("uuid4", 4), ("uuid7", 7)])
+def test_new_id_follows_the_setting(monkeypatch, generator, version):
+    monkeypatch.setattr(ids.settings, "ID_GENERATOR", generator)
+    assert ids.new_id().version == version
@@ -0,0 +1,58 @@
+# tests/unit/test_response_cache.py
+"""
+Unit tests for the in-process tier of ResponseCache.
+"""
+
+import asyncio
+
+from app.core.metrics import metrics
+from app.core.response_cache import ResponseCache
+
+
+def make_cache(**overrides):
+    options = dict(ttl=60, max_entries=100, max_bytes=10000, max_entry_bytes=1000, use_redis=False)
+    options.update(overrides)
+    return ResponseCache("test", **options)
+
+
+def test_round_trips_body_and_headers():
+    cache = make_cache()
+
+    async def scenario():
+        missing = await cache.get("user:1")
+        await cache.set("user:1", b'[{"id": 1}]\n', {"X-Next-Cursor": "abc"})
+        return missing, await cache.get("user:1")
+
+    missing, found = asyncio.run(scenario())
+
+    assert missing is None
+    assert found == (b'[{"id": 1}]\n', {"X-Next-Cursor": "abc"})
+
+
+def test_hit_ratio_and_metrics():
+    metrics.reset()
+    cache = make_cache()
+
+    async def scenario():
+        await cache.get("key")
+        await cache.set("key", b"[]")
+        await cache.get("key")
+        await cache.get("key")
+
+    asyncio.run(scenario())
+
+    assert cache.hit_ratio() == 2 / 3
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["response_cache.test.hits"] == 2
+    assert snapshot["counters"]["response_cache.test.misses"] == 1
+    assert snapshot["gauges"]["response_cache.test.hit_ratio"] == 2 / 3
+
+
+def test_large_responses_are_not_cached():
+    cache = make_cache(max_entry_bytes=100)
+
+    async def scenario():
+        await cache.set("big", b"x" * 200)
+        return await cache.get("big")
+
+    assert asyncio.run(scenario()) is None
@@ -0,0 +1,122 @@
+# tests/unit/test_result_cache.py
+
+import pytest
+
+from app.core.metrics import metrics
+from app.models.calculation import Calculation
+from app.operations import result_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    result_cache.clear()
+    metrics.reset()
+    yield
+    result_cache.clear()
+
+
+def test_key_is_content_addressed():
+    assert result_cache.result_key("addition", [1, 2]) == result_cache.result_key("ADDITION", [1.0, 2.0])
+    assert result_cache.result_key("addition", [1, 2]) != result_cache.result_key("addition", [2, 1])
+    assert result_cache.result_key("addition", [1, 2]) != result_cache.result_key("subtraction", [1, 2])
+
+
+def test_evaluate_computes_once(monkeypatch):
+    calls = []
+    original = Calculation.create
+
+    def counting_create(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(Calculation, "create", counting_create)
+
+    assert result_cache.evaluate("exponentiation", [2, 10]) == 1024
+    assert result_cache.evaluate("exponentiation", [2.0, 10.0]) == 1024
+    assert len(calls) == 1
+    counters = metrics.snapshot()["counters"]
+    assert counters["cache.results.hits"] == 1
+    assert counters["cache.results.misses"] == 1
+
+
+def test_errors_are_not_cached():
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            result_cache.evaluate("division", [1, 0])
+    assert len(result_cache.cache) == 0
+
+
+def test_evaluate_many_only_computes_misses(monkeypatch):
+    result_cache.evaluate("addition", [1, 1])
+    seen = []
+    original = Calculation.evaluate_many.__func__
+
+    def spy(cls, calculation_type, inputs_list):
+        seen.append([list(inputs) for inputs in inputs_list])
+        return original(cls, calculation_type, inputs_list)
+
+    monkeypatch.setattr(Calculation, "evaluate_many", classmethod(spy))
+
+    results, errors = result_cache.evaluate_many("addition", [[1, 1], [2, 2], [3, 3]])
+
+    assert results == [2, 4, 6]
+    assert errors == {}
+    assert seen == [[[2, 2], [3, 3]]]
+
+
+def test_evaluate_many_reports_errors_by_index():
+    results, errors = result_cache.evaluate_many("division", [[10, 2], [1, 0]])
+
+    assert results[0] == 5
+    assert results[1] is None
+    assert list(errors) == [1]
+
+
+
+def test_evaluate_rejects_results_that_are_not_real():
+    with pytest.raises(ValueError, match="not a real number"):
+        result_cache.evaluate("root", [-8, 2])
+    with pytest.raises(OverflowError):
+        result_cache.evaluate("exponentiation", [1e200, 2])
+    assert len(result_cache.cache) == 0
+
+
+def test_evaluate_async_offloads_large_misses(monkeypatch):
+    import asyncio
+
+    offloaded = []
+
+    async def spy(fn, *args):
+        offloaded.append(args)
+        return fn(*args)
+
+    monkeypatch.setattr(result_cache, "run_in_threadpool", spy)
+    monkeypatch.setattr(result_cache.settings, "CALCULATION_VECTORIZE_THRESHOLD", 3)
+
+    assert asyncio.run(result_cache.evaluate_async("addition", [1, 2])) == 3
+    assert offloaded == []
+    assert asyncio.run(result_cache.evaluate_async("addition", [1, 2, 3])) == 6
+    assert offloaded == [("addition", [1, 2, 3])]
+    # Hits are answered inline
+    assert asyncio.run(result_cache.evaluate_async("addition", [1, 2, 3])) == 6
+    assert len(offloaded) == 1
+
+
+def test_evaluate_types_async_reports_errors_per_type():
+    import asyncio
+
+    results, errors = asyncio.run(result_cache.evaluate_types_async(
+        ["addition", "division", "exponentiation", "root"], [-8, 0]
+    ))
+    assert results == {"addition": -8, "exponentiation": 1}
+    assert set(errors) == {"division", "root"}
+
+    # Overflows and non-real results are errors of their type, not failures
+    results, errors = asyncio.run(result_cache.evaluate_types_async(["addition", "exponentiation"], [1e200, 2]))
+    assert results == {"addition": 1e200}
+    assert list(errors) == ["exponentiation"]
+    results, errors = asyncio.run(result_cache.evaluate_types_async(["addition", "root"], [-8, 2]))
+    assert results == {"addition": -6}
+    assert errors == {"root": "Result is not a real number."}
+    # Successful results are cached like any other evaluation
+    assert result_cache.cache.get(result_cache.result_key("addition", [-8, 2])) == -6
@@ -0,0 +1,66 @@
+# tests/unit/test_serialization.py
+"""
+Unit tests for the direct JSON serializer of calculations.
+"""
+
+import json
+import uuid
+from array import array
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from app.core import serialization
+from app.schemas.calculation import CalculationResponse
+
+adapter = TypeAdapter(List[CalculationResponse])
+
+
+def make_row(inputs):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        type="addition",
+        inputs=inputs,
+        result=float(sum(inputs)),
+        created_at=datetime(2025, 1, 2, 3, 4, 5, 678901),
+        updated_at=datetime(2025, 1, 2, 3, 4, 5),
+    )
+
+
+def pydantic_json(rows) -> bytes:
+    return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif not serialization.is_available():
+        pytest.skip("orjson is not installed")
+    return request.param
+
+
+def test_matches_calculation_response(backend):
+    rows = [make_row([1.5, 2.0]), make_row(array("d", [0.1, 3.0]))]
+
+    body = serialization.dump_calculations(rows)
+
+    assert json.loads(body) == json.loads(pydantic_json(rows))
+    assert list(json.loads(body)[0]) == list(CalculationResponse.model_fields)
+
+
+def test_single_calculation(backend):
+    row = make_row([4.0, 5.0])
+    assert json.loads(serialization.dump_calculation(row)) == json.loads(pydantic_json([row]))[0]
+
+
+def test_default_response_class(monkeypatch):
+    if serialization.is_available():
+        assert serialization.default_response_class() is ORJSONResponse
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert serialization.default_response_class() is JSONResponse
@@ -0,0 +1,132 @@
+# tests/unit/test_vectorized.py
+
+import random
+import uuid
+
+import pytest
+
+from app.models.calculation import Calculation
+from app.operations import vectorized
+
+pytestmark = pytest.mark.skipif(not vectorized.is_available(), reason="numpy is not installed")
+
+
+def _python_result(calculation_type, inputs, monkeypatch):
+    """Evaluate with the Python loop by disabling the vectorized backend."""
+    monkeypatch.setattr(vectorized.settings, "CALCULATION_VECTORIZE_THRESHOLD", 10**12)
+    return Calculation.create(calculation_type, uuid.uuid4(), inputs).get_result()
+
+
+def _vectorized_result(calculation_type, inputs, monkeypatch):
+    """Evaluate with the NumPy backend by forcing the threshold down."""
+    monkeypatch.setattr(vectorized.settings, "CALCULATION_VECTORIZE_THRESHOLD", 2)
+    return Calculation.create(calculation_type, uuid.uuid4(), inputs).get_result()
+
+
+@pytest.mark.parametrize("calculation_type", ["subtraction", "multiplication", "division"])
+def test_vectorized_matches_python_exactly(calculation_type, monkeypatch):
+    """
+    Test that the NumPy backend gives bit-for-bit the same result as the
+    Python loop for the arithmetic folds.
+    """
+    rng = random.Random(42)
+    inputs = [rng.uniform(0.5, 1.5) for _ in range(5000)]
+
+    expected = _python_result(calculation_type, inputs, monkeypatch)
+    actual = _vectorized_result(calculation_type, inputs, monkeypatch)
+
+    assert actual == expected
+
+
+def test_vectorized_add_matches_sum():
+    """Test that the addition kernel rounds exactly like sum()."""
+    rng = random.Random(7)
+    inputs = [rng.uniform(-1e6, 1e6) for _ in range(5000)]
+    assert vectorized.add(inputs) == sum(inputs)
+
+
+@pytest.mark.parametrize("inputs", [[1e16, 1.0, -1e16], [0.1] * 10, [1e100, 1.0, -1e100, 1e-3]])
+def test_batch_addition_matches_sum(inputs):
+    """
+    Test that batch addition gives exactly sum()'s result. sum() is a plain
+    left fold before Python 3.12 and compensated since, and these inputs
+    round differently under the two.
+    """
+    assert vectorized.add(inputs) == sum(inputs)
+    assert vectorized.evaluate_batch("addition", [inputs, [2.0, 3.0]]) == [sum(inputs), 5.0]
+
+
+@pytest.mark.parametrize(
+    "calculation_type, inputs",
+    [
+        ("exponentiation", [2, 0.5, 2]),
+        ("exponentiation", [1.1, 3, 7]),
+        ("exponentiation", [10, 400, 0.001]),
+        ("root", [64.0, 2.0, 3.0]),
+        ("root", [1.1, 3, 7]),
+    ],
+)
+def test_power_folds_are_sequential(calculation_type, inputs, monkeypatch):
+    """
+    Test that exponentiation and root keep the Python loop, in batches and
+    for large inputs: folding the exponents into one product rounds
+    differently and misses intermediate overflows.
+    """
+    assert vectorized.evaluate_batch(calculation_type, [inputs]) == [None]
+    monkeypatch.setattr(vectorized.settings, "CALCULATION_VECTORIZE_THRESHOLD", 2)
+    result = inputs[0]
+    try:
+        for value in inputs[1:]:
+            result = result ** value if calculation_type == "exponentiation" else result ** (1 / value)
+    except OverflowError:
+        with pytest.raises(OverflowError):
+            Calculation.create(calculation_type, uuid.uuid4(), inputs).get_result()
+    else:
+        assert Calculation.create(calculation_type, uuid.uuid4(), inputs).get_result() == result
+
+
+@pytest.mark.parametrize(
+    "calculation_type, inputs, message",
+    [
+        ("division", [10.0, 2.0, 0.0, 5.0], "Cannot divide by zero."),
+        ("root", [64.0, 2.0, 0.0, -1.0], "Cannot take zeroth root."),
+        ("root", [64.0, 2.0, -1.0, 0.0], "Cannot take root with a negative degree."),
+    ],
+)
+def test_vectorized_error_semantics(calculation_type, inputs, message, monkeypatch):
+    """Test that validation errors match the Python loop, including which one wins."""
+    monkeypatch.setattr(vectorized.settings, "CALCULATION_VECTORIZE_THRESHOLD", 2)
+    calculation = Calculation.create(calculation_type, uuid.uuid4(), inputs)
+    with pytest.raises(ValueError, match=message):
+        calculation.get_result()
+
+
+def test_vectorized_falls_back_on_non_finite_results(monkeypatch):
+    """
+    Test that an overflowing vectorized result is re-evaluated with the
+    Python loop, which keeps Python's result (inf for float multiplication).
+    """
+    monkeypatch.setattr(vectorized.settings, "CALCULATION_VECTORIZE_THRESHOLD", 2)
+    assert vectorized.multiply([1e200, 1e200]) is None
+    calculation = Calculation.create("multiplication", uuid.uuid4(), [1e200, 1e200])
+    assert calculation.get_result() == float("inf")
+
+
+def test_should_vectorize_threshold(monkeypatch):
+    """Test that only inputs at or above the threshold are vectorized."""
+    monkeypatch.setattr(vectorized.settings, "CALCULATION_VECTORIZE_THRESHOLD", 3)
+    assert vectorized.should_vectorize([1, 2]) is False
+    assert vectorized.should_vectorize([1, 2, 3]) is True
+
+
+@pytest.mark.parametrize("calculation_type", ["addition", "subtraction", "multiplication", "division"])
+def test_evaluate_batch_accepts_binary_inputs(calculation_type):
+    """Test that array('d') inputs (binary storage) give the same results as lists."""
+    from array import array
+    rows = [[1.5, 2.0, 4.0], [10.0, 3.0], [7.0, 0.5, 0.25, 2.0]]
+
+    expected = vectorized.evaluate_batch(calculation_type, rows)
+    binary = vectorized.evaluate_batch(calculation_type, [array("d", row) for row in rows])
+
+    assert binary == expected
+    assert all(value is not None for value in binary)